@@ -0,0 +1,328 @@
+"""
+Файл захвата Modbus RTU: только дозапись, чтение через mmap с индексом.
+
+Формат (все числа little-endian):
+    FILE_HEADER   сигнатура, версия, скорость порта, привязка SessionClock
+    записи        FRAME_HEADER + тело; кадр - сырые байты (с номером порта
+                  захвата), блок индекса -
+                  INDEX_ENTRY по одной на каждые INDEX_STRIDE кадров
+    FILE_TRAILER  смещение последнего блока индекса и число кадров
+                  (пишется при закрытии; без него индекс строится сканированием)
+
+Блоки индекса пишутся в поток каждые INDEX_CHUNK точек и связаны в
+обратный список (поле времени заголовка блока - смещение предыдущего
+блока), поэтому при открытии читаются только они, а переход к кадру по
+номеру или времени стоит O(log n) по индексу плюс не более INDEX_STRIDE
+заголовков.
+"""
+import mmap
+import os
+import queue
+import struct
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+
+from ring_buffer import RingBuffer, DROP_NEWEST
+from serial_reader import FrameRecord, SessionClock
+
+MAGIC = b"MBRTUCAP"
+TRAILER_MAGIC = b"MBRTUEND"
+VERSION = 2  # 2 - номер порта в заголовке кадра
+
+# Сигнатура, версия, резерв, скорость порта, настенное и монотонное время привязки
+FILE_HEADER = struct.Struct('<8sHHIqq')
+# Время захвата (monotonic_ns), пауза перед кадром (-1 - неизвестна), длина, флаги, номер порта
+FRAME_HEADER = struct.Struct('<qqIBB')
+# Заголовок кадра версии 1: без номера порта (все кадры - порт 0)
+FRAME_HEADER_V1 = struct.Struct('<qqIB')
+# Номер кадра, наибольшее время захвата кадров с начала файла по этот кадр
+# включительно (при захвате нескольких портов времена кадров не монотонны),
+# смещение заголовка кадра в файле
+INDEX_ENTRY = struct.Struct('<qqq')
+# Смещение последнего блока индекса, число кадров, сигнатура конца
+FILE_TRAILER = struct.Struct('<qq8s')
+
+FLAG_INDEX = 0x80  # Запись - блок индекса, а не кадр (остальные биты - FLAG_* frame_store)
+
+INDEX_STRIDE = 256  # Кадров между точками индекса
+INDEX_CHUNK = 256  # Точек индекса в одном блоке
+
+RECORD_QUEUE_SIZE = 65536  # Емкость очереди фоновой записи
+
+
+def _unpack_header_v1(data, offset):
+    """Заголовок кадра версии 1 в виде заголовка текущей версии (порт 0)"""
+    return FRAME_HEADER_V1.unpack_from(data, offset) + (0,)
+
+
+# Версия файла -> (размер заголовка кадра, разбор заголовка в поля FRAME_HEADER)
+FRAME_HEADER_READERS = {
+    1: (FRAME_HEADER_V1.size, _unpack_header_v1),
+    VERSION: (FRAME_HEADER.size, FRAME_HEADER.unpack_from),
+}
+
+
+class CaptureWriter:
+    """
+    Пишет файл захвата в поток байт (файл или канал, seek не нужен).
+
+    :param stream: Двоичный поток для записи
+    :param baudrate: Скорость порта (для разбора при воспроизведении)
+    :param clock: SessionClock сессии захвата
+    """
+
+    def __init__(self, stream, baudrate, clock):
+        self.stream = stream
+        self.offset = 0
+        self.frame_count = 0
+        self.pending_index = []  # Точки индекса, еще не записанные в файл
+        self.last_index_offset = -1
+        self.max_time_ns = None  # Наибольшее время захвата записанных кадров
+        self.closed = False
+        self._write(FILE_HEADER.pack(MAGIC, VERSION, 0, baudrate, clock.wall_ns, clock.monotonic_ns))
+
+    def _write(self, data):
+        self.stream.write(data)
+        self.offset += len(data)
+
+    def write(self, record, flags=0):
+        """
+        Дописывает кадр.
+
+        :param record: FrameRecord кадра
+        :param flags: Флаги FLAG_* разобранного кадра (0 - кадр не разбирался)
+        """
+        if self.max_time_ns is None or record.timestamp_ns > self.max_time_ns:
+            self.max_time_ns = record.timestamp_ns
+        if self.frame_count % INDEX_STRIDE == 0:
+            if len(self.pending_index) == INDEX_CHUNK:
+                self._write_index(self.pending_index)
+                self.pending_index = []
+            self.pending_index.append(INDEX_ENTRY.pack(self.frame_count, self.max_time_ns, self.offset))
+        data = record.data
+        gap_ns = record.gap_ns if record.gap_ns is not None else -1
+        self._write(FRAME_HEADER.pack(record.timestamp_ns, gap_ns, len(data), flags, record.port))
+        self._write(data)
+        self.frame_count += 1
+
+    def _write_index(self, entries):
+        body = b"".join(entries)
+        offset = self.offset
+        self._write(FRAME_HEADER.pack(self.last_index_offset, len(entries), len(body), FLAG_INDEX, 0))
+        self._write(body)
+        self.last_index_offset = offset
+
+    def flush(self):
+        self.stream.flush()
+
+    def close(self):
+        """Дописывает оставшийся индекс и окончание файла (поток не закрывается)"""
+        if self.closed:
+            return
+        self.closed = True
+        if self.pending_index:
+            self._write_index(self.pending_index)
+            self.pending_index = []
+        self._write(FILE_TRAILER.pack(self.last_index_offset, self.frame_count, TRAILER_MAGIC))
+        self.stream.flush()
+
+
+class CaptureRecorder:
+    """
+    Фоновая запись захвата в файл.
+
+    record() только кладет запись в кольцевой буфер (вызывается из потока
+    декодирования), упаковка и запись на диск идут в отдельном потоке.
+    При переполнении буфера новые записи отбрасываются и считаются в dropped.
+    """
+
+    def __init__(self, path, baudrate, clock):
+        self.path = path
+        self.file = open(path, "wb")
+        self.writer = CaptureWriter(self.file, baudrate, clock)
+        self.queue = RingBuffer(RECORD_QUEUE_SIZE, DROP_NEWEST)
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    @property
+    def frame_count(self):
+        return self.writer.frame_count
+
+    @property
+    def dropped(self):
+        return self.queue.dropped
+
+    def record(self, record, flags=0):
+        """Ставит кадр в очередь записи"""
+        self.queue.put((record, flags))
+
+    def _run(self):
+        writer = self.writer
+        while self.running or not self.queue.empty():
+            try:
+                writer.write(*self.queue.get(timeout=0.2))
+                while True:
+                    writer.write(*self.queue.get_nowait())
+            except queue.Empty:
+                # Очередь пуста - отдаем накопленное на диск
+                writer.flush()
+
+    def stop(self):
+        """Дописывает очередь, индекс и закрывает файл"""
+        self.running = False
+        self.thread.join()
+        self.writer.close()
+        self.file.close()
+
+
+class CaptureReader:
+    """
+    Чтение файла захвата через mmap.
+
+    Кадры нумеруются с 0; frame(n) и seek_time(t) находят кадр по точкам
+    индекса двоичным поиском. Файл, записанный не до конца (нет окончания),
+    индексируется сканированием заголовков, оборванный последний кадр
+    отбрасывается. Файлы версии 1 (без номера порта) читаются как захват
+    порта 0.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        if size < FILE_HEADER.size:
+            self.file.close()
+            raise ValueError(f"{path}: не файл захвата")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.baudrate, wall_ns, monotonic_ns = FILE_HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version not in FRAME_HEADER_READERS:
+            self.close()
+            raise ValueError(f"{path}: не файл захвата или неизвестная версия")
+        self.version = version
+        self.header_size, self.unpack_header = FRAME_HEADER_READERS[version]
+        self.clock = SessionClock()
+        self.clock.wall_ns = wall_ns
+        self.clock.monotonic_ns = monotonic_ns
+        self.size = size
+        self.index_frame = array('q')  # Точки индекса: номер кадра
+        self.index_time = array('q')  # наибольшее время захвата по этот кадр
+        self.index_offset = array('q')  # смещение заголовка кадра
+        if not self._load_index():
+            self._scan_index()
+
+    def __len__(self):
+        return self.frame_count
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def _load_index(self):
+        """Читает цепочку блоков индекса от окончания файла; False - окончания нет"""
+        if self.size < FILE_HEADER.size + FILE_TRAILER.size:
+            return False
+        self.end = self.size - FILE_TRAILER.size
+        last_index_offset, frame_count, magic = FILE_TRAILER.unpack_from(self.map, self.end)
+        if magic != TRAILER_MAGIC:
+            return False
+        chunks = []
+        offset = last_index_offset
+        while offset >= 0:
+            previous, count, length, flags, _ = self.unpack_header(self.map, offset)
+            chunks.append((offset + self.header_size, count))
+            offset = previous
+        for body, count in reversed(chunks):
+            for frame, time_ns, frame_offset in INDEX_ENTRY.iter_unpack(self.map[body:body + count * INDEX_ENTRY.size]):
+                self.index_frame.append(frame)
+                self.index_time.append(time_ns)
+                self.index_offset.append(frame_offset)
+        self.frame_count = frame_count
+        return True
+
+    def _scan_index(self):
+        """Строит индекс проходом по заголовкам записей (файл без окончания)"""
+        offset = FILE_HEADER.size
+        frame = 0
+        size = self.size
+        max_time_ns = None
+        while offset + self.header_size <= size:
+            time_ns, _, length, flags, _ = self.unpack_header(self.map, offset)
+            following = offset + self.header_size + length
+            if following > size:
+                break
+            if not flags & FLAG_INDEX:
+                if max_time_ns is None or time_ns > max_time_ns:
+                    max_time_ns = time_ns
+                if frame % INDEX_STRIDE == 0:
+                    self.index_frame.append(frame)
+                    self.index_time.append(max_time_ns)
+                    self.index_offset.append(offset)
+                frame += 1
+            offset = following
+        self.end = offset
+        self.frame_count = frame
+
+    def _walk(self, offset, skip):
+        """Смещение заголовка кадра через skip кадров после кадра по смещению offset"""
+        while True:
+            _, _, length, flags, _ = self.unpack_header(self.map, offset)
+            if not flags & FLAG_INDEX:
+                if not skip:
+                    return offset
+                skip -= 1
+            offset += self.header_size + length
+
+    def seek_frame(self, number):
+        """Смещение заголовка кадра number"""
+        if not 0 <= number < self.frame_count:
+            raise IndexError(number)
+        point = bisect_right(self.index_frame, number) - 1
+        return self._walk(self.index_offset[point], number - self.index_frame[point])
+
+    def seek_time(self, time_ns):
+        """
+        Номер первого в порядке записи кадра со временем захвата не раньше time_ns
+        (len(self), если таких нет).
+
+        Времена кадров разных портов могут идти не по возрастанию; точки индекса
+        хранят наибольшее время с начала файла, поэтому двоичный поиск находит
+        точку, до которой все кадры раньше time_ns, и кадр не пропускается.
+        """
+        point = bisect_left(self.index_time, time_ns) - 1
+        if point < 0:
+            return 0
+        number = self.index_frame[point]
+        offset = self.index_offset[point]
+        for record in self._records(offset, number, self.frame_count):
+            if record.timestamp_ns >= time_ns:
+                return record.seq
+        return self.frame_count
+
+    def frame(self, number):
+        """FrameRecord кадра number (seq - номер кадра в файле)"""
+        return next(self._records(self.seek_frame(number), number, number + 1))
+
+    def frame_flags(self, number):
+        """Флаги FLAG_* кадра number"""
+        return self.unpack_header(self.map, self.seek_frame(number))[3]
+
+    def records(self, start=0, stop=None):
+        """FrameRecord кадров с номерами [start, stop) в порядке захвата"""
+        stop = self.frame_count if stop is None else min(stop, self.frame_count)
+        if start >= stop:
+            return iter(())
+        return self._records(self.seek_frame(start), start, stop)
+
+    def _records(self, offset, number, stop):
+        data = self.map
+        unpack_from = self.unpack_header
+        header_size = self.header_size
+        while number < stop:
+            time_ns, gap_ns, length, flags, port = unpack_from(data, offset)
+            body = offset + header_size
+            offset = body + length
+            if flags & FLAG_INDEX:
+                continue
+            yield FrameRecord(data[body:offset], time_ns, number, gap_ns if gap_ns >= 0 else None, port)
+            number += 1
@@ -0,0 +1,212 @@
+"""
+Захват Modbus RTU без графического интерфейса (PyQt6 не импортируется).
+
+Кадры из порта разбираются тем же конвейером, что и в main.py
+(RtuFramer -> resync -> Frame.decode -> TransactionMatcher), и пишутся
+потоком в stdout или файл в формате JSONL, CSV или двоичном формате
+файла захвата (capture.py).
+
+Пример:
+    python cli.py /dev/ttyUSB0 -b 19200 -p E -f jsonl -o capture.jsonl
+"""
+import argparse
+import csv
+import json
+import queue
+import sys
+import threading
+import time
+
+import serial
+
+from capture import CaptureWriter
+from decode import Frame, function_name, resync_record
+from frame_store import frame_flags
+from matcher import TransactionMatcher
+from ring_buffer import RingBuffer, BLOCK, DROP_NEWEST, DROP_OLDEST
+from serial_reader import SessionClock, read_from_com_events
+
+PARITIES = {"N": serial.PARITY_NONE, "E": serial.PARITY_EVEN, "O": serial.PARITY_ODD}
+STOPBITS = {"1": serial.STOPBITS_ONE, "2": serial.STOPBITS_TWO}
+
+# Емкость буфера между потоком чтения порта и разбором
+QUEUE_SIZE = 65536
+
+# Поля записи кадра (JSONL и CSV)
+FIELDS = [
+    "seq", "time", "timestamp_ns", "gap_ns", "address", "function", "function_name",
+    "direction", "start_address", "quantity", "byte_count", "exception_code",
+    "crc_ok", "latency_ns", "data", "raw",
+]
+
+
+def format_iso_time(wall_ns):
+    """Время вида ГГГГ-ММ-ДДTЧЧ:ММ:СС.мммммм из time.time_ns()"""
+    seconds, ns = divmod(wall_ns, 1_000_000_000)
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(seconds)) + f".{ns // 1000:06d}"
+
+
+def frame_fields(decoded, record, transaction, clock):
+    """Поля записи кадра для текстовых форматов"""
+    return {
+        "seq": record.seq,
+        "time": format_iso_time(clock.wall_time_ns(record.timestamp_ns)),
+        "timestamp_ns": record.timestamp_ns,
+        "gap_ns": record.gap_ns,
+        "address": decoded.address,
+        "function": decoded.function,
+        "function_name": function_name(decoded.function),
+        "direction": "response" if decoded.is_response else "request",
+        "start_address": decoded.start_address,
+        "quantity": decoded.quantity,
+        "byte_count": decoded.byte_count,
+        "exception_code": decoded.exception_code,
+        "crc_ok": decoded.crc_ok,
+        "latency_ns": transaction.latency_ns if transaction is not None else None,
+        "data": decoded.payload.hex(' '),
+        "raw": record.data.hex(' '),
+    }
+
+
+class JsonlWriter:
+    """Одна JSON-строка на кадр"""
+
+    def __init__(self, stream, baudrate, clock):
+        self.stream = stream
+        self.clock = clock
+
+    def write(self, decoded, record, transaction):
+        self.stream.write(json.dumps(frame_fields(decoded, record, transaction, self.clock)) + "\n")
+
+    def close(self):
+        pass
+
+
+class CsvWriter:
+    """CSV с заголовком; отсутствующие поля - пустые ячейки"""
+
+    def __init__(self, stream, baudrate, clock):
+        self.stream = stream
+        self.clock = clock
+        self.writer = csv.DictWriter(stream, FIELDS)
+        self.writer.writeheader()
+
+    def write(self, decoded, record, transaction):
+        self.writer.writerow(frame_fields(decoded, record, transaction, self.clock))
+
+    def close(self):
+        pass
+
+
+class BinaryWriter:
+    """Файл захвата (capture.py): кадры с флагами FLAG_* и индекс для перехода"""
+
+    def __init__(self, stream, baudrate, clock):
+        self.writer = CaptureWriter(stream, baudrate, clock)
+
+    def write(self, decoded, record, transaction):
+        self.writer.write(record, frame_flags(decoded))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {"jsonl": JsonlWriter, "csv": CsvWriter, "bin": BinaryWriter}
+
+
+def capture(ser, writer, stream, symbol_time_ns, message_queue, count=None, duration=None):
+    """
+    Читает порт в отдельном потоке и пишет разобранные кадры до конца count
+    кадров, duration секунд или закрытия порта.
+
+    :return: (записано кадров, отброшено коротких записей)
+    """
+    read_thread = threading.Thread(target=read_from_com_events, args=(ser, message_queue), daemon=True)
+    read_thread.start()
+    matcher = TransactionMatcher(symbol_time_ns)
+    deadline = None if duration is None else time.monotonic() + duration
+    written = 0
+    skipped = 0
+    try:
+        while read_thread.is_alive() or not message_queue.empty():
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            try:
+                record = message_queue.get(timeout=0.2)
+            except queue.Empty:
+                # Линия молчит - отдаем накопленное (tail -f, конвейеры)
+                stream.flush()
+                continue
+            for part in resync_record(record, symbol_time_ns):
+                if len(part.data) < 4:
+                    skipped += 1
+                    continue
+                decoded = Frame(part.data).decode()
+                transaction = matcher.feed(decoded, part.timestamp_ns)
+                writer.write(decoded, part, transaction)
+                written += 1
+            if count is not None and written >= count:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ser.close()
+        writer.close()
+        stream.flush()
+    return written, skipped
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Захват Modbus RTU без графического интерфейса")
+    parser.add_argument("port", help="COM-порт (COM3, /dev/ttyUSB0)")
+    parser.add_argument("-b", "--baudrate", type=int, default=9600)
+    parser.add_argument("-d", "--bytesize", type=int, choices=(7, 8), default=8)
+    parser.add_argument("-p", "--parity", choices=sorted(PARITIES), default="N")
+    parser.add_argument("-s", "--stopbits", choices=sorted(STOPBITS), default="1")
+    parser.add_argument("-f", "--format", choices=sorted(WRITERS), default="jsonl")
+    parser.add_argument("-o", "--output", default="-", help="Файл вывода ('-' - stdout)")
+    parser.add_argument("-n", "--count", type=int, help="Остановиться после N кадров")
+    parser.add_argument("-t", "--duration", type=float, help="Остановиться через N секунд")
+    parser.add_argument("--overflow", choices=(DROP_OLDEST, DROP_NEWEST, BLOCK), default=DROP_OLDEST,
+                        help="Политика переполнения буфера между чтением и записью: потери считаются "
+                             "в итоге; block останавливает чтение порта, и байты теряются в драйвере "
+                             "незаметно")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Порт открывается до файла вывода, чтобы при ошибке не оставлять пустой файл
+    try:
+        ser = serial.Serial(args.port, args.baudrate, args.bytesize, PARITIES[args.parity],
+                            STOPBITS[args.stopbits], timeout=None)
+    except (serial.SerialException, ValueError) as error:
+        print(f"Не удалось открыть порт {args.port}: {error}", file=sys.stderr)
+        return 1
+
+    binary = args.format == "bin"
+    try:
+        if args.output == "-":
+            stream = sys.stdout.buffer if binary else sys.stdout
+        else:
+            stream = open(args.output, "wb" if binary else "w", newline="" if not binary else None)
+    except OSError as error:
+        ser.close()
+        print(f"Не удалось открыть файл вывода {args.output}: {error}", file=sys.stderr)
+        return 1
+
+    clock = SessionClock()
+    writer = WRITERS[args.format](stream, args.baudrate, clock)
+    message_queue = RingBuffer(QUEUE_SIZE, args.overflow)
+    symbol_time_ns = 11 * 1_000_000_000 // args.baudrate
+
+    written, skipped = capture(ser, writer, stream, symbol_time_ns, message_queue, args.count, args.duration)
+    if stream is not sys.stdout and stream is not sys.stdout.buffer:
+        stream.close()
+    print(f"Кадров: {written}, коротких записей: {skipped}, потеряно в буфере: {message_queue.dropped}",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,224 @@
+from enum import IntEnum
+
+
+def _build_crc16_table():
+    """Строит таблицу CRC16 Modbus (полином 0xA001) на 256 значений"""
+    table = []
+    for value in range(256):
+        crc = value
+        for _ in range(8):
+            if crc & 0x0001:  # Проверяем младший бит
+                crc = (crc >> 1) ^ 0xA001  # Полином для Modbus
+            else:
+                crc >>= 1
+        table.append(crc)
+    return tuple(table)
+
+
+_CRC16_TABLE = _build_crc16_table()
+
+
+def crc16_value(data, crc=0xFFFF) -> int:
+    """
+    Табличный расчет CRC16 Modbus, возвращает целое число.
+    data - любой объект с буферным протоколом (bytes, bytearray, memoryview),
+    копия данных не создается. Для кадра вместе с его CRC результат равен 0.
+    """
+    table = _CRC16_TABLE
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def crc16(message) -> bytes:
+    """Рассчитывает CRC16 Modbus для последовательности байт, возвращает 2 байта (младший первым)"""
+    crc = crc16_value(message)
+    # Возвращаем CRC в виде двух байтов
+    return bytes([crc & 0xFF, (crc >> 8) & 0xFF])
+
+
+# Описания кодов исключений Modbus
+ERROR_DESCRIPTIONS = {
+    0x01: "Недопустимая функция",
+    0x02: "Недопустимый адрес данных",
+    0x03: "Недопустимое значение данных",
+    0x04: "Ошибка устройства",
+    0x05: "Подтверждение",
+    0x06: "Устройство занято",
+    0x07: "Отрицательное подтверждение",
+    0x08: "Ошибка четности памяти",
+    0x0A: "Шлюз недоступен",
+    0x0B: "Целевое устройство шлюза не ответило",
+}
+
+
+def error_description(error_code):
+    """Возвращает текстовое описание кода ошибки Modbus"""
+    return ERROR_DESCRIPTIONS.get(error_code, f"Неизвестная ошибка (0x{error_code:02X})")
+
+
+# Максимальная длина кадра Modbus RTU (ADU), байт
+MAX_FRAME_LENGTH = 256
+
+
+def candidate_lengths(message, pos=0):
+    """
+    Возвращает возможные длины кадра, начинающегося с позиции pos,
+    по предсказателям длины из таблицы функций FUNCTIONS.
+    Запрос и ответ неразличимы без контекста, поэтому возвращаются оба варианта.
+    """
+    if len(message) - pos < 4:
+        return ()
+    function = message[pos + 1]
+    if function & 0x80:
+        # Исключение: адрес + функция + код ошибки + CRC
+        return (5,)
+    spec = FUNCTIONS[function]
+    if spec is None:
+        return ()
+    lengths = []
+    for predictor in (spec.request_length, spec.response_length):
+        length = predictor(message, pos)
+        if length is not None and length not in lengths:
+            lengths.append(length)
+    return lengths
+
+
+def _frame_end(message, view, pos):
+    """
+    Ищет конец кадра, начинающегося с позиции pos, по сходящейся CRC16.
+
+    :return: Позиция конца кадра либо None, если в пределах MAX_FRAME_LENGTH байт граница не найдена
+    """
+    total = len(message)
+    for length in candidate_lengths(message, pos):
+        if 4 <= length <= total - pos and crc16_value(view[pos:pos + length]) == 0:
+            return pos + length
+    # Поиск границы по нулевому остатку CRC (CRC кадра вместе с его CRC равен 0)
+    crc = 0xFFFF
+    table = _CRC16_TABLE
+    for index in range(pos, min(total, pos + MAX_FRAME_LENGTH)):
+        crc = (crc >> 8) ^ table[(crc ^ message[index]) & 0xFF]
+        if crc == 0 and index + 1 - pos >= 4:
+            return index + 1
+    return None
+
+
+def resync(message):
+    """
+    Делит буфер с неверной CRC на кадры по границам, где сходится CRC16.
+
+    Для каждой позиции сначала проверяются длины, предсказанные по коду функции;
+    если ни одна не подошла, CRC считается нарастающим итогом (не дальше
+    MAX_FRAME_LENGTH байт) до первой позиции, где CRC префикса вместе с его двумя
+    последними байтами дает 0. Если с позиции кадр не начинается, она сдвигается
+    на байт; пропущенные байты (мусор перед кадром или между кадрами) отдаются
+    отдельной частью. Подряд пропускается не больше MAX_FRAME_LENGTH байт, поэтому
+    время линейно от длины буфера.
+
+    :param message: Сырые байты, принятые как одно сообщение
+    :return: Список пар (смещение, bytes); нераспознанный остаток - последним элементом
+    """
+    view = memoryview(message)
+    if len(message) < 4 or crc16_value(view) == 0:
+        return [(0, bytes(message))]
+
+    parts = []
+    pos = 0
+    # Начало пропускаемых байт, не входящих ни в один кадр
+    skipped = None
+    total = len(message)
+    while pos < total:
+        end = _frame_end(message, view, pos)
+        if end is None:
+            if skipped is None:
+                skipped = pos
+            pos += 1
+            if pos - skipped >= MAX_FRAME_LENGTH:
+                # Кадра не нашлось на длине максимального кадра - отдаем остаток как есть
+                break
+            continue
+        if skipped is not None:
+            parts.append((skipped, bytes(view[skipped:pos])))
+            skipped = None
+        parts.append((pos, bytes(view[pos:end])))
+        pos = end
+    if skipped is not None:
+        parts.append((skipped, bytes(view[skipped:])))
+    return parts
+
+
+def resync_record(record, symbol_time_ns):
+    """
+    Делит запись FrameRecord с неверной CRC на несколько записей (склейка кадров USB-адаптером).
+
+    Время каждой части оценивается по ее смещению в буфере и времени символа.
+
+    :param record: FrameRecord
+    :param symbol_time_ns: Время передачи символа, нс
+    :return: Список записей
+    """
+    parts = resync(record.data)
+    if len(parts) == 1:
+        return [record]
+    return [
+        record._replace(
+            data=part,
+            timestamp_ns=record.timestamp_ns + offset * symbol_time_ns,
+            gap_ns=record.gap_ns if offset == 0 else 0,
+        )
+        for offset, part in parts
+    ]
+
+
 class Frame:
+    """
+    Кадр Modbus RTU с ленивым разбором полей.
+
+    Хранит только ссылку на сообщение и флаг CRC. Поля address/function/data/
+    received_crc вычисляются при обращении, data и received_crc - это memoryview
+    без копирования байт. CRC проверяется при первом обращении к CRC_ok.
+
+    Память на хранимый кадр: 48 байт объекта Frame (2 слота, без __dict__)
+    плюс собственный объект bytes сообщения - 33 + длина байт
+    (41 байт для 8-байтового запроса чтения).
+    """
+    __slots__ = ('message', '_crc_ok')
+
     def __init__(self, message: bytes):
         if len(message) < 4:
             raise ValueError(f"Сообщение слишком короткое для Modbus RTU: {len(message)} байт (минимум 4)")
         
         self.message = message
-        # Параметры сообщения Modbus RTU:
-        # Первые 2 байта - адрес и функция
-        self.address = message[0]
-        self.function = message[1]
+        # Состояние корректности CRC: None - еще не проверялось
+        self._crc_ok = None
+
+    # Параметры сообщения Modbus RTU:
+    # Первые 2 байта - адрес и функция
+    @property
+    def address(self):
+        return self.message[0]
+
+    @property
+    def function(self):
+        return self.message[1]
+
+    @property
+    def data(self):
         # Все байты, кроме первых 2 и последних 2 (CRC)
-        self.data = message[2:-2]
+        return memoryview(self.message)[2:-2]
+
+    @property
+    def received_crc(self):
         # Последние 2 байта - это CRC
-        self.received_crc = message[-2:]
-        
-        # Атрибут для хранения состояния корректности CRC
-        self.CRC_ok = False
-        # Вычисляем CRC и проверяем его при создании объекта
-        self.check_crc()
+        return memoryview(self.message)[-2:]
+
+    @property
+    def CRC_ok(self):
+        # Вычисляем CRC и проверяем его при первом обращении
+        if self._crc_ok is None:
+            self.check_crc()
+        return self._crc_ok
 
     def __repr__(self):
         # Представление кадра в виде строки
@@ -24,152 +226,434 @@ class Frame:
 
     def calculate_crc(self):
         # Метод для расчета CRC16 Modbus для текущего кадра (адрес + функция + данные)
-        message = bytes([self.address, self.function]) + self.data
-        crc = 0xFFFF  # Начальное значение для CRC16
-
-        for byte in message:
-            crc ^= byte
-            for _ in range(8):
-                if crc & 0x0001:  # Проверяем младший бит
-                    crc >>= 1
-                    crc ^= 0xA001  # Полином для Modbus
-                else:
-                    crc >>= 1
-        
-        # Возвращаем CRC в виде двух байтов
-        return bytes([crc & 0xFF, (crc >> 8) & 0xFF])
+        # Считается по memoryview исходного сообщения, без склейки байт
+        return crc16(memoryview(self.message)[:-2])
 
     def check_crc(self):
         # Метод для проверки корректности CRC
-        calculated_crc = self.calculate_crc()  # Рассчитываем CRC
-        # Если полученный CRC совпадает с вычисленным, то CRC корректен
-        self.CRC_ok = self.received_crc == calculated_crc
+        # CRC по всему сообщению вместе с принятым CRC равен 0, если CRC корректен
+        self._crc_ok = crc16_value(self.message) == 0
+
+    @staticmethod
+    def verify_many(frames):
+        """
+        Пакетная проверка CRC для множества сообщений (сканер, воспроизведение файлов).
+
+        :param frames: Итерируемый набор сырых сообщений (bytes/bytearray/memoryview)
+        :return: Список bool той же длины: True, если CRC сообщения корректен
+        """
+        table = _CRC16_TABLE
+        results = []
+        for message in frames:
+            if len(message) < 4:
+                results.append(False)
+                continue
+            crc = 0xFFFF
+            for byte in message:
+                crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+            results.append(crc == 0)
+        return results
 
     def get_error_description(self, error_code):
         """Возвращает текстовое описание кода ошибки Modbus"""
-        error_descriptions = {
-            0x01: "Недопустимая функция",
-            0x02: "Недопустимый адрес данных",
-            0x03: "Недопустимое значение данных",
-            0x04: "Ошибка устройства",
-            0x05: "Подтверждение",
-            0x06: "Устройство занято",
-            0x07: "Отрицательное подтверждение",
-            0x08: "Ошибка четности памяти",
-            0x0A: "Шлюз недоступен",
-            0x0B: "Целевое устройство шлюза не ответило",
-        }
-        return error_descriptions.get(error_code, f"Неизвестная ошибка (0x{error_code:02X})")
+        return error_description(error_code)
 
-    def get_list(self):
-        # Проверяем, является ли это исключением (MSB функции = 1)
-        is_exception = (self.function & 0x80) != 0
-        base_function = self.function & 0x7F  # базовая функция без флага исключения
-
-        # Определяем тип функции
-        is_read_function = base_function in (0x01, 0x02, 0x03, 0x04)
-        is_write_single = base_function in (0x05, 0x06)  # Write Single Coil/Register
-        is_write_multiple = base_function in (0x0F, 0x10)  # Write Multiple Coils/Registers (15, 16)
-
-        # Определяем, является ли кадр ответом
-        is_response = False
-        # Если это исключение, это всегда ответ
-        if is_exception:
-            is_response = True
-        elif is_read_function and len(self.data) >= 1:
-            # Для функций чтения: в ответе первый байт после функции — количество байт данных
-            byte_count = self.data[0]
-            is_response = (len(self.data) == 1 + byte_count)
-        elif is_write_single:
-            # Для функций 5 и 6: если длина данных = 4 байта, это может быть и запрос и ответ
-            # По умолчанию считаем запросом (ответ будет обработан отдельно при сопоставлении)
-            # Ответ для функций 5 и 6 - это эхо запроса (4 байта)
-            is_response = False  # Будет определяться в main.py при сопоставлении с запросом
-        elif is_write_multiple:
-            # Для функций 15 и 16:
-            # Запрос: длина данных > 5 байт (адрес 2 + количество 2 + байт количества 1 + значения)
-            # Ответ: длина данных = 4 байта (адрес 2 + количество 2)
-            if len(self.data) == 4:
-                is_response = True
-            else:
-                is_response = False
-
-        message_type = "Ответ" if is_response else "Запрос"
-
-        # Инициализация переменных для колонок
-        first_register_addr_value = None
-        registers_count_display = "-"
-        byte_count_display = "-"  # Новый столбец "Количество байт далее"
-        payload = b""
-
-        # Обработка исключений
-        if is_exception and len(self.data) >= 1:
-            error_code = self.data[0]
-            error_desc = self.get_error_description(error_code)
-            registers_count_display = f"Ошибка: {error_desc}"
-            payload = self.data[1:] if len(self.data) > 1 else b""
-        
-        # Обработка функций чтения (0x01-0x04)
-        elif is_read_function:
-            if is_response and len(self.data) >= 1:
-                # Ответ: первый байт - количество байт данных
-                registers_count_value = int(self.data[0])
-                registers_count_display = registers_count_value
-                payload = self.data[1:]
-            elif not is_response and len(self.data) >= 4:
-                # Запрос: адрес регистра (2 байта) + количество (2 байта)
-                first_register_addr_value = int.from_bytes(self.data[0:2], byteorder="big")
-                registers_count_value = int.from_bytes(self.data[2:4], byteorder="big")
-                registers_count_display = registers_count_value
-                payload = self.data[4:] if len(self.data) > 4 else b""
-        
-        # Обработка функций записи одной единицы (5, 6)
-        elif is_write_single:
-            if len(self.data) >= 4:
-                # И запрос, и ответ имеют одинаковую структуру: адрес (2) + значение (2)
-                first_register_addr_value = int.from_bytes(self.data[0:2], byteorder="big")
-                if is_response:
-                    # Для ответа: количество регистров = 1 (эхо запроса)
-                    registers_count_display = 1
-                    # Данные ответа - это значение (2 байта)
-                    payload = self.data[2:4]
-                else:
-                    # Для запроса: количество регистров = 1
-                    registers_count_display = 1
-                    # Данные запроса - это значение (2 байта)
-                    payload = self.data[2:4]
-        
-        # Обработка функций записи множественных единиц (15, 16)
-        elif is_write_multiple:
-            if is_response and len(self.data) >= 4:
-                # Ответ: адрес (2) + количество (2)
-                first_register_addr_value = int.from_bytes(self.data[0:2], byteorder="big")
-                registers_count_value = int.from_bytes(self.data[2:4], byteorder="big")
-                registers_count_display = registers_count_value
-                payload = b""  # В ответе нет данных значений
-            elif not is_response and len(self.data) >= 5:
-                # Запрос: адрес (2) + количество (2) + байт количества (1) + значения
-                first_register_addr_value = int.from_bytes(self.data[0:2], byteorder="big")
-                registers_count_value = int.from_bytes(self.data[2:4], byteorder="big")
-                registers_count_display = registers_count_value
-                byte_count_display = int(self.data[4])  # Байт количества данных
-                payload = self.data[5:]  # Данные значений
-
-        # Формируем итоговые значения для отображения
-        first_register_addr_display = first_register_addr_value if first_register_addr_value is not None else "-"
-        data_display = payload if payload else "-"
+    def decode(self, direction=None):
+        """
+        Разбирает кадр в структурированную запись DecodedFrame (только числовые поля,
+        без строк для отображения). Разбор данных выбирается по таблице FUNCTIONS.
 
+        :param direction: Известное направление кадра (None - определить по содержимому)
+        """
+        return self.decode_into(DecodedFrame(self), direction)
+
+    def decode_into(self, decoded, direction=None):
+        """Заполняет поля существующего DecodedFrame (повторный разбор с известным направлением)"""
+        data = self.data
+        function = self.function
+        decoded.reset()
+
+        # Проверяем, является ли это исключением (MSB функции = 1), исключение - всегда ответ
+        if function & 0x80:
+            decoded.direction = Direction.RESPONSE
+            if len(data) >= 1:
+                decoded.exception_code = data[0]
+                decoded.payload = data[1:]
+            return decoded
+
+        spec = FUNCTIONS[function]
+        if spec is not None:
+            spec.parse(decoded, data, direction)
+        if direction is not None:
+            # Известное направление сохраняется, даже если данных для разбора недостаточно
+            decoded.direction = direction
+        return decoded
+
+    def get_list(self):
+        """
+        Старое табличное представление кадра (11 колонок со строками для отображения).
+        Оставлено для совместимости; GUI форматирует DecodedFrame самостоятельно.
+        """
+        decoded = self.decode()
+        if decoded.exception_code is not None:
+            registers_count_display = f"Ошибка: {self.get_error_description(decoded.exception_code)}"
+        elif decoded.quantity is not None:
+            registers_count_display = decoded.quantity
+        elif decoded.byte_count is not None:
+            registers_count_display = decoded.byte_count
+        else:
+            registers_count_display = "-"
+        has_byte_count_column = decoded.quantity is not None and decoded.byte_count is not None
         return [
             0,                                # Счетчик сообщений (заполнится в UI)
             0,                                # Время (заполнится в UI)
-            message_type,                     # Тип сообщения
+            "Ответ" if decoded.direction == Direction.RESPONSE else "Запрос",  # Тип сообщения
             self.address,                     # Адрес
             self.function,                    # Функция
-            first_register_addr_display,     # Адрес 1-го регистра
+            decoded.start_address if decoded.start_address is not None else "-",  # Адрес 1-го регистра
             registers_count_display,          # Кол-во регистров/байт
-            byte_count_display,               # Количество байт далее (только для 15, 16)
-            data_display,                     # Данные
+            decoded.byte_count if has_byte_count_column else "-",  # Количество байт далее (только для 15, 16)
+            decoded.payload if decoded.payload else "-",  # Данные
             self.received_crc,                # CRC
             self.CRC_ok                       # CRC_OK
         ]
 
+
+class Direction(IntEnum):
+    """Направление кадра: запрос мастера или ответ ведомого"""
+    REQUEST = 0
+    RESPONSE = 1
+
+
+class DecodedFrame:
+    """
+    Результат разбора кадра без форматирования.
+
+    Числовые поля равны None, если в кадре их нет. payload - memoryview данных
+    значений (пустой, если данных нет). Строки для отображения формирует GUI.
+    """
+    __slots__ = ('frame', 'direction', 'start_address', 'quantity', 'byte_count',
+                 'payload', 'exception_code', 'crc_ok', 'sub_function',
+                 'write_address', 'write_quantity')
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.crc_ok = frame.CRC_ok
+        self.reset()
+
+    def reset(self):
+        """Сбрасывает разобранные поля перед (повторным) разбором"""
+        self.direction = Direction.REQUEST
+        self.start_address = None  # Адрес первого регистра/катушки
+        self.quantity = None  # Количество регистров/катушек
+        self.byte_count = None  # Байт количества данных из кадра
+        self.payload = _EMPTY_VIEW
+        self.exception_code = None  # Код исключения (для функций с MSB = 1)
+        self.sub_function = None  # Подфункция (8) или тип MEI (43)
+        self.write_address = None  # Адрес записи (23 Read/Write Multiple Registers)
+        self.write_quantity = None  # Количество регистров записи (23)
+
+    @property
+    def address(self):
+        return self.frame.address
+
+    @property
+    def function(self):
+        return self.frame.function
+
+    @property
+    def base_function(self):
+        return self.frame.function & 0x7F
+
+    @property
+    def is_response(self):
+        return self.direction == Direction.RESPONSE
+
+    def __repr__(self):
+        return (f"DecodedFrame(direction={self.direction.name}, address={self.address}, function={self.function}, "
+                f"start_address={self.start_address}, quantity={self.quantity}, byte_count={self.byte_count}, "
+                f"payload={self.payload.hex()}, exception_code={self.exception_code}, crc_ok={self.crc_ok}, "
+                f"sub_function={self.sub_function}, write_address={self.write_address}, "
+                f"write_quantity={self.write_quantity})")
+
+
+_EMPTY_VIEW = memoryview(b"")
+
+
+# ---------------------------------------------------------------------------
+# Разбор данных по кодам функций. Каждый разборщик получает DecodedFrame,
+# memoryview данных (без адреса, функции и CRC) и известное направление кадра
+# (None - определить по содержимому) и заполняет числовые поля.
+# ---------------------------------------------------------------------------
+
+def _u16(data, index):
+    return (data[index] << 8) | data[index + 1]
+
+
+def _parse_read(decoded, data, direction=None):
+    """01-04: чтение катушек, входов, регистров хранения и входных регистров"""
+    # В ответе первый байт после функции — количество байт данных
+    if direction is None:
+        direction = Direction.RESPONSE if len(data) >= 1 and len(data) == 1 + data[0] else Direction.REQUEST
+    if direction == Direction.RESPONSE and len(data) >= 1:
+        decoded.direction = Direction.RESPONSE
+        decoded.byte_count = data[0]
+        decoded.payload = data[1:]
+    elif direction == Direction.REQUEST and len(data) >= 4:
+        # Запрос: адрес регистра (2 байта) + количество (2 байта)
+        decoded.start_address = _u16(data, 0)
+        decoded.quantity = _u16(data, 2)
+        decoded.payload = data[4:]
+
+
+def _parse_write_single(decoded, data, direction=None):
+    """05, 06: запись одной катушки/регистра"""
+    # Ответ - это эхо запроса (4 байта), запрос и ответ неразличимы.
+    # По умолчанию считаем запросом (ответ определяется при сопоставлении с запросом)
+    if direction is not None:
+        decoded.direction = direction
+    if len(data) >= 4:
+        decoded.start_address = _u16(data, 0)
+        decoded.quantity = 1
+        decoded.payload = data[2:4]
+
+
+def _parse_write_multiple(decoded, data, direction=None):
+    """15, 16: запись нескольких катушек/регистров"""
+    if direction is None:
+        direction = Direction.RESPONSE if len(data) == 4 else Direction.REQUEST
+    if direction == Direction.RESPONSE and len(data) >= 4:
+        # Ответ: адрес (2) + количество (2), данных значений нет
+        decoded.direction = Direction.RESPONSE
+        decoded.start_address = _u16(data, 0)
+        decoded.quantity = _u16(data, 2)
+    elif direction == Direction.REQUEST and len(data) >= 5:
+        # Запрос: адрес (2) + количество (2) + байт количества (1) + значения
+        decoded.start_address = _u16(data, 0)
+        decoded.quantity = _u16(data, 2)
+        decoded.byte_count = data[4]
+        decoded.payload = data[5:]
+
+
+def _parse_status(decoded, data, direction=None):
+    """07, 11: запрос без данных, ответ фиксированной длины (статус/счетчик событий)"""
+    if direction is None:
+        direction = Direction.RESPONSE if len(data) else Direction.REQUEST
+    if direction == Direction.RESPONSE:
+        decoded.direction = Direction.RESPONSE
+        decoded.payload = data
+
+
+def _parse_byte_count_response(decoded, data, direction=None):
+    """12, 17: запрос без данных, ответ с байтом количества"""
+    if direction is None:
+        direction = Direction.RESPONSE if len(data) else Direction.REQUEST
+    if direction == Direction.RESPONSE and len(data) >= 1:
+        decoded.direction = Direction.RESPONSE
+        decoded.byte_count = data[0]
+        decoded.payload = data[1:]
+
+
+def _parse_diagnostics(decoded, data, direction=None):
+    """08: диагностика; ответ - эхо запроса, по умолчанию считается запросом"""
+    if direction is not None:
+        decoded.direction = direction
+    if len(data) >= 2:
+        decoded.sub_function = _u16(data, 0)
+        decoded.payload = data[2:]
+
+
+def _parse_file_record(decoded, data, direction=None):
+    """20, 21: чтение/запись файловых записей"""
+    if direction is None:
+        # В запросе 20 второй байт - тип ссылки (6); в ответе - длина подответа (всегда нечетная)
+        if decoded.frame.function == 0x14 and len(data) >= 2 and data[1] != 6:
+            direction = Direction.RESPONSE
+        else:
+            direction = Direction.REQUEST
+    decoded.direction = direction
+    if len(data) >= 1:
+        decoded.byte_count = data[0]
+        decoded.payload = data[1:]
+
+
+def _parse_mask_write(decoded, data, direction=None):
+    """22: запись регистра по маске (AND, OR); ответ - эхо запроса"""
+    if direction is not None:
+        decoded.direction = direction
+    if len(data) >= 6:
+        decoded.start_address = _u16(data, 0)
+        decoded.quantity = 1
+        decoded.payload = data[2:6]
+
+
+def _parse_read_write_multiple(decoded, data, direction=None):
+    """23: чтение/запись нескольких регистров"""
+    if direction is None:
+        direction = Direction.REQUEST if len(data) >= 9 and len(data) == 9 + data[8] else Direction.RESPONSE
+    if direction == Direction.REQUEST and len(data) >= 9:
+        # Запрос: чтение (адрес, количество) + запись (адрес, количество, байт количества, значения)
+        decoded.start_address = _u16(data, 0)
+        decoded.quantity = _u16(data, 2)
+        decoded.write_address = _u16(data, 4)
+        decoded.write_quantity = _u16(data, 6)
+        decoded.byte_count = data[8]
+        decoded.payload = data[9:]
+    elif direction == Direction.RESPONSE and len(data) >= 1:
+        decoded.direction = Direction.RESPONSE
+        decoded.byte_count = data[0]
+        decoded.payload = data[1:]
+
+
+def _parse_fifo(decoded, data, direction=None):
+    """24: чтение очереди FIFO"""
+    if direction is None:
+        direction = Direction.REQUEST if len(data) == 2 else Direction.RESPONSE
+    if direction == Direction.REQUEST and len(data) >= 2:
+        decoded.start_address = _u16(data, 0)
+    elif direction == Direction.RESPONSE and len(data) >= 4:
+        decoded.direction = Direction.RESPONSE
+        decoded.byte_count = _u16(data, 0)
+        decoded.quantity = _u16(data, 2)
+        decoded.payload = data[4:]
+
+
+def _parse_encapsulated(decoded, data, direction=None):
+    """43: инкапсулированный транспорт (MEI), 0x0E - идентификация устройства"""
+    if len(data) >= 1:
+        decoded.sub_function = data[0]
+        decoded.payload = data[1:]
+        # Запрос 43/14: тип MEI + код чтения + идентификатор объекта
+        if direction is None and not (decoded.sub_function == 0x0E and len(data) == 3):
+            direction = Direction.RESPONSE
+    if direction is not None:
+        decoded.direction = direction
+
+
+# ---------------------------------------------------------------------------
+# Предсказатели длины кадра: по байтам, начинающимся с позиции pos, возвращают
+# полную длину кадра (с CRC) или None, если байт для предсказания недостаточно.
+# ---------------------------------------------------------------------------
+
+def _fixed_length(length):
+    def predictor(message, pos):
+        return length
+    return predictor
+
+
+def _byte_count_length(index, extra):
+    """Длина = extra + байт количества на позиции pos + index"""
+    def predictor(message, pos):
+        if len(message) <= pos + index:
+            return None
+        return extra + message[pos + index]
+    return predictor
+
+
+def _fifo_response_length(message, pos):
+    if len(message) <= pos + 3:
+        return None
+    return 6 + ((message[pos + 2] << 8) | message[pos + 3])
+
+
+def _device_id_request_length(message, pos):
+    if len(message) <= pos + 2:
+        return None
+    return 7 if message[pos + 2] == 0x0E else None
+
+
+def _device_id_response_length(message, pos):
+    # Заголовок: MEI, код чтения, соответствие, продолжение, следующий объект, число объектов
+    if len(message) <= pos + 7 or message[pos + 2] != 0x0E:
+        return None
+    index = pos + 8
+    for _ in range(message[pos + 7]):
+        # Объект: идентификатор (1) + длина (1) + значение
+        if len(message) <= index + 1:
+            return None
+        index += 2 + message[index + 1]
+    return index + 2 - pos
+
+
+# ---------------------------------------------------------------------------
+# Предсказание ответа по запросу (для сопоставления запрос/ответ)
+# ---------------------------------------------------------------------------
+
+def _predict_bits(decoded):
+    return 5 + (decoded.quantity + 7) // 8 if decoded.quantity is not None else None
+
+
+def _predict_registers(decoded):
+    return 5 + 2 * decoded.quantity if decoded.quantity is not None else None
+
+
+def _predict_echo(decoded):
+    return len(decoded.frame.message)
+
+
+def _predict_fixed(length):
+    def predictor(decoded):
+        return length
+    return predictor
+
+
+def _predict_unknown(decoded):
+    return None
+
+
+class FunctionSpec:
+    """
+    Описание функции Modbus в таблице FUNCTIONS.
+
+    parse(decoded, data, direction) - разбор данных кадра (direction = None -
+    определить направление по содержимому); request_length/response_length
+    (message, pos) - предсказание длины кадра по первым байтам (для деления
+    склеенных кадров); predict_response(decoded_request) - ожидаемая длина
+    ответа на разобранный запрос (None, если длина переменная).
+    """
+    __slots__ = ('code', 'name', 'parse', 'request_length', 'response_length', 'predict_response')
+
+    def __init__(self, code, name, parse, request_length, response_length, predict_response):
+        self.code = code
+        self.name = name
+        self.parse = parse
+        self.request_length = request_length
+        self.response_length = response_length
+        self.predict_response = predict_response
+
+    def __repr__(self):
+        return f"FunctionSpec(code={self.code}, name={self.name!r})"
+
+
+# Таблица функций, индексируемая кодом функции (0..127): выбор разборщика за O(1)
+FUNCTIONS = [None] * 128
+
+for _spec in (
+    FunctionSpec(0x01, "Read Coils", _parse_read, _fixed_length(8), _byte_count_length(2, 5), _predict_bits),
+    FunctionSpec(0x02, "Read Discrete Inputs", _parse_read, _fixed_length(8), _byte_count_length(2, 5), _predict_bits),
+    FunctionSpec(0x03, "Read Holding Registers", _parse_read, _fixed_length(8), _byte_count_length(2, 5), _predict_registers),
+    FunctionSpec(0x04, "Read Input Registers", _parse_read, _fixed_length(8), _byte_count_length(2, 5), _predict_registers),
+    FunctionSpec(0x05, "Write Single Coil", _parse_write_single, _fixed_length(8), _fixed_length(8), _predict_fixed(8)),
+    FunctionSpec(0x06, "Write Single Register", _parse_write_single, _fixed_length(8), _fixed_length(8), _predict_fixed(8)),
+    FunctionSpec(0x07, "Read Exception Status", _parse_status, _fixed_length(4), _fixed_length(5), _predict_fixed(5)),
+    FunctionSpec(0x08, "Diagnostics", _parse_diagnostics, _fixed_length(8), _fixed_length(8), _predict_echo),
+    FunctionSpec(0x0B, "Get Comm Event Counter", _parse_status, _fixed_length(4), _fixed_length(8), _predict_fixed(8)),
+    FunctionSpec(0x0C, "Get Comm Event Log", _parse_byte_count_response, _fixed_length(4), _byte_count_length(2, 5), _predict_unknown),
+    FunctionSpec(0x0F, "Write Multiple Coils", _parse_write_multiple, _byte_count_length(6, 9), _fixed_length(8), _predict_fixed(8)),
+    FunctionSpec(0x10, "Write Multiple Registers", _parse_write_multiple, _byte_count_length(6, 9), _fixed_length(8), _predict_fixed(8)),
+    FunctionSpec(0x11, "Report Server ID", _parse_byte_count_response, _fixed_length(4), _byte_count_length(2, 5), _predict_unknown),
+    FunctionSpec(0x14, "Read File Record", _parse_file_record, _byte_count_length(2, 5), _byte_count_length(2, 5), _predict_unknown),
+    FunctionSpec(0x15, "Write File Record", _parse_file_record, _byte_count_length(2, 5), _byte_count_length(2, 5), _predict_echo),
+    FunctionSpec(0x16, "Mask Write Register", _parse_mask_write, _fixed_length(10), _fixed_length(10), _predict_fixed(10)),
+    FunctionSpec(0x17, "Read/Write Multiple Registers", _parse_read_write_multiple, _byte_count_length(10, 13), _byte_count_length(2, 5), _predict_registers),
+    FunctionSpec(0x18, "Read FIFO Queue", _parse_fifo, _fixed_length(6), _fifo_response_length, _predict_unknown),
+    FunctionSpec(0x2B, "Encapsulated Interface Transport", _parse_encapsulated, _device_id_request_length, _device_id_response_length, _predict_unknown),
+):
+    FUNCTIONS[_spec.code] = _spec
+del _spec
+
+
+def function_name(function):
+    """Возвращает стандартное название функции Modbus (для исключений - базовой функции)"""
+    spec = FUNCTIONS[function & 0x7F]
+    return spec.name if spec is not None else f"Function 0x{function & 0x7F:02X}"
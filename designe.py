@@ -1,6 +1,6 @@
 # Form implementation generated from reading ui file 'designe.ui'
 #
-# Created by: PyQt6 UI code generator 6.7.1
+# Created by: PyQt6 UI code generator 6.11.0
 #
 # WARNING: Any manual changes made to this file will be lost when pyuic6 is
 # run again.  Do not edit this file unless you know what you are doing.
@@ -27,8 +27,8 @@ class Ui_MainWindow(object):
         self.dockWidgetContents = QtWidgets.QWidget()
         self.dockWidgetContents.setObjectName("dockWidgetContents")
         self.verticalLayout_3 = QtWidgets.QVBoxLayout(self.dockWidgetContents)
-        self.verticalLayout_3.setObjectName("verticalLayout_3")
         self.verticalLayout_3.setContentsMargins(6, 12, 6, 6)
+        self.verticalLayout_3.setObjectName("verticalLayout_3")
         self.horizontalLayout_filters = QtWidgets.QHBoxLayout()
         self.horizontalLayout_filters.setObjectName("horizontalLayout_filters")
         self.checkBox_filter_crc_ok = QtWidgets.QCheckBox(parent=self.dockWidgetContents)
@@ -41,55 +41,43 @@ class Ui_MainWindow(object):
         self.label_filter_address.setObjectName("label_filter_address")
         self.horizontalLayout_filters.addWidget(self.label_filter_address)
         self.comboBox_filter_address = QtWidgets.QComboBox(parent=self.dockWidgetContents)
+        self.comboBox_filter_address.setMinimumSize(QtCore.QSize(100, 0))
         self.comboBox_filter_address.setEditable(True)
+        self.comboBox_filter_address.setCurrentText("")
         self.comboBox_filter_address.setObjectName("comboBox_filter_address")
-        self.comboBox_filter_address.setMinimumWidth(100)
         self.horizontalLayout_filters.addWidget(self.comboBox_filter_address)
         self.label_filter_function = QtWidgets.QLabel(parent=self.dockWidgetContents)
         self.label_filter_function.setObjectName("label_filter_function")
         self.horizontalLayout_filters.addWidget(self.label_filter_function)
         self.comboBox_filter_function = QtWidgets.QComboBox(parent=self.dockWidgetContents)
+        self.comboBox_filter_function.setMinimumSize(QtCore.QSize(100, 0))
         self.comboBox_filter_function.setEditable(True)
+        self.comboBox_filter_function.setCurrentText("")
         self.comboBox_filter_function.setObjectName("comboBox_filter_function")
-        self.comboBox_filter_function.setMinimumWidth(100)
         self.horizontalLayout_filters.addWidget(self.comboBox_filter_function)
-        spacerItem_filters = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Minimum)
-        self.horizontalLayout_filters.addItem(spacerItem_filters)
+        spacerItem = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Minimum)
+        self.horizontalLayout_filters.addItem(spacerItem)
         self.pushButton_reset_filters = QtWidgets.QPushButton(parent=self.dockWidgetContents)
         self.pushButton_reset_filters.setObjectName("pushButton_reset_filters")
         self.horizontalLayout_filters.addWidget(self.pushButton_reset_filters)
         self.pushButton_clear = QtWidgets.QPushButton(parent=self.dockWidgetContents)
         self.pushButton_clear.setObjectName("pushButton_clear")
         self.horizontalLayout_filters.addWidget(self.pushButton_clear)
+        self.pushButton_record = QtWidgets.QPushButton(parent=self.dockWidgetContents)
+        self.pushButton_record.setCheckable(True)
+        self.pushButton_record.setObjectName("pushButton_record")
+        self.horizontalLayout_filters.addWidget(self.pushButton_record)
+        self.pushButton_replay = QtWidgets.QPushButton(parent=self.dockWidgetContents)
+        self.pushButton_replay.setObjectName("pushButton_replay")
+        self.horizontalLayout_filters.addWidget(self.pushButton_replay)
         self.verticalLayout_3.addLayout(self.horizontalLayout_filters)
-        self.SnifferTable = QtWidgets.QTableWidget(parent=self.dockWidgetContents)
+        self.SnifferTable = QtWidgets.QTableView(parent=self.dockWidgetContents)
         self.SnifferTable.setMinimumSize(QtCore.QSize(410, 0))
         self.SnifferTable.setObjectName("SnifferTable")
-        self.SnifferTable.setColumnCount(11)
-        self.SnifferTable.setRowCount(0)
-        item = QtWidgets.QTableWidgetItem()
-        self.SnifferTable.setHorizontalHeaderItem(0, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.SnifferTable.setHorizontalHeaderItem(1, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.SnifferTable.setHorizontalHeaderItem(2, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.SnifferTable.setHorizontalHeaderItem(3, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.SnifferTable.setHorizontalHeaderItem(4, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.SnifferTable.setHorizontalHeaderItem(5, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.SnifferTable.setHorizontalHeaderItem(6, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.SnifferTable.setHorizontalHeaderItem(7, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.SnifferTable.setHorizontalHeaderItem(8, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.SnifferTable.setHorizontalHeaderItem(9, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.SnifferTable.setHorizontalHeaderItem(10, item)
         self.verticalLayout_3.addWidget(self.SnifferTable)
+        self.label_ingest_status = QtWidgets.QLabel(parent=self.dockWidgetContents)
+        self.label_ingest_status.setObjectName("label_ingest_status")
+        self.verticalLayout_3.addWidget(self.label_ingest_status)
         self.dockWidget_Sniffer.setWidget(self.dockWidgetContents)
         MainWindow.addDockWidget(QtCore.Qt.DockWidgetArea(1), self.dockWidget_Sniffer)
         self.dockWidget_Values = QtWidgets.QDockWidget(parent=MainWindow)
@@ -104,19 +92,55 @@ class Ui_MainWindow(object):
         self.dockWidgetContents_Values.setObjectName("dockWidgetContents_Values")
         self.verticalLayout_Values = QtWidgets.QVBoxLayout(self.dockWidgetContents_Values)
         self.verticalLayout_Values.setObjectName("verticalLayout_Values")
-        self.ValuesTable = QtWidgets.QTableWidget(parent=self.dockWidgetContents_Values)
+        self.ValuesTable = QtWidgets.QTableView(parent=self.dockWidgetContents_Values)
         self.ValuesTable.setObjectName("ValuesTable")
-        self.ValuesTable.setColumnCount(3)
-        self.ValuesTable.setRowCount(0)
-        item = QtWidgets.QTableWidgetItem()
-        self.ValuesTable.setHorizontalHeaderItem(0, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.ValuesTable.setHorizontalHeaderItem(1, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.ValuesTable.setHorizontalHeaderItem(2, item)
         self.verticalLayout_Values.addWidget(self.ValuesTable)
+        self.horizontalLayout_types = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_types.setObjectName("horizontalLayout_types")
+        self.pushButton_save_types = QtWidgets.QPushButton(parent=self.dockWidgetContents_Values)
+        self.pushButton_save_types.setObjectName("pushButton_save_types")
+        self.horizontalLayout_types.addWidget(self.pushButton_save_types)
+        self.pushButton_load_types = QtWidgets.QPushButton(parent=self.dockWidgetContents_Values)
+        self.pushButton_load_types.setObjectName("pushButton_load_types")
+        self.horizontalLayout_types.addWidget(self.pushButton_load_types)
+        self.verticalLayout_Values.addLayout(self.horizontalLayout_types)
         self.dockWidget_Values.setWidget(self.dockWidgetContents_Values)
-        MainWindow.splitDockWidget(self.dockWidget_Sniffer, self.dockWidget_Values, QtCore.Qt.Orientation.Horizontal)
+        MainWindow.addDockWidget(QtCore.Qt.DockWidgetArea(2), self.dockWidget_Values)
+        self.dockWidget_Registers = QtWidgets.QDockWidget(parent=MainWindow)
+        self.dockWidget_Registers.setMinimumSize(QtCore.QSize(300, 167))
+        self.dockWidget_Registers.setObjectName("dockWidget_Registers")
+        self.dockWidgetContents_Registers = QtWidgets.QWidget()
+        self.dockWidgetContents_Registers.setObjectName("dockWidgetContents_Registers")
+        self.verticalLayout_Registers = QtWidgets.QVBoxLayout(self.dockWidgetContents_Registers)
+        self.verticalLayout_Registers.setObjectName("verticalLayout_Registers")
+        self.RegistersTable = QtWidgets.QTableView(parent=self.dockWidgetContents_Registers)
+        self.RegistersTable.setObjectName("RegistersTable")
+        self.verticalLayout_Registers.addWidget(self.RegistersTable)
+        self.dockWidget_Registers.setWidget(self.dockWidgetContents_Registers)
+        MainWindow.addDockWidget(QtCore.Qt.DockWidgetArea(2), self.dockWidget_Registers)
+        self.dockWidget_Trend = QtWidgets.QDockWidget(parent=MainWindow)
+        self.dockWidget_Trend.setMinimumSize(QtCore.QSize(300, 167))
+        self.dockWidget_Trend.setObjectName("dockWidget_Trend")
+        self.dockWidgetContents_Trend = QtWidgets.QWidget()
+        self.dockWidgetContents_Trend.setObjectName("dockWidgetContents_Trend")
+        self.verticalLayout_Trend = QtWidgets.QVBoxLayout(self.dockWidgetContents_Trend)
+        self.verticalLayout_Trend.setObjectName("verticalLayout_Trend")
+        self.horizontalLayout_trend = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_trend.setObjectName("horizontalLayout_trend")
+        self.label_trend_window = QtWidgets.QLabel(parent=self.dockWidgetContents_Trend)
+        self.label_trend_window.setObjectName("label_trend_window")
+        self.horizontalLayout_trend.addWidget(self.label_trend_window)
+        self.comboBox_trend_window = QtWidgets.QComboBox(parent=self.dockWidgetContents_Trend)
+        self.comboBox_trend_window.setObjectName("comboBox_trend_window")
+        self.horizontalLayout_trend.addWidget(self.comboBox_trend_window)
+        spacerItem1 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Minimum)
+        self.horizontalLayout_trend.addItem(spacerItem1)
+        self.verticalLayout_Trend.addLayout(self.horizontalLayout_trend)
+        self.TrendPlot = TrendPlot(parent=self.dockWidgetContents_Trend)
+        self.TrendPlot.setObjectName("TrendPlot")
+        self.verticalLayout_Trend.addWidget(self.TrendPlot)
+        self.dockWidget_Trend.setWidget(self.dockWidgetContents_Trend)
+        MainWindow.addDockWidget(QtCore.Qt.DockWidgetArea(2), self.dockWidget_Trend)
         self.dockWidget_Panel_connect = QtWidgets.QDockWidget(parent=MainWindow)
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Fixed)
         sizePolicy.setHorizontalStretch(0)
@@ -129,17 +153,16 @@ class Ui_MainWindow(object):
         self.dockWidgetContents_2 = QtWidgets.QWidget()
         self.dockWidgetContents_2.setObjectName("dockWidgetContents_2")
         self.gridLayout_6 = QtWidgets.QGridLayout(self.dockWidgetContents_2)
-        self.gridLayout_6.setObjectName("gridLayout_6")
         self.gridLayout_6.setContentsMargins(10, 10, 10, 14)
-        self.gridLayout_6.setHorizontalSpacing(12)
-        self.gridLayout_6.setVerticalSpacing(12)
+        self.gridLayout_6.setSpacing(12)
+        self.gridLayout_6.setObjectName("gridLayout_6")
         self.gridLayout = QtWidgets.QGridLayout()
         self.gridLayout.setSpacing(6)
         self.gridLayout.setObjectName("gridLayout")
         self.label = QtWidgets.QLabel(parent=self.dockWidgetContents_2)
+        self.label.setAlignment(QtCore.Qt.AlignmentFlag.AlignLeft|QtCore.Qt.AlignmentFlag.AlignVCenter)
+        self.label.setMinimumSize(QtCore.QSize(0, 24))
         self.label.setObjectName("label")
-        self.label.setAlignment(QtCore.Qt.AlignmentFlag.AlignVCenter|QtCore.Qt.AlignmentFlag.AlignLeft)
-        self.label.setMinimumHeight(24)
         self.gridLayout.addWidget(self.label, 0, 0, 1, 1)
         self.comboBox_COM = QtWidgets.QComboBox(parent=self.dockWidgetContents_2)
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Policy.Preferred, QtWidgets.QSizePolicy.Policy.Preferred)
@@ -155,9 +178,9 @@ class Ui_MainWindow(object):
         self.gridLayout_2 = QtWidgets.QGridLayout()
         self.gridLayout_2.setObjectName("gridLayout_2")
         self.label_5 = QtWidgets.QLabel(parent=self.dockWidgetContents_2)
+        self.label_5.setAlignment(QtCore.Qt.AlignmentFlag.AlignLeft|QtCore.Qt.AlignmentFlag.AlignVCenter)
+        self.label_5.setMinimumSize(QtCore.QSize(0, 24))
         self.label_5.setObjectName("label_5")
-        self.label_5.setAlignment(QtCore.Qt.AlignmentFlag.AlignVCenter|QtCore.Qt.AlignmentFlag.AlignLeft)
-        self.label_5.setMinimumHeight(24)
         self.gridLayout_2.addWidget(self.label_5, 0, 0, 1, 1)
         self.comboBox_date_bit = QtWidgets.QComboBox(parent=self.dockWidgetContents_2)
         self.comboBox_date_bit.setMinimumSize(QtCore.QSize(0, 26))
@@ -170,9 +193,9 @@ class Ui_MainWindow(object):
         self.gridLayout_3 = QtWidgets.QGridLayout()
         self.gridLayout_3.setObjectName("gridLayout_3")
         self.label_2 = QtWidgets.QLabel(parent=self.dockWidgetContents_2)
+        self.label_2.setAlignment(QtCore.Qt.AlignmentFlag.AlignLeft|QtCore.Qt.AlignmentFlag.AlignVCenter)
+        self.label_2.setMinimumSize(QtCore.QSize(0, 24))
         self.label_2.setObjectName("label_2")
-        self.label_2.setAlignment(QtCore.Qt.AlignmentFlag.AlignVCenter|QtCore.Qt.AlignmentFlag.AlignLeft)
-        self.label_2.setMinimumHeight(24)
         self.gridLayout_3.addWidget(self.label_2, 0, 0, 1, 1)
         self.comboBox_baudrate = QtWidgets.QComboBox(parent=self.dockWidgetContents_2)
         self.comboBox_baudrate.setMinimumSize(QtCore.QSize(0, 26))
@@ -186,9 +209,9 @@ class Ui_MainWindow(object):
         self.gridLayout_4 = QtWidgets.QGridLayout()
         self.gridLayout_4.setObjectName("gridLayout_4")
         self.label_3 = QtWidgets.QLabel(parent=self.dockWidgetContents_2)
+        self.label_3.setAlignment(QtCore.Qt.AlignmentFlag.AlignLeft|QtCore.Qt.AlignmentFlag.AlignVCenter)
+        self.label_3.setMinimumSize(QtCore.QSize(0, 24))
         self.label_3.setObjectName("label_3")
-        self.label_3.setAlignment(QtCore.Qt.AlignmentFlag.AlignVCenter|QtCore.Qt.AlignmentFlag.AlignLeft)
-        self.label_3.setMinimumHeight(24)
         self.gridLayout_4.addWidget(self.label_3, 0, 0, 1, 1)
         self.comboBox_parity = QtWidgets.QComboBox(parent=self.dockWidgetContents_2)
         self.comboBox_parity.setMinimumSize(QtCore.QSize(0, 26))
@@ -202,9 +225,9 @@ class Ui_MainWindow(object):
         self.gridLayout_5 = QtWidgets.QGridLayout()
         self.gridLayout_5.setObjectName("gridLayout_5")
         self.label_4 = QtWidgets.QLabel(parent=self.dockWidgetContents_2)
+        self.label_4.setAlignment(QtCore.Qt.AlignmentFlag.AlignLeft|QtCore.Qt.AlignmentFlag.AlignVCenter)
+        self.label_4.setMinimumSize(QtCore.QSize(0, 24))
         self.label_4.setObjectName("label_4")
-        self.label_4.setAlignment(QtCore.Qt.AlignmentFlag.AlignVCenter|QtCore.Qt.AlignmentFlag.AlignLeft)
-        self.label_4.setMinimumHeight(24)
         self.gridLayout_5.addWidget(self.label_4, 0, 0, 1, 1)
         self.comboBox_stop_bit = QtWidgets.QComboBox(parent=self.dockWidgetContents_2)
         self.comboBox_stop_bit.setMinimumSize(QtCore.QSize(0, 26))
@@ -219,8 +242,8 @@ class Ui_MainWindow(object):
         self.pushButton_scan.setMaximumSize(QtCore.QSize(16777215, 26))
         self.pushButton_scan.setObjectName("pushButton_scan")
         self.gridLayout_6.addWidget(self.pushButton_scan, 0, 5, 1, 1)
-        spacerItem = QtWidgets.QSpacerItem(0, 20, QtWidgets.QSizePolicy.Policy.Minimum, QtWidgets.QSizePolicy.Policy.Fixed)
-        self.gridLayout_6.addItem(spacerItem, 1, 0, 1, 6)
+        spacerItem2 = QtWidgets.QSpacerItem(0, 20, QtWidgets.QSizePolicy.Policy.Minimum, QtWidgets.QSizePolicy.Policy.Fixed)
+        self.gridLayout_6.addItem(spacerItem2, 1, 0, 1, 6)
         self.pushButton_connect = QtWidgets.QPushButton(parent=self.dockWidgetContents_2)
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Policy.Preferred, QtWidgets.QSizePolicy.Policy.Fixed)
         sizePolicy.setHorizontalStretch(0)
@@ -232,13 +255,13 @@ class Ui_MainWindow(object):
         self.pushButton_connect.setObjectName("pushButton_connect")
         self.gridLayout_6.addWidget(self.pushButton_connect, 2, 0, 1, 6)
         self.label_scan_status = QtWidgets.QLabel(parent=self.dockWidgetContents_2)
-        self.label_scan_status.setObjectName("label_scan_status")
+        self.label_scan_status.setMinimumSize(QtCore.QSize(0, 20))
+        self.label_scan_status.setText("")
         self.label_scan_status.setAlignment(QtCore.Qt.AlignmentFlag.AlignLeft|QtCore.Qt.AlignmentFlag.AlignVCenter)
-        self.label_scan_status.setMinimumHeight(20)
-        self.label_scan_status.setStyleSheet("color: blue; font-weight: bold;")
+        self.label_scan_status.setObjectName("label_scan_status")
         self.gridLayout_6.addWidget(self.label_scan_status, 3, 0, 1, 6)
-        spacerItem1 = QtWidgets.QSpacerItem(0, 10, QtWidgets.QSizePolicy.Policy.Minimum, QtWidgets.QSizePolicy.Policy.Fixed)
-        self.gridLayout_6.addItem(spacerItem1, 4, 0, 1, 6)
+        spacerItem3 = QtWidgets.QSpacerItem(0, 10, QtWidgets.QSizePolicy.Policy.Minimum, QtWidgets.QSizePolicy.Policy.Fixed)
+        self.gridLayout_6.addItem(spacerItem3, 4, 0, 1, 6)
         self.dockWidget_Panel_connect.setWidget(self.dockWidgetContents_2)
         MainWindow.addDockWidget(QtCore.Qt.DockWidgetArea(4), self.dockWidget_Panel_connect)
 
@@ -249,45 +272,22 @@ class Ui_MainWindow(object):
         _translate = QtCore.QCoreApplication.translate
         MainWindow.setWindowTitle(_translate("MainWindow", "MainWindow"))
         self.dockWidget_Sniffer.setWindowTitle(_translate("MainWindow", "Сниффер"))
-        item = self.SnifferTable.horizontalHeaderItem(0)
-        item.setText(_translate("MainWindow", "Счетчик\nсообщений"))
-        item = self.SnifferTable.horizontalHeaderItem(1)
-        item.setText(_translate("MainWindow", "Время"))
-        item = self.SnifferTable.horizontalHeaderItem(2)
-        item.setText(_translate("MainWindow", "Тип сообщения"))
-        item = self.SnifferTable.horizontalHeaderItem(3)
-        item.setText(_translate("MainWindow", "Адрес"))
-        item = self.SnifferTable.horizontalHeaderItem(4)
-        item.setText(_translate("MainWindow", "Функция"))
-        item = self.SnifferTable.horizontalHeaderItem(5)
-        item.setText(_translate("MainWindow", "Адрес 1-го\nрегистра"))
-        item = self.SnifferTable.horizontalHeaderItem(6)
-        item.setText(_translate("MainWindow", "Количество\nрегистров/\nбайт"))
-        item = self.SnifferTable.horizontalHeaderItem(7)
-        item.setText(_translate("MainWindow", "Количество\nбайт далее"))
-        item = self.SnifferTable.horizontalHeaderItem(8)
-        item.setText(_translate("MainWindow", "Данные"))
-        item = self.SnifferTable.horizontalHeaderItem(9)
-        item.setText(_translate("MainWindow", "CRC"))
-        item = self.SnifferTable.horizontalHeaderItem(10)
-        item.setText(_translate("MainWindow", "CRC_OK"))
         self.checkBox_filter_crc_ok.setText(_translate("MainWindow", "Скрыть сообщения с невалидным CRC"))
         self.checkBox_filter_errors_only.setText(_translate("MainWindow", "Показать только ошибки"))
         self.label_filter_address.setText(_translate("MainWindow", "Адрес:"))
-        self.comboBox_filter_address.setCurrentText(_translate("MainWindow", ""))
         self.comboBox_filter_address.setPlaceholderText(_translate("MainWindow", "Все"))
         self.label_filter_function.setText(_translate("MainWindow", "Функция:"))
-        self.comboBox_filter_function.setCurrentText(_translate("MainWindow", ""))
         self.comboBox_filter_function.setPlaceholderText(_translate("MainWindow", "Все"))
         self.pushButton_reset_filters.setText(_translate("MainWindow", "Сброс всех фильтров"))
         self.pushButton_clear.setText(_translate("MainWindow", "Очистить"))
+        self.pushButton_record.setText(_translate("MainWindow", "Запись"))
+        self.pushButton_replay.setText(_translate("MainWindow", "Воспроизведение"))
         self.dockWidget_Values.setWindowTitle(_translate("MainWindow", "Значения"))
-        item = self.ValuesTable.horizontalHeaderItem(0)
-        item.setText(_translate("MainWindow", "Регистр"))
-        item = self.ValuesTable.horizontalHeaderItem(1)
-        item.setText(_translate("MainWindow", "Тип данных"))
-        item = self.ValuesTable.horizontalHeaderItem(2)
-        item.setText(_translate("MainWindow", "Значение"))
+        self.pushButton_save_types.setText(_translate("MainWindow", "Сохранить типы"))
+        self.pushButton_load_types.setText(_translate("MainWindow", "Загрузить типы"))
+        self.dockWidget_Registers.setWindowTitle(_translate("MainWindow", "Регистры"))
+        self.dockWidget_Trend.setWindowTitle(_translate("MainWindow", "Тренд"))
+        self.label_trend_window.setText(_translate("MainWindow", "Окно:"))
         self.dockWidget_Panel_connect.setWindowTitle(_translate("MainWindow", "Панель подключения"))
         self.label.setText(_translate("MainWindow", "COM"))
         self.label_5.setText(_translate("MainWindow", "Биты данных"))
@@ -306,4 +306,5 @@ class Ui_MainWindow(object):
         self.comboBox_stop_bit.setItemText(1, _translate("MainWindow", "2"))
         self.pushButton_scan.setText(_translate("MainWindow", "Сканирование сети"))
         self.pushButton_connect.setText(_translate("MainWindow", "Подключение"))
-        self.label_scan_status.setText(_translate("MainWindow", ""))
+        self.label_scan_status.setStyleSheet(_translate("MainWindow", "color: blue; font-weight: bold;"))
+from trend_plot import TrendPlot
@@ -0,0 +1,285 @@
+from array import array
+from itertools import compress
+
+# Флаги кадра в колонке frame_flags
+FLAG_RESPONSE = 0x01  # Ответ ведомого (иначе запрос)
+FLAG_CRC_OK = 0x02  # CRC корректен
+FLAG_EXCEPTION = 0x04  # Ответ-исключение (MSB функции = 1)
+
+# Значение "нет поля" для числовых колонок
+NONE = -1
+
+
+def frame_flags(decoded):
+    """Флаги FLAG_* разобранного кадра"""
+    flags = 0
+    if decoded.is_response:
+        flags |= FLAG_RESPONSE
+    if decoded.crc_ok:
+        flags |= FLAG_CRC_OK
+    if decoded.exception_code is not None:
+        flags |= FLAG_EXCEPTION
+    return flags
+
+
+class FrameStore:
+    """
+    Колоночное хранилище кадров и строк таблицы Сниффер.
+
+    Кадры: каждая колонка - array фиксированного типа, индекс в колонке -
+    идентификатор кадра; сырые байты всех кадров лежат подряд в одном
+    bytearray (frame_offset/frame_length). Данные значений (payload) всегда
+    являются концом данных кадра перед CRC, поэтому хранится только их длина.
+
+    Строки: строка таблицы ссылается на последний кадр, который в ней
+    отображается (одинаковые запросы/ответы обновляют строку), и хранит
+    счетчик, время захвата и время ответа. Кадр повторного ответа
+    записывается поверх прежнего кадра строки (replace_frame), поэтому
+    память растет с числом строк, а не с числом принятых кадров. Под сырые
+    байты кадра отводится место по наибольшей записанной в него длине
+    (frame_capacity); более длинный кадр переносится в конец messages, а
+    освободившееся место собирается compact(), как только его становится
+    больше половины messages.
+
+    Для фильтров строки дополнительно хранят неизменные признаки своего кадра
+    (адрес, базовую функцию, флаги) в байтовых колонках.
+
+    Память на кадр: 43 байта колонок + место под сырые байты (не больше
+    256 байт, плюс не больше того же объема освобожденного места до
+    compact()); на строку - 31 байт.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Удаляет все кадры и строки"""
+        # Колонки кадров
+        self.frame_time_ns = array('q')  # Монотонное время захвата
+        self.frame_offset = array('Q')  # Смещение сырых байт в messages
+        self.frame_length = array('H')  # Длина кадра
+        self.frame_capacity = array('H')  # Место под кадр в messages (не меньше длины)
+        self.frame_address = array('B')
+        self.frame_function = array('B')
+        self.frame_start = array('i')  # Адрес первого регистра (NONE - нет)
+        self.frame_quantity = array('i')  # Количество регистров (NONE - нет)
+        self.frame_byte_count = array('i')  # Байт количества (NONE - нет)
+        self.frame_payload_length = array('H')  # Длина данных значений
+        self.frame_flags = array('B')
+        self.frame_exception = array('B')  # Код исключения (0 - нет)
+        self.frame_port = array('B')  # Номер порта захвата
+        self.frame_value_start = array('i')  # Номер регистра первого значения в данных (NONE - неизвестен)
+        self.messages = bytearray()
+        self.free_bytes = 0  # Байт messages, освобожденных переносом кадров
+        # Колонки строк
+        self.row_frame = array('I')  # Последний кадр строки
+        self.row_counter = array('I')  # Счетчик одинаковых сообщений
+        self.row_time_ns = array('q')  # Время захвата последнего кадра строки (monotonic_ns)
+        self.row_latency_ns = array('q')  # Время ответа (NONE - показывать время)
+        self.row_address = bytearray()  # Адрес ведомого
+        self.row_function = bytearray()  # Базовая функция (без MSB исключения)
+        self.row_flags = bytearray()  # Флаги кадра (FLAG_*)
+
+    @property
+    def frame_count(self):
+        return len(self.frame_flags)
+
+    @property
+    def row_count(self):
+        return len(self.row_frame)
+
+    def append_frame(self, decoded, time_ns, port=0, value_start=None):
+        """
+        Добавляет разобранный кадр.
+
+        :param decoded: DecodedFrame
+        :param time_ns: Монотонное время захвата кадра
+        :param port: Номер порта захвата
+        :param value_start: Номер регистра первого значения в данных (для ответа - из запроса)
+        :return: Идентификатор кадра
+        """
+        message = decoded.frame.message
+        frame_id = len(self.frame_flags)
+        self.frame_time_ns.append(time_ns)
+        self.frame_offset.append(len(self.messages))
+        self.frame_length.append(len(message))
+        self.frame_capacity.append(len(message))
+        self.messages += message
+        self.frame_address.append(decoded.address)
+        self.frame_function.append(decoded.function)
+        self.frame_start.append(NONE if decoded.start_address is None else decoded.start_address)
+        self.frame_quantity.append(NONE if decoded.quantity is None else decoded.quantity)
+        self.frame_byte_count.append(NONE if decoded.byte_count is None else decoded.byte_count)
+        self.frame_payload_length.append(len(decoded.payload))
+        self.frame_flags.append(frame_flags(decoded))
+        self.frame_exception.append(decoded.exception_code or 0)
+        self.frame_port.append(port)
+        self.frame_value_start.append(NONE if value_start is None else value_start)
+        return frame_id
+
+    def replace_frame(self, frame_id, decoded, time_ns, value_start=None):
+        """
+        Записывает кадр поверх кадра frame_id (одна строка - один кадр).
+
+        Сырые байты пишутся на прежнее место, если помещаются в него; иначе
+        переносятся в конец messages, а прежнее место учитывается в
+        free_bytes.
+
+        :return: Идентификатор кадра (frame_id)
+        """
+        message = decoded.frame.message
+        length = len(message)
+        if length > self.frame_capacity[frame_id]:
+            self.free_bytes += self.frame_capacity[frame_id]
+            self.frame_offset[frame_id] = len(self.messages)
+            self.frame_capacity[frame_id] = length
+            self.messages += message
+        else:
+            offset = self.frame_offset[frame_id]
+            self.messages[offset:offset + length] = message
+        self.frame_length[frame_id] = length
+        self.frame_time_ns[frame_id] = time_ns
+        self.frame_function[frame_id] = decoded.function
+        self.frame_start[frame_id] = NONE if decoded.start_address is None else decoded.start_address
+        self.frame_quantity[frame_id] = NONE if decoded.quantity is None else decoded.quantity
+        self.frame_byte_count[frame_id] = NONE if decoded.byte_count is None else decoded.byte_count
+        self.frame_payload_length[frame_id] = len(decoded.payload)
+        self.frame_flags[frame_id] = frame_flags(decoded)
+        self.frame_exception[frame_id] = decoded.exception_code or 0
+        self.frame_value_start[frame_id] = NONE if value_start is None else value_start
+        if self.free_bytes > len(self.messages) // 2:
+            self.compact()
+        return frame_id
+
+    def compact(self):
+        """Складывает сырые байты кадров подряд, освобождая место перенесенных кадров"""
+        old = self.messages
+        messages = bytearray()
+        offsets = self.frame_offset
+        lengths = self.frame_length
+        for frame_id in range(len(offsets)):
+            offset = offsets[frame_id]
+            offsets[frame_id] = len(messages)
+            messages += old[offset:offset + lengths[frame_id]]
+        self.messages = messages
+        self.frame_capacity = array('H', lengths)
+        self.free_bytes = 0
+
+    def message(self, frame_id):
+        """Сырые байты кадра"""
+        offset = self.frame_offset[frame_id]
+        return bytes(self.messages[offset:offset + self.frame_length[frame_id]])
+
+    def payload(self, frame_id):
+        """Данные значений кадра (конец данных перед CRC)"""
+        end = self.frame_offset[frame_id] + self.frame_length[frame_id] - 2
+        return bytes(self.messages[end - self.frame_payload_length[frame_id]:end])
+
+    def received_crc(self, frame_id):
+        """Принятый CRC кадра (2 байта)"""
+        end = self.frame_offset[frame_id] + self.frame_length[frame_id]
+        return bytes(self.messages[end - 2:end])
+
+    def add_row(self, frame_id, time_ns, latency_ns=NONE):
+        """Добавляет строку таблицы для кадра, возвращает идентификатор строки"""
+        row_id = len(self.row_frame)
+        self.row_frame.append(frame_id)
+        self.row_counter.append(1)
+        self.row_time_ns.append(time_ns)
+        self.row_latency_ns.append(latency_ns)
+        self.row_address.append(self.frame_address[frame_id])
+        self.row_function.append(self.frame_function[frame_id] & 0x7F)
+        self.row_flags.append(self.frame_flags[frame_id])
+        return row_id
+
+    def update_row(self, row_id, time_ns, frame_id=None, latency_ns=NONE):
+        """Обновляет строку при повторе сообщения: счетчик, время и (для ответов) кадр"""
+        self.row_counter[row_id] += 1
+        self.row_time_ns[row_id] = time_ns
+        self.row_latency_ns[row_id] = latency_ns
+        if frame_id is not None:
+            self.row_frame[row_id] = frame_id
+
+
+def _value_table(predicate):
+    """Таблица bytes.translate: байт -> 1, если predicate(байт), иначе 0"""
+    return bytes(1 if predicate(value) else 0 for value in range(256))
+
+
+class RowFilter:
+    """
+    Фильтр строк таблицы Сниффер.
+
+    mask - bytearray видимости по идентификатору строки (1 - строка видна).
+    Новая строка проверяется только активным предикатом (test); при смене
+    фильтра маска строится заново из байтовых колонок строк хранилища
+    через bytes.translate (адрес, функция, флаги CRC/исключения) и
+    объединяется побитовым И - без обхода строк в Python и без разбора
+    текста ячеек.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.crc_ok_only = False
+        self.errors_only = False
+        self.address = None
+        self.function = None
+        self.mask = bytearray()
+
+    @property
+    def active(self):
+        return self.crc_ok_only or self.errors_only or self.address is not None or self.function is not None
+
+    def set(self, crc_ok_only=False, errors_only=False, address=None, function=None):
+        """
+        Устанавливает фильтр и пересчитывает маску всех строк.
+
+        :return: False, если фильтр не изменился
+        """
+        new_filter = (crc_ok_only, errors_only, address, function)
+        if new_filter == (self.crc_ok_only, self.errors_only, self.address, self.function):
+            return False
+        self.crc_ok_only, self.errors_only, self.address, self.function = new_filter
+        self.rebuild()
+        return True
+
+    def rebuild(self):
+        """Пересчитывает маску всех строк хранилища"""
+        store = self.store
+        count = store.row_count
+        masks = []
+        if self.crc_ok_only or self.errors_only:
+            required = (FLAG_CRC_OK if self.crc_ok_only else 0) | (FLAG_EXCEPTION if self.errors_only else 0)
+            masks.append(store.row_flags.translate(_value_table(lambda flags: flags & required == required)))
+        if self.address is not None:
+            masks.append(store.row_address.translate(_value_table(lambda value: value == self.address)))
+        if self.function is not None:
+            masks.append(store.row_function.translate(_value_table(lambda value: value == self.function)))
+        if not masks:
+            self.mask = bytearray(b'\x01') * count
+            return
+        # Маски по одному байту на строку объединяем как целые числа
+        combined = int.from_bytes(masks[0], 'little')
+        for mask in masks[1:]:
+            combined &= int.from_bytes(mask, 'little')
+        self.mask = bytearray(combined.to_bytes(count, 'little'))
+
+    def test(self, row_id):
+        """Проверяет новую строку активным предикатом и дополняет маску"""
+        store = self.store
+        flags = store.row_flags[row_id]
+        visible = not (
+            (self.crc_ok_only and not flags & FLAG_CRC_OK)
+            or (self.errors_only and not flags & FLAG_EXCEPTION)
+            or (self.address is not None and store.row_address[row_id] != self.address)
+            or (self.function is not None and store.row_function[row_id] != self.function)
+        )
+        self.mask.append(visible)
+        return visible
+
+    def visible_rows(self, row_ids):
+        """Видимые строки из последовательности идентификаторов (с сохранением порядка)"""
+        return array('I', compress(row_ids, map(self.mask.__getitem__, row_ids)))
+
+    def clear(self):
+        self.mask = bytearray()
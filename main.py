@@ -1,63 +1,110 @@
 import queue
 import sys
 import threading
+import time
 from datetime import datetime
-from serial_reader import read_list_ports, open_serial_port, read_from_com
+from serial_reader import read_list_ports, SessionClock, PortCapture
 
-from PyQt6.QtWidgets import QApplication, QMainWindow, QTableWidget, QTableWidgetItem, QMessageBox, QHeaderView, QComboBox, QAbstractItemView
-from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import QApplication, QMainWindow, QMessageBox, QHeaderView, QAbstractItemView, QFileDialog, QInputDialog
 from PyQt6.QtCore import QTimer, Qt, pyqtSignal, QObject
-import struct
 from designe import Ui_MainWindow  
-from decode import Frame
+from decode import Frame, DecodedFrame, Direction, resync_record
+from matcher import Transaction, TransactionMatcher
+from frame_store import FrameStore, FLAG_RESPONSE, NONE, frame_flags
+from sniffer_model import SnifferModel
+from ring_buffer import RingBuffer, RingBufferGroup, DROP_OLDEST
+from capture import CaptureRecorder
+from replay import Replay, open_source
+from scanner import BusScanner, scan_ports
+from register_profiles import RegisterProfiles, register_space, value_start
+from values_model import ValuesModel, RegisterTypeDelegate, TYPE_COLUMN
+from register_image import RegisterImage
+from registers_model import RegistersModel
+from register_history import RegisterHistory
+from trend_plot import TREND_WINDOWS
 import serial
 
 
+# Пункт comboBox_COM для захвата всех портов сразу
+ALL_PORTS = "Все порты"
+# Колонка "Порт" таблицы Сниффер (видна при захвате нескольких портов)
+PORT_COLUMN = 11
+
+# Емкость и политика переполнения очередей конвейера (записи FrameRecord / декодированные кадры)
+MESSAGE_QUEUE_SIZE = 65536
+MESSAGE_QUEUE_POLICY = DROP_OLDEST
+DECODED_QUEUE_SIZE = 65536
+DECODED_QUEUE_POLICY = DROP_OLDEST
+# Время разбора очереди декодированных сообщений за один тик таймера (50 мс)
+DRAIN_BUDGET_S = 0.020
+# Отставание отображения, после которого повторы обновляют только счетчики
+DEGRADE_LAG_NS = 1_000_000_000
+
+
 class ScanSignals(QObject):
     """Сигналы для обновления UI из потока сканирования"""
     status_update = pyqtSignal(str)
     button_update = pyqtSignal(str)
     scan_finished = pyqtSignal(bool, str, str, str, str)  # success, baudrate, bytesize, parity, stopbit
+    ports_scan_finished = pyqtSignal(object)  # {порт: (baudrate, bytesize, parity, stopbits)} найденных портов
 
 
 class MainWindow(QMainWindow, Ui_MainWindow):
     def __init__(self):
         super().__init__()
         self.setupUi(self)  # Настройка UI из сгенерированного файла
+        # Расположение доков (в designe.ui не задается): Значения справа от Сниффера,
+        # Тренд под Значениями, Регистры - вкладкой рядом со Значениями
+        self.splitDockWidget(self.dockWidget_Sniffer, self.dockWidget_Values, Qt.Orientation.Horizontal)
+        self.splitDockWidget(self.dockWidget_Values, self.dockWidget_Trend, Qt.Orientation.Vertical)
+        self.tabifyDockWidget(self.dockWidget_Values, self.dockWidget_Registers)
         
         # Инициализация переменных
-        self.serial_port = None
-        self.read_thread = None
-        self.message_queue = queue.Queue(maxsize=0)  # Очередь для сырых hex строк из COM порта (неограниченная)
-        self.decoded_queue = queue.Queue(maxsize=0)  # Очередь для декодированных сообщений (frame, message_bytes) (неограниченная)
+        self.captures = []  # PortCapture подключенных портов (поток чтения на порт)
+        self.port_settings = {}  # Параметры портов, найденные сканированием всех портов: имя -> (baudrate, bytesize, parity, stopbits)
+        # Очереди конвейера фиксированной емкости с учетом потерь: чтение портов -> декодирование -> GUI
+        self.message_queue = RingBufferGroup()  # Записи FrameRecord: буфер на каждый порт и на воспроизведение
+        self.decoded_queue = RingBuffer(DECODED_QUEUE_SIZE, DECODED_QUEUE_POLICY)  # Декодированные сообщения (decoded, record, transaction)
         self.decode_thread = None
         self.is_connected = False
-        self.message_counter = 0
-        # Индексы для обновления строк
+        # Индексы для обновления строк (значения - постоянные идентификаторы строк FrameStore),
+        # ключи начинаются с номера порта: одинаковые кадры разных линий - разные строки
         self.request_index_by_bytes = {}
         self.response_index_by_signature = {}
-        self.last_request_time_by_af = {}  # Время последнего запроса по (address, function)
-        self.last_request_time_by_key = {}  # Время последнего запроса по req_key (для функций 5 и 6)
+        self.last_request_time_by_af = {}  # Время окончания последнего запроса по (port, address, function), monotonic_ns захвата
         self.last_request_row_by_af = {}
-        self.skip_first_invalid_crc = False
-        self.connected_at = None
-        # Ответы, ожидающие своих запросов: ключ = (address, base_function), значение = список (row_data, frame, message_bytes)
+        self.skip_first_invalid_crc = set()  # Порты, у которых отбрасывается первый кадр с неверной CRC
+        self.connected_at_ns = None  # Монотонное время подключения (time.monotonic_ns)
+        self.symbol_time_ns = 11 * 1_000_000_000 // 9600  # Время передачи символа по умолчанию
+        self.port_symbol_time_ns = {}  # Время передачи символа по номеру порта
+        self.ingest_lag_ns = 0  # Отставание отображения от захвата кадров
+        self.recorder = None  # Запись захвата в файл (CaptureRecorder), None - не пишем
+        self.replay = None  # Идущее воспроизведение (Replay), None - нет
+        self.replay_base = (0, 0)  # records_decoded и потери message_queue на начало воспроизведения
+        self.replay_result = None  # (кадров, секунд) последнего завершенного воспроизведения
+        self.records_decoded = 0  # Записей message_queue, обработанных потоком декодирования
+        self.records_failed = 0  # Записей, пропущенных из-за ошибки разбора
+        # Ответы, ожидающие своих запросов: ключ = (port, address, base_function), значение = список (decoded, record)
         self.pending_responses = {}
         self.last_message_time = None
         self.process_pending_timer = None
-        # Счетчики сообщений: ключ = уникальный идентификатор сообщения, значение = количество раз
-        self.message_counters = {}
-        # Хранилище данных сообщений: ключ = row_position, значение = (data_bytes, frame)
-        self.message_data_storage = {}
-        # Типы данных для регистров: ключ = row_position, значение = список типов для каждого регистра
-        self.register_types_storage = {}
+        # Колоночное хранилище кадров и строк таблицы Сниффер (счетчики, время, данные)
+        self.frame_store = FrameStore()
+        self.sniffer_model = SnifferModel(self.frame_store, self)
+        self.SnifferTable.setModel(self.sniffer_model)
+        # Типы данных регистров по (ведомый, пространство, номер регистра), общие для всех строк
+        self.register_profiles = RegisterProfiles()
+        # Текущие значения регистров ведомых по ответам и запросам записи
+        self.register_image = RegisterImage()
+        # История изменений регистров для графиков (пополняется образом)
+        self.register_history = RegisterHistory(self.register_image, self.register_profiles)
+        self.values_port = 0  # Порт кадра, показанного в окне "Значения"
         
         # Флаг начала вывода: True = ждем первого запроса, False = выводим все сообщения
         self.waiting_for_first_request = True
         
-        # Отслеживание сообщений функций 5 и 6 для определения запрос/ответ
-        # Ключ = (address, function, data_bytes), значение = количество раз
-        self.write_single_message_count = {}
+        # Сопоставление запросов и ответов по адресу ведомого, свое для каждого порта (в потоке декодирования)
+        self.matchers = {}
         
         # Заполняем comboBox_COM при запуске
         self.populate_com_ports()
@@ -76,13 +123,14 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         # Флаг для остановки сканирования
         self.scanning_active = False
         self.scan_thread = None
-        self.current_test_port = None  # Текущий тестовый порт для возможности закрытия при остановке
+        self.scanners = []  # BusScanner сканируемых портов
         self.scan_successful = False  # Флаг успешного сканирования
         # Сигналы для обновления UI из потока сканирования
         self.scan_signals = ScanSignals()
         self.scan_signals.status_update.connect(self.update_scan_status_label)
         self.scan_signals.button_update.connect(self.update_scan_button)
         self.scan_signals.scan_finished.connect(self.on_scan_finished)
+        self.scan_signals.ports_scan_finished.connect(self.on_ports_scan_finished)
         
         # Таймер для обработки очереди декодированных сообщений
         self.timer = QTimer()
@@ -114,34 +162,80 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         # Подключаем кнопку очистки
         self.pushButton_clear.clicked.connect(self.clear_table)
         
+        # Подключаем кнопку записи захвата в файл
+        self.pushButton_record.toggled.connect(self.on_record_toggled)
+        
+        # Подключаем кнопку воспроизведения захвата
+        self.pushButton_replay.clicked.connect(self.on_replay_clicked)
+        
         # Подключаем кнопку сброса фильтров
         self.pushButton_reset_filters.clicked.connect(self.reset_all_filters)
         
         # Подключаем обработчик выбора строки в таблице
-        self.SnifferTable.itemSelectionChanged.connect(self.on_row_selected)
-        
-        # Настраиваем таблицу "Значения"
+        self.SnifferTable.selectionModel().selectionChanged.connect(self.on_row_selected)
+        # Колонка "Порт" нужна только при захвате нескольких портов
+        self.SnifferTable.setColumnHidden(PORT_COLUMN, True)
+        
+        # Настраиваем таблицу "Значения": модель регистров выбранного кадра,
+        # выпадающий список типа создается делегатом только при редактировании
+        self.values_model = ValuesModel(self.register_profiles, self)
+        self.ValuesTable.setModel(self.values_model)
+        self.ValuesTable.setItemDelegateForColumn(TYPE_COLUMN, RegisterTypeDelegate(self.ValuesTable))
+        self.ValuesTable.setEditTriggers(
+            QAbstractItemView.EditTrigger.CurrentChanged | QAbstractItemView.EditTrigger.SelectedClicked
+            | QAbstractItemView.EditTrigger.DoubleClicked)
+        self.pushButton_save_types.clicked.connect(self.on_save_types_clicked)
+        self.pushButton_load_types.clicked.connect(self.on_load_types_clicked)
         values_header = self.ValuesTable.horizontalHeader()
         values_header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
         values_header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
         values_header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
 
+        # Таблица "Регистры": текущие значения из образа регистров, обновляются только изменившиеся строки
+        self.registers_model = RegistersModel(self.register_image, self.register_profiles, self.sniffer_model, self)
+        self.RegistersTable.setModel(self.registers_model)
+        self.RegistersTable.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.RegistersTable.setWordWrap(False)
+        registers_vertical_header = self.RegistersTable.verticalHeader()
+        registers_vertical_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        registers_vertical_header.setDefaultSectionSize(self.RegistersTable.fontMetrics().height() + 8)
+        self.RegistersTable.horizontalHeader().setStretchLastSection(True)
+        # Смена типа в окне "Значения" меняет и текст значений в "Регистрах"
+        self.values_model.dataChanged.connect(self.registers_model.types_changed)
+        self.dockWidget_Values.raise_()
+
+        # График истории регистров, выбранных в "Значениях" или "Регистрах"
+        self.TrendPlot.history = self.register_history
+        self.TrendPlot.session = self.sniffer_model
+        for label, window_ns in TREND_WINDOWS:
+            self.comboBox_trend_window.addItem(label, window_ns)
+        self.comboBox_trend_window.setCurrentIndex(1)
+        self.comboBox_trend_window.currentIndexChanged.connect(
+            lambda: self.TrendPlot.set_window(self.comboBox_trend_window.currentData()))
+        self.ValuesTable.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.ValuesTable.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.ValuesTable.selectionModel().selectionChanged.connect(self.on_values_selected)
+        self.RegistersTable.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.RegistersTable.selectionModel().selectionChanged.connect(self.on_registers_selected)
+
         # Настройки таблицы: видимые заголовки всегда и корректная ширина колонок
         header = self.SnifferTable.horizontalHeader()
         header.setSectionsMovable(False)
         header.setSectionsClickable(False)
         header.setStretchLastSection(True)
         # По умолчанию тянем все секции по ширине окна
-        for i in range(self.SnifferTable.columnCount()):
+        for i in range(self.sniffer_model.columnCount()):
             header.setSectionResizeMode(i, QHeaderView.ResizeMode.Stretch)
         # Для колонки "Количество регистров/байт" (колонка 6) устанавливаем минимальную ширину для читаемости ошибок
         header.setMinimumSectionSize(200)
         # Устанавливаем отдельную минимальную ширину для колонки 6
         header.resizeSection(6, max(200, header.sectionSize(6)))
-        # Включаем перенос текста для ячеек (особенно для сообщений об ошибках)
-        self.SnifferTable.setWordWrap(True)
-        # Включаем автоматическое изменение высоты строки для переноса текста
-        self.SnifferTable.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        # Строки фиксированной высоты: представление не измеряет содержимое строк,
+        # длинный текст ошибки обрезается и доступен во всплывающей подсказке
+        self.SnifferTable.setWordWrap(False)
+        vertical_header = self.SnifferTable.verticalHeader()
+        vertical_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vertical_header.setDefaultSectionSize(self.SnifferTable.fontMetrics().height() + 8)
         
         # Настройка выделения строки
         self.SnifferTable.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
@@ -149,8 +243,8 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
         # Устанавливаем стартовые/минимальные ширины по длине заголовков
         fm = self.SnifferTable.fontMetrics()
-        for i in range(self.SnifferTable.columnCount()):
-            text = self.SnifferTable.horizontalHeaderItem(i).text() if self.SnifferTable.horizontalHeaderItem(i) else ""
+        for i in range(self.sniffer_model.columnCount()):
+            text = self.sniffer_model.headerData(i, Qt.Orientation.Horizontal) or ""
             min_w = max(80, fm.horizontalAdvance(text) + 24)  # небольшой отступ
             header.resizeSection(i, min_w)
         header.setMinimumSectionSize(60)
@@ -214,11 +308,18 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             self.comboBox_COM.clear()  # Очищаем ComboBox
             if ports:
                 self.comboBox_COM.addItems(ports)  # Добавляем найденные порты
+                if len(ports) > 1:
+                    self.comboBox_COM.addItem(ALL_PORTS)
         except (ValueError, Exception):
             # Если порты не найдены, просто оставляем ComboBox пустым
             # Ошибка будет показана только при попытке подключения
             self.comboBox_COM.clear()
 
+    def com_port_names(self):
+        """Имена COM-портов из comboBox_COM (без пункта "Все порты")"""
+        return [self.comboBox_COM.itemText(i) for i in range(self.comboBox_COM.count())
+                if self.comboBox_COM.itemText(i) != ALL_PORTS]
+
     def convert_parity(self, parity_text):
         """Преобразует текст четности в константу serial"""
         parity_map = {
@@ -241,13 +342,8 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         if self.scanning_active:
             # Остановка сканирования
             self.scanning_active = False
-            # Закрываем текущий тестовый порт, если он открыт
-            if self.current_test_port:
-                try:
-                    self.current_test_port.close()
-                except:
-                    pass
-                self.current_test_port = None
+            for scanner in self.scanners:
+                scanner.stop()
             self.pushButton_scan.setText("Сканирование сети")
             self.label_scan_status.setText("")
             return
@@ -269,9 +365,18 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         # Показываем label статуса
         self.label_scan_status.setVisible(True)
         self.label_scan_status.setText("Начало сканирования...")
+        if com_port == ALL_PORTS:
+            # Все порты сканируются одновременно, в статусе - имя порта
+            com_ports = self.com_port_names()
+            self.scanners = [
+                BusScanner(port, status=lambda text, port=port: self.scan_signals.status_update.emit(f"{port}: {text}"))
+                for port in com_ports]
+        else:
+            com_ports = [com_port]
+            self.scanners = [BusScanner(com_port, status=self.scan_signals.status_update.emit)]
         self.scan_thread = threading.Thread(
             target=self.scan_network_parameters,
-            args=(com_port,),
+            args=(com_ports,),
             daemon=True
         )
         self.scan_thread.start()
@@ -285,6 +390,18 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         """Обновляет текст кнопки сканирования (вызывается из сигнала)"""
         self.pushButton_scan.setText(text)
     
+    def on_ports_scan_finished(self, found):
+        """Завершение сканирования всех портов: запоминает параметры и подключает найденные порты"""
+        self.port_settings = found
+        parity_short = {serial.PARITY_NONE: "N", serial.PARITY_EVEN: "E", serial.PARITY_ODD: "O"}
+        self.label_scan_status.setText("Найдено: " + ", ".join(
+            f"{port} {baudrate}-{bytesize}-{parity_short[parity]}-{stopbits}"
+            for port, (baudrate, bytesize, parity, stopbits) in found.items()))
+        self.comboBox_COM.setCurrentText(ALL_PORTS)
+        self.scan_successful = True
+        # Автоматически подключаемся через 500 мс
+        QTimer.singleShot(500, self.on_connect_clicked)
+
     def on_scan_finished(self, success, baudrate, bytesize, parity, stopbit):
         """Обработка завершения сканирования (вызывается из сигнала)"""
         if success:
@@ -315,160 +432,34 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             self.label_scan_status.setText("")
             QMessageBox.warning(self, "Сканирование", "Не обнаружен обмен")
     
-    def format_parity_short(self, parity_text):
-        """Преобразует текст четности в короткий формат"""
-        parity_map = {
-            "Нет": "N",
-            "Четный": "E",
-            "Нечетный": "O"
-        }
-        return parity_map.get(parity_text, "N")
-    
-    def update_scan_status(self, baudrate, bytesize, parity_text, stop_bit_text):
-        """Обновляет статус сканирования в UI через сигнал"""
-        parity_short = self.format_parity_short(parity_text)
-        status_text = f"Подключение {baudrate}-{bytesize}-{parity_short}-{stop_bit_text}"
-        # Используем сигнал для безопасного обновления из потока
-        self.scan_signals.status_update.emit(status_text)
-    
-    def scan_network_parameters(self, com_port):
-        """Сканирует параметры сети для указанного COM порта"""
-        # Все возможные комбинации параметров
-        # Используем стандартные скорости Modbus
-        baudrates = [9600, 19200, 38400, 57600, 115200, 230400, 460800, 921600]
-        bytesizes = [7, 8]
-        parities = ["Нет", "Четный", "Нечетный"]
-        stopbits_list = ["1", "2"]
-        
-        # Перебираем все комбинации, начиная со скорости
-        for baudrate in baudrates:
-            if not self.scanning_active:
-                break
-            
-            for bytesize in bytesizes:
-                if not self.scanning_active:
-                    break
-                
-                for parity_text in parities:
-                    if not self.scanning_active:
-                        break
-                    
-                    for stop_bit_text in stopbits_list:
-                        if not self.scanning_active:
-                            break
-                        
-                        # Преобразуем параметры
-                        parity = self.convert_parity(parity_text)
-                        stopbits = self.convert_stopbits(stop_bit_text)
-                        
-                        # Обновляем статус сканирования через сигнал
-                        self.update_scan_status(baudrate, bytesize, parity_text, stop_bit_text)
-                        # Небольшая пауза для обработки события обновления UI
-                        import time
-                        time.sleep(0.05)
-                        
-                        # Пытаемся подключиться с этими параметрами
-                        test_port = None
-                        try:
-                            test_port = serial.Serial(
-                                port=com_port,
-                                baudrate=baudrate,
-                                bytesize=bytesize,
-                                parity=parity,
-                                stopbits=stopbits,
-                                timeout=2.0  # Таймаут для чтения
-                            )
-                            
-                            # Сохраняем ссылку на порт для возможности закрытия при остановке
-                            self.current_test_port = test_port
-                            
-                            # Очищаем буфер порта
-                            test_port.reset_input_buffer()
-                            
-                            # Читаем сообщения в течение 2 секунд
-                            valid_messages_count = 0
-                            total_messages_count = 0
-                            start_time = datetime.now()
-                            test_queue = queue.Queue()
-                            
-                            # Запускаем поток чтения
-                            test_read_thread = threading.Thread(
-                                target=read_from_com,
-                                args=(test_port, test_queue),
-                                daemon=True
-                            )
-                            test_read_thread.start()
-                            
-                            # Проверяем сообщения в течение 2 секунд
-                            while (datetime.now() - start_time).total_seconds() < 2.0:
-                                if not self.scanning_active:
-                                    break
-                                
-                                try:
-                                    message_hex = test_queue.get(timeout=0.1)
-                                    message_bytes = bytes.fromhex(message_hex)
-                                    if len(message_bytes) >= 4:
-                                        total_messages_count += 1
-                                        frame = Frame(message_bytes)
-                                        if frame.CRC_ok:
-                                            valid_messages_count += 1
-                                except queue.Empty:
-                                    continue
-                                except Exception:
-                                    pass
-                            
-                            # После завершения 2 секунд проверяем процент валидных сообщений
-                            if total_messages_count > 0:
-                                valid_percentage = (valid_messages_count / total_messages_count) * 100
-                                # Если процент валидных сообщений >= 80% - параметры найдены
-                                if valid_percentage >= 80.0:
-                                    # Закрываем тестовый порт (поток чтения закроется автоматически)
-                                    try:
-                                        test_port.close()
-                                    except:
-                                        pass
-                                    self.current_test_port = None
-                                    
-                                    # Останавливаем сканирование
-                                    self.scanning_active = False
-                                    
-                                    # Отправляем сигналы о успешном завершении с найденными параметрами
-                                    self.scan_signals.status_update.emit("Параметры найдены!")
-                                    self.scan_signals.button_update.emit("Сканирование сети")
-                                    self.scan_signals.scan_finished.emit(
-                                        True,  # success
-                                        str(baudrate),
-                                        str(bytesize),
-                                        parity_text,
-                                        stop_bit_text
-                                    )
-                                    
-                                    return
-                            
-                            # Закрываем тестовый порт (поток чтения закроется автоматически)
-                            try:
-                                test_port.close()
-                            except:
-                                pass
-                            self.current_test_port = None
-                            
-                        except Exception:
-                            # Ошибка подключения с этими параметрами - пробуем следующие
-                            if test_port:
-                                try:
-                                    test_port.close()
-                                except:
-                                    pass
-                            self.current_test_port = None
-                            continue
-        
-        # Если дошли сюда - правильные параметры не найдены
-        if self.scanning_active:
-            self.scanning_active = False
+    def scan_network_parameters(self, com_ports):
+        """Сканирует параметры сети указанных COM портов одновременно (в потоке сканирования)"""
+        results = scan_ports(self.scanners)
+        if not self.scanning_active:
+            # Сканирование остановлено пользователем
+            return
+        self.scanning_active = False
+        self.scan_signals.button_update.emit("Сканирование сети")
+        if len(com_ports) > 1:
+            found = {port: result for port, result in results.items() if result is not None}
+            if found:
+                self.scan_signals.status_update.emit("Параметры найдены!")
+                self.scan_signals.ports_scan_finished.emit(found)
+            else:
+                self.scan_signals.status_update.emit("")
+                self.scan_signals.scan_finished.emit(False, "", "", "", "")
+            return
+        result = results.get(com_ports[0])
+        if result is None:
             # Отправляем сигнал о неудачном завершении
             self.scan_signals.status_update.emit("")
-            self.scan_signals.button_update.emit("Сканирование сети")
             self.scan_signals.scan_finished.emit(False, "", "", "", "")
+            return
+        baudrate, bytesize, parity, stopbits = result
+        parity_text = {serial.PARITY_NONE: "Нет", serial.PARITY_EVEN: "Четный", serial.PARITY_ODD: "Нечетный"}[parity]
+        # Отправляем сигналы об успешном завершении с найденными параметрами
+        self.scan_signals.status_update.emit("Параметры найдены!")
+        self.scan_signals.scan_finished.emit(True, str(baudrate), str(bytesize), parity_text, str(stopbits))
 
     def on_connect_clicked(self):
         """Обработка нажатия кнопки подключения"""
@@ -477,26 +468,10 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             # Сбрасываем флаг после использования
             self.scan_successful = False
         
-        # Закрываем тестовый порт сканирования, если он открыт
-        if self.current_test_port:
-            try:
-                if self.current_test_port.is_open:
-                    self.current_test_port.close()
-            except:
-                pass
-            self.current_test_port = None
-        
-        # Закрываем существующий порт, если он открыт
-        if self.serial_port:
-            try:
-                if self.serial_port.is_open:
-                    self.serial_port.close()
-            except:
-                pass
-            self.serial_port = None
+        # Закрываем открытые порты захвата
+        self.stop_captures()
         
         # Небольшая задержка для освобождения порта системой
-        import time
         time.sleep(0.2)
         
         if not self.is_connected:
@@ -532,570 +507,545 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                     QMessageBox.warning(self, "Ошибка", error_msg)
                     return
                 
-                # Открываем COM-порт с параметрами из выпадающих списков
-                self.serial_port = serial.Serial(
-                    port=com_port,
-                    baudrate=baud_rate,
-                    bytesize=bytesize,
-                    parity=parity,
-                    stopbits=stopbits,
-                    timeout=None
-                )
-                
-                # Проверяем, что параметры применились корректно
-                if (self.serial_port.baudrate != baud_rate or 
-                    self.serial_port.bytesize != bytesize or 
-                    self.serial_port.parity != parity or 
-                    self.serial_port.stopbits != stopbits):
-                    warning_msg = (f"Параметры порта установлены некорректно.\n"
-                                 f"Ожидалось: {baud_rate}, {bytesize}, {parity}, {stopbits}\n"
-                                 f"Установлено: {self.serial_port.baudrate}, {self.serial_port.bytesize}, "
-                                 f"{self.serial_port.parity}, {self.serial_port.stopbits}")
-                    QMessageBox.warning(self, "Предупреждение", warning_msg)
+                if com_port == ALL_PORTS:
+                    # Порты, найденные сканированием, - со своими параметрами,
+                    # без сканирования - все порты с параметрами из выпадающих списков
+                    port_params = dict(self.port_settings) or {
+                        name: (baud_rate, bytesize, parity, stopbits) for name in self.com_port_names()}
+                else:
+                    port_params = {com_port: (baud_rate, bytesize, parity, stopbits)}
                 
-                # Очищаем буфер порта после открытия
-                self.serial_port.reset_input_buffer()
-                self.serial_port.reset_output_buffer()
+                # Открываем порты; недоступные пропускаем, если открылся хотя бы один
+                errors = []
+                for name, params in port_params.items():
+                    try:
+                        self.captures.append(self.open_capture(name, *params))
+                    except (serial.SerialException, OSError, ValueError) as e:
+                        errors.append(f"{name}: {e}")
+                if not self.captures:
+                    raise serial.SerialException("\n".join(errors))
                 
                 self.is_connected = True
                 
-                # Запускаем поток для чтения из COM порта
-                self.read_thread = threading.Thread(
-                    target=read_from_com,
-                    args=(self.serial_port, self.message_queue),
-                    daemon=True
-                )
-                self.read_thread.start()
-                
-                # Запускаем поток для декодирования сообщений
-                self.decode_thread = threading.Thread(
-                    target=self.decode_messages,
-                    daemon=True
-                )
-                self.decode_thread.start()
-                self.connected_at = datetime.now()
-                self.skip_first_invalid_crc = True
+                # Поток декодирования - единственный потребитель message_queue, второй не запускаем
+                if self.decode_thread is None or not self.decode_thread.is_alive():
+                    self.decode_thread = threading.Thread(
+                        target=self.decode_messages,
+                        daemon=True
+                    )
+                    self.decode_thread.start()
+                self.connected_at_ns = time.monotonic_ns()
+                # Одна привязка к настенным часам на сессию, времена кадров - монотонные
+                self.sniffer_model.clock = SessionClock()
+                self.port_symbol_time_ns = {capture.port: capture.symbol_time_ns for capture in self.captures}
+                self.matchers = {capture.port: TransactionMatcher(capture.symbol_time_ns) for capture in self.captures}
+                self.skip_first_invalid_crc = {capture.port for capture in self.captures}
+                self.SnifferTable.setColumnHidden(PORT_COLUMN, len(self.sniffer_model.port_names) < 2)
                 # Сбрасываем флаг ожидания первого запроса при новом подключении
                 self.waiting_for_first_request = True
+                # Запускаем потоки чтения портов (событийный режим без опроса)
+                for capture in self.captures:
+                    capture.start()
                 self.pushButton_connect.setText("Отключиться")
-                QMessageBox.information(self, "Успех", f"Подключено к {com_port}")
+                message = "Подключено к " + ", ".join(capture.ser.port for capture in self.captures)
+                if errors:
+                    message += "\n\nНе удалось открыть:\n" + "\n".join(errors)
+                QMessageBox.information(self, "Успех", message)
                 
             except Exception as e:
                 QMessageBox.critical(self, "Ошибка подключения", str(e))
-                if self.serial_port:
-                    try:
-                        self.serial_port.close()
-                    except:
-                        pass
-                    self.serial_port = None
+                self.stop_captures()
         else:
             # Отключение
             try:
-                if self.serial_port:
-                    self.serial_port.close()
-                    self.serial_port = None
-                # Ждем завершения потоков
-                if self.decode_thread and self.decode_thread.is_alive():
-                    # Поток завершится сам, так как serial_port закрыт
-                    pass
+                if self.replay is not None:
+                    self.stop_replay()
+                    return
                 self.is_connected = False
                 self.pushButton_connect.setText("Подключение")
                 QMessageBox.information(self, "Информация", "Отключено от COM-порта")
             except Exception as e:
                 QMessageBox.warning(self, "Ошибка отключения", str(e))
 
+    def open_capture(self, name, baud_rate, bytesize, parity, stopbits):
+        """
+        Открывает порт для захвата.
+
+        :return: PortCapture (поток чтения еще не запущен)
+        """
+        ser = serial.Serial(
+            port=name,
+            baudrate=baud_rate,
+            bytesize=bytesize,
+            parity=parity,
+            stopbits=stopbits,
+            timeout=None
+        )
+        
+        # Проверяем, что параметры применились корректно
+        if (ser.baudrate != baud_rate or 
+            ser.bytesize != bytesize or 
+            ser.parity != parity or 
+            ser.stopbits != stopbits):
+            warning_msg = (f"Параметры порта {name} установлены некорректно.\n"
+                         f"Ожидалось: {baud_rate}, {bytesize}, {parity}, {stopbits}\n"
+                         f"Установлено: {ser.baudrate}, {ser.bytesize}, "
+                         f"{ser.parity}, {ser.stopbits}")
+            QMessageBox.warning(self, "Предупреждение", warning_msg)
+        
+        # Очищаем буфер порта после открытия
+        ser.reset_input_buffer()
+        ser.reset_output_buffer()
+        return PortCapture(self.port_index(name), ser, self.message_queue, MESSAGE_QUEUE_SIZE, MESSAGE_QUEUE_POLICY)
+
+    def port_index(self, name):
+        """Номер порта для записей FrameRecord: постоянный для имени порта в течение работы программы"""
+        port_names = self.sniffer_model.port_names
+        if name not in port_names:
+            port_names.append(name)
+        return port_names.index(name)
+
+    def stop_captures(self):
+        """Закрывает порты захвата (потоки чтения завершаются сами)"""
+        captures, self.captures = self.captures, []
+        for capture in captures:
+            capture.stop()
+
+    def symbol_time(self, port):
+        """Время передачи символа на порту"""
+        return self.port_symbol_time_ns.get(port, self.symbol_time_ns)
+
+    def port_matcher(self, port):
+        """TransactionMatcher порта (создается при первом кадре порта)"""
+        matcher = self.matchers.get(port)
+        if matcher is None:
+            matcher = self.matchers[port] = TransactionMatcher(self.symbol_time(port))
+        return matcher
+
     def decode_messages(self):
         """Декодирует сообщения из очереди в отдельном потоке"""
         while True:
             try:
                 # Проверяем, подключены ли мы
                 if not self.is_connected:
-                    import time
                     time.sleep(0.1)
                     continue
                 
-                # Получаем сообщение из очереди с таймаутом
-                message_hex = self.message_queue.get(timeout=0.1)
+                # Получаем запись из очереди с таймаутом
+                record = self.message_queue.get(timeout=0.1)
                 try:
-                    message_bytes = bytes.fromhex(message_hex)
-                    if len(message_bytes) >= 4:  # Минимум адрес + функция + CRC (2 байта)
-                        # Создаем объект Frame (декодирование в отдельном потоке)
-                        frame = Frame(message_bytes)
-                        
-                        # Фильтр некорректных CRC в течение 1 секунды после подключения
-                        if self.connected_at is not None:
-                            time_since_connect = (datetime.now() - self.connected_at).total_seconds()
-                            if time_since_connect < 1.0 and not frame.CRC_ok:
-                                continue
-                            # После 1 секунды отключаем этот фильтр
-                            if time_since_connect >= 1.0:
-                                self.connected_at = None
-                        
-                        # Старый одноразовый фильтр (на случай очень раннего пакета)
-                        if self.skip_first_invalid_crc:
-                            if not frame.CRC_ok:
-                                self.skip_first_invalid_crc = False
-                                continue
-                            self.skip_first_invalid_crc = False
-                        
-                        # Кладим декодированное сообщение в очередь для обработки в GUI потоке
-                        try:
-                            self.decoded_queue.put_nowait((frame, message_bytes))  # Неблокирующая вставка
-                        except queue.Full:
-                            # Если очередь переполнена - пропускаем сообщение (GUI поток слишком медленный)
-                            pass
+                    # Склеенные адаптером кадры делим по границам CRC перед декодированием
+                    for part_record in self.resync_record(record):
+                        self.decode_record(part_record)
                 except Exception:
-                    # Ошибка декодирования - пропускаем
-                    pass
+                    # Ошибка разбора одной записи - пропускаем запись, поток продолжает работу
+                    self.records_failed += 1
+                self.records_decoded += 1
             except queue.Empty:
                 continue
             except Exception:
                 # Порт закрыт или другая ошибка - выходим из цикла
                 break
+
+    def resync_record(self, record):
+        """Делит запись с неверной CRC на несколько кадров (склейка кадров USB-адаптером)"""
+        return resync_record(record, self.symbol_time(record.port))
+
+    def decode_record(self, record):
+        """Декодирует одну запись и передает кадр в очередь GUI потока"""
+        try:
+            message_bytes = record.data
+            if len(message_bytes) >= 4:  # Минимум адрес + функция + CRC (2 байта)
+                # Создаем объект Frame (декодирование в отдельном потоке)
+                frame = Frame(message_bytes)
+                
+                # Фильтр некорректных CRC в течение 1 секунды после подключения
+                # (по времени захвата кадра, а не по времени извлечения из очереди)
+                if self.connected_at_ns is not None:
+                    time_since_connect = (record.timestamp_ns - self.connected_at_ns) / 1e9
+                    if time_since_connect < 1.0 and not frame.CRC_ok:
+                        return
+                    # После 1 секунды отключаем этот фильтр
+                    if time_since_connect >= 1.0:
+                        self.connected_at_ns = None
+                
+                # Старый одноразовый фильтр (на случай очень раннего пакета)
+                if record.port in self.skip_first_invalid_crc:
+                    self.skip_first_invalid_crc.discard(record.port)
+                    if not frame.CRC_ok:
+                        return
+                
+                # Кладим декодированное сообщение в очередь для обработки в GUI потоке
+                try:
+                    decoded = frame.decode()
+                    # Уточняем направление кадра и связываем ответ с запросом
+                    transaction = self.port_matcher(record.port).feed(decoded, record.timestamp_ns)
+                    # Запись в файл - разделенные и разобранные кадры с флагами разбора (как в cli)
+                    recorder = self.recorder
+                    if recorder is not None:
+                        recorder.record(record, frame_flags(decoded))
+                    self.decoded_queue.put((decoded, record, transaction))  # Переполнение - по политике очереди
+                except queue.Full:
+                    # Если очередь переполнена - пропускаем сообщение (GUI поток слишком медленный)
+                    pass
+        except Exception:
+            # Ошибка декодирования - пропускаем
+            pass
     
     def process_decoded_messages(self):
-        """Обрабатывает декодированные сообщения из очереди и добавляет в таблицу"""
-        # Обрабатываем батчами для оптимизации (максимум 20 сообщений за раз)
-        max_batch_size = 20
-        processed_count = 0
+        """
+        Обрабатывает декодированные сообщения из очереди и добавляет в таблицу.
+
+        За тик таймера очередь разбирается не дольше DRAIN_BUDGET_S, все
+        изменения таблицы передаются модели одним пакетом. Если отставание
+        отображения от захвата превышает DEGRADE_LAG_NS, повторы существующих
+        строк только увеличивают счетчики и время (без сохранения кадра).
+        """
+        deadline = time.perf_counter() + DRAIN_BUDGET_S
+        counters_only = self.ingest_lag_ns > DEGRADE_LAG_NS
+        last_record = None
         
+        self.sniffer_model.begin_batch()
         try:
-            while processed_count < max_batch_size:
+            while time.perf_counter() < deadline:
                 try:
                     # Используем get_nowait для неблокирующего получения
-                    frame, message_bytes = self.decoded_queue.get_nowait()
-                    processed_count += 1
+                    decoded, record, transaction = self.decoded_queue.get_nowait()
                 except queue.Empty:
                     break
+                last_record = record
                 
-                # Проверяем, нужно ли ждать первого запроса
-                # Оптимизация: определяем тип сообщения без полного get_list() где возможно
-                base_function = frame.function & 0x7F
-                
-                # Быстрое определение типа для функций чтения (1-4)
-                if base_function in (0x01, 0x02, 0x03, 0x04):
-                    # Для функций чтения: если data[0] == длина данных-1 - это ответ
-                    if len(frame.data) > 1 and frame.data[0] == len(frame.data) - 1:
-                        message_type_value = "Ответ"
-                    else:
-                        message_type_value = "Запрос"
-                else:
-                    # Для остальных функций используем полный get_list (нужно для функций 5,6,15,16)
-                    row_data = frame.get_list()
-                    message_type_value = str(row_data[2]) if len(row_data) > 2 else "Запрос"
+                # Образ регистров обновляется всеми кадрами, в том числе до первого запроса
+                self.register_image.apply(
+                    decoded, transaction.request if transaction is not None else None, record.timestamp_ns, record.port)
                 
+                # Проверяем, нужно ли ждать первого запроса
                 if self.waiting_for_first_request:
                     # Если это ответ - отбрасываем его
-                    if message_type_value == "Ответ":
+                    if decoded.direction == Direction.RESPONSE:
                         continue
                     # Если это запрос с хорошей CRC - начинаем выводить
-                    if message_type_value == "Запрос" and frame.CRC_ok:
+                    if decoded.crc_ok:
                         self.waiting_for_first_request = False
                 
                 # Добавляем/обновляем строку
-                self.add_or_update_row(frame, message_bytes)
-                self.last_message_time = datetime.now()
-        except queue.Empty:
-            pass
+                self.add_or_update_row(decoded, record, transaction, counters_only)
         except Exception:
             # Ошибка обработки - пропускаем
             pass
+        finally:
+            self.sniffer_model.end_batch()
+            self.registers_model.refresh()
+        
+        if last_record is not None:
+            self.last_message_time = datetime.now()
+            # Правый край графиков идет за захватом и без изменений значений
+            self.register_history.time_ns = last_record.timestamp_ns
+            # Отставание отображения: от захвата последнего обработанного кадра до сейчас
+            # (при ускоренном воспроизведении время кадров опережает часы)
+            self.ingest_lag_ns = max(time.monotonic_ns() - last_record.timestamp_ns, 0)
+        elif self.decoded_queue.empty():
+            self.ingest_lag_ns = 0
+        if self.replay is not None and self.replay.finished:
+            self.check_replay_done()
+        self.update_ingest_status(counters_only)
+
+    def update_ingest_status(self, counters_only=False):
+        """Индикатор отставания отображения от захвата"""
+        text = f"В очереди: {self.decoded_queue.qsize()}   Отставание: {self.ingest_lag_ns // 1_000_000} мс"
+        # Точные потери по участкам конвейера: порт -> декодирование и декодирование -> таблица
+        text += f"   Потеряно: при чтении {self.message_queue.dropped}, при отображении {self.decoded_queue.dropped}"
+        if self.records_failed:
+            text += f", ошибок разбора {self.records_failed}"
+        if counters_only:
+            text += "   (перегрузка: обновляются только счетчики)"
+        if self.recorder is not None:
+            text += f"   Запись: {self.recorder.frame_count} кадров"
+            if self.recorder.dropped:
+                text += f" (потеряно {self.recorder.dropped})"
+        if self.replay is not None:
+            text += f"   Воспроизведено: {self.replay.sent} кадров"
+        elif self.replay_result is not None:
+            frames, seconds = self.replay_result
+            text += f"   Воспроизведение: {frames} кадров за {seconds:.2f} с ({frames / max(seconds, 1e-9):.0f} кадров/с)"
+        if text != self.label_ingest_status.text():
+            self.label_ingest_status.setText(text)
+
+    def on_record_toggled(self, checked):
+        """Начинает или завершает запись захвата в файл"""
+        if not checked:
+            recorder, self.recorder = self.recorder, None
+            if recorder is not None:
+                recorder.stop()
+                self.update_ingest_status()
+            return
+        default_name = datetime.now().strftime("capture_%Y%m%d_%H%M%S.mbcap")
+        path, _ = QFileDialog.getSaveFileName(self, "Запись захвата", default_name, "Захват Modbus (*.mbcap)")
+        if not path:
+            self.pushButton_record.setChecked(False)
+            return
+        try:
+            self.recorder = CaptureRecorder(path, int(self.comboBox_baudrate.currentText()), self.sniffer_model.clock)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Ошибка записи", str(e))
+            self.pushButton_record.setChecked(False)
+
+    def on_replay_clicked(self):
+        """Запускает воспроизведение захвата или дампа из файла либо останавливает текущее"""
+        if self.replay is not None:
+            self.stop_replay()
+            return
+        if self.is_connected:
+            QMessageBox.warning(self, "Воспроизведение", "Сначала отключитесь от COM-порта")
+            return
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Воспроизведение", "", "Захват Modbus (*.mbcap);;Дамп с временем (*.txt *.log);;Все файлы (*)")
+        if not path:
+            return
+        speeds = {"1x": 1.0, "10x": 10.0, "100x": 100.0, "Максимальная": None}
+        speed_text, ok = QInputDialog.getItem(self, "Воспроизведение", "Скорость:", list(speeds), 0, False)
+        if not ok:
+            return
+        try:
+            # Скорость порта для дампа - из настроек подключения (файл захвата хранит свою)
+            source = open_source(path, int(self.comboBox_baudrate.currentText()))
+            self.start_replay(Replay(*source, speed=speeds[speed_text]))
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Ошибка воспроизведения", str(e))
+
+    def start_replay(self, replay):
+        """Подключает воспроизведение к конвейеру вместо COM-порта"""
+        self.replay = replay
+        self.replay_result = None
+        self.replay_base = (self.records_decoded, self.message_queue.dropped)
+        self.symbol_time_ns = 11 * 1_000_000_000 // replay.baudrate
+        self.port_symbol_time_ns = {}
+        self.matchers = {}
+        self.sniffer_model.clock = replay.clock
+        # Записанные кадры выводим все: фильтр помех после подключения не нужен
+        self.connected_at_ns = None
+        self.skip_first_invalid_crc = set()
+        self.waiting_for_first_request = True
+        self.is_connected = True
+        buffer = self.message_queue.add(MESSAGE_QUEUE_SIZE, MESSAGE_QUEUE_POLICY)
+        threading.Thread(target=self.run_replay, args=(replay, buffer), daemon=True).start()
+        self.pushButton_replay.setText("Остановить")
+        self.pushButton_connect.setText("Отключиться")
+
+    def run_replay(self, replay, buffer):
+        """Цель потока воспроизведения: свой буфер в группе message_queue, закрывается по окончании"""
+        try:
+            replay.run(buffer, self.replay_backlog)
+        finally:
+            self.message_queue.close(buffer)
+
+    def replay_backlog(self):
+        """Конвейер заполнен наполовину: воспроизведение на максимальной скорости ждет, а не теряет кадры"""
+        return self.message_queue.qsize() + self.decoded_queue.qsize() >= self.decoded_queue.capacity // 2
+
+    def check_replay_done(self):
+        """
+        Завершает воспроизведение, когда все выданные кадры прошли через
+        поток декодирования и таблицу; время - от первого кадра до этого момента.
+        """
+        records_base, dropped_base = self.replay_base
+        decoded = self.records_decoded - records_base + self.message_queue.dropped - dropped_base
+        if decoded < self.replay.sent or not self.decoded_queue.empty():
+            return
+        self.replay_result = (self.replay.sent, (time.monotonic_ns() - self.replay.started_ns) / 1e9)
+        self.stop_replay()
+
+    def stop_replay(self):
+        """Останавливает воспроизведение и отключает конвейер"""
+        self.replay.stop()
+        self.replay = None
+        self.is_connected = False
+        self.pushButton_replay.setText("Воспроизведение")
+        self.pushButton_connect.setText("Подключение")
+
+    def closeEvent(self, event):
+        """Закрывает файл записи захвата при выходе"""
+        if self.recorder is not None:
+            self.pushButton_record.setChecked(False)
+        super().closeEvent(event)
+
+    def add_or_update_row(self, decoded: DecodedFrame, record, transaction: Transaction = None, counters_only=False):
+        """
+        Добавляет или обновляет строку под сообщение (направление уже определено TransactionMatcher)
 
-    def add_or_update_row(self, frame: Frame, message_bytes: bytes):
-        """Добавляет или обновляет строку под сообщение"""
-        row_data = frame.get_list()
-        message_type_value = str(row_data[2]) if len(row_data) > 2 else None
-        now = datetime.now()
+        :param counters_only: Для существующих строк обновлять только счетчик и время, не сохраняя кадр
+        """
+        frame = decoded.frame
+        message_bytes = record.data
+        # Все времена - монотонное время захвата кадра потоком чтения, а не время обработки в GUI
+        captured_ns = record.timestamp_ns
 
         # Ключи для поиска существующих строк
-        base_function = frame.function & 0x7F  # для исключений (MSB=1) ищем по базовой функции
-        is_exception = (frame.function & 0x80) != 0
-        
-        # Кэшируем hex для оптимизации (используется несколько раз)
-        message_hex = message_bytes.hex()
-        
-        # Для функций 5 и 6 нужно проверить, является ли это ответом
-        # Определяем по наличию соответствующего запроса или по порядку поступления
-        # Важно: изменяем тип только для функций 5 и 6, для остальных используем тип из decode.py
-        if base_function in (0x05, 0x06) and len(frame.data) == 4:
-            # Создаем ключ для отслеживания одинаковых сообщений
-            write_key = (frame.address, base_function, frame.data)
-            
-            # Проверяем, есть ли запрос с такими же данными (эхо запроса)
-            if message_hex in self.request_index_by_bytes:
-                # Это ответ на ранее полученный запрос
-                message_type_value = "Ответ"
-                row_data[2] = "Ответ"
-            else:
-                # Проверяем, сколько раз уже приходило такое же сообщение
-                if write_key not in self.write_single_message_count:
-                    self.write_single_message_count[write_key] = 0
-                self.write_single_message_count[write_key] += 1
-                
-                # Если это второе одинаковое сообщение - первое было запросом, это ответ
-                if self.write_single_message_count[write_key] == 2:
-                    message_type_value = "Ответ"
-                    row_data[2] = "Ответ"
-                    # Для функции 6: когда приходит второе сообщение, нужно обновить счетчик запроса
-                    # Запрос уже должен быть в request_index_by_bytes, так как сообщения обрабатываются последовательно
-                    # Но если его там нет - значит это первое сообщение еще не было обработано
-                    # В этом случае просто обрабатываем как ответ, запрос будет обработан позже
-                # Для первого сообщения (счетчик == 1) оставляем тип "Запрос" из decode.py
-        
-        if message_type_value == "Запрос":
-            req_key = message_bytes.hex()
+        base_function = decoded.base_function  # для исключений (MSB=1) ищем по базовой функции
+        port = record.port
+        af_key = (port, frame.address, base_function)
+        # Номер регистра первого значения в данных: для ответа на чтение - из запроса транзакции
+        first_register = value_start(decoded, transaction.request if transaction is not None else None)
+        
+        if decoded.direction == Direction.REQUEST:
+            req_key = (port, message_bytes)
             # Запоминаем время последнего запроса по адресу и функции
-            self.last_request_time_by_af[(frame.address, base_function)] = now
-            # Для функций 5 и 6 также запоминаем время по конкретному запросу
-            if base_function in (0x05, 0x06) and len(frame.data) == 4:
-                self.last_request_time_by_key[req_key] = now
+            self.last_request_time_by_af[af_key] = captured_ns + len(message_bytes) * self.symbol_time(port)
             # Если такой запрос уже есть — обновляем время и счетчик
             if req_key in self.request_index_by_bytes:
-                row_position = self.request_index_by_bytes[req_key]
-                # Увеличиваем счетчик сообщений
-                if req_key not in self.message_counters:
-                    self.message_counters[req_key] = 0
-                self.message_counters[req_key] += 1
-                # Обновляем Время и счетчик
-                time_item = QTableWidgetItem(now.strftime("%H:%M:%S.%f")[:-3])
-                time_item.setBackground(QColor(215, 228, 242))  # запрос — светло-синий
-                counter_item = QTableWidgetItem(str(self.message_counters[req_key]))
-                counter_item.setBackground(QColor(215, 228, 242))
-                self.SnifferTable.setItem(row_position, 1, time_item)
-                self.SnifferTable.setItem(row_position, 0, counter_item)
+                row_id = self.request_index_by_bytes[req_key]
+                self.frame_store.update_row(row_id, captured_ns)
+                self.sniffer_model.row_changed(row_id)
                 # Фильтры применяются только при изменении пользователем, не при каждом обновлении
                 return
             pending_req_key = req_key
-        elif message_type_value == "Ответ":
-            # Подпись ответа: все поля кроме Счетчика, Времени и Данных (по колонкам)
-            crc_hex = ' '.join(f'{b:02x}' for b in row_data[9]) if isinstance(row_data[9], bytes) else str(row_data[9])
-            signature_tuple = (
-                row_data[2],  # Тип сообщения
-                row_data[3],  # Адрес
-                row_data[4],  # Функция
-                row_data[5],  # Адрес первого регистра / '-'
-                row_data[6],  # Кол-во регистров/байт
-                row_data[7],  # Количество байт далее (для функций 15, 16)
-                crc_hex,      # CRC как строка
-                row_data[10],  # CRC_OK
-            )
-            resp_key = str(signature_tuple)
-            
-            # Для функций 5 и 6: время ответа отсчитывается от последнего запроса с такими же данными
-            # Для остальных функций: время от последнего запроса по (адрес, функция)
-            delta_ms = None
-            if base_function in (0x05, 0x06) and len(frame.data) == 4:
-                # Для функций 5 и 6 ищем время последнего запроса с такими же данными
-                if message_hex in self.last_request_time_by_key:
-                    # Используем время конкретного запроса (последнего с такими же данными)
-                    delta = now - self.last_request_time_by_key[message_hex]
-                    delta_ms = int(delta.total_seconds() * 1000)
-                elif (frame.address, base_function) in self.last_request_time_by_af:
-                    # Если нет времени для конкретного запроса, используем общее время по адресу и функции
-                    delta = now - self.last_request_time_by_af[(frame.address, base_function)]
-                    delta_ms = int(delta.total_seconds() * 1000)
-            else:
-                # Для остальных функций используем стандартную логику
-                if (frame.address, base_function) in self.last_request_time_by_af:
-                    delta = now - self.last_request_time_by_af[(frame.address, base_function)]
-                    delta_ms = int(delta.total_seconds() * 1000)
-            
-            time_display = f"+{delta_ms} ms" if delta_ms is not None else now.strftime("%H:%M:%S.%f")[:-3]
-
-            # Для функций 5 и 6: при получении ответа увеличиваем счетчик соответствующего запроса
-            if base_function in (0x05, 0x06) and len(frame.data) == 4:
-                if message_hex in self.request_index_by_bytes:
-                    # Запрос найден - увеличиваем его счетчик
-                    req_row_pos = self.request_index_by_bytes[message_hex]
-                    if message_hex not in self.message_counters:
-                        self.message_counters[message_hex] = 0
-                    self.message_counters[message_hex] += 1
-                    # Обновляем счетчик запроса в таблице (оптимизация: проверяем видимость строки)
-                    if not self.SnifferTable.isRowHidden(req_row_pos):
-                        counter_item = QTableWidgetItem(str(self.message_counters[message_hex]))
-                        counter_item.setBackground(QColor(215, 228, 242))
-                        self.SnifferTable.setItem(req_row_pos, 0, counter_item)
+        else:
+            # Подпись ответа: все поля кроме Счетчика, Времени и Данных (числовые значения)
+            resp_key = self.response_signature(decoded, port)
+            # Время ответа - от конца запроса до начала ответа: из транзакции TransactionMatcher,
+            # для несопоставленного ответа - от последнего предшествующего запроса по (адрес, функция)
+            latency_ns = NONE
+            if transaction is not None and transaction.latency_ns is not None:
+                latency_ns = transaction.latency_ns
+            elif captured_ns >= self.last_request_time_by_af.get(af_key, captured_ns + 1):
+                latency_ns = captured_ns - self.last_request_time_by_af[af_key]
 
             if resp_key in self.response_index_by_signature:
-                row_position = self.response_index_by_signature[resp_key]
-                # Увеличиваем счетчик сообщений
-                if resp_key not in self.message_counters:
-                    self.message_counters[resp_key] = 0
-                self.message_counters[resp_key] += 1
-                # Обновляем данные, время и счетчик
-                data_value = row_data[8]  # Данные теперь в колонке 8
-                if isinstance(data_value, bytes):
-                    data_text = ' '.join(f'{byte:02x}' for byte in data_value) if data_value else '-'
-                else:
-                    data_text = str(data_value)
-                data_item = QTableWidgetItem(data_text)
-                # Определяем цвет фона: красный для исключений, зеленый для обычных ответов
-                if is_exception:
-                    bg_color = QColor(255, 199, 206)  # ответ-исключение — светло-красный
-                else:
-                    bg_color = QColor(226, 239, 218)  # ответ — светло-зеленый
-                data_item.setBackground(bg_color)
-                time_item = QTableWidgetItem(time_display)
-                time_item.setBackground(bg_color)
-                counter_item = QTableWidgetItem(str(self.message_counters[resp_key]))
-                counter_item.setBackground(bg_color)
-                self.SnifferTable.setItem(row_position, 8, data_item)  # Данные теперь в колонке 8
-                self.SnifferTable.setItem(row_position, 1, time_item)
-                self.SnifferTable.setItem(row_position, 0, counter_item)
-                
+                row_id = self.response_index_by_signature[resp_key]
+                # Обновляем данные (последний кадр), время и счетчик
+                frame_id = None
+                if not counters_only:
+                    frame_id = self.frame_store.replace_frame(self.frame_store.row_frame[row_id], decoded, captured_ns, first_register)
+                self.frame_store.update_row(row_id, captured_ns, frame_id, latency_ns)
+                self.sniffer_model.row_changed(row_id)
                 # Фильтры применяются только при изменении пользователем, не при каждом обновлении
-                
-                # Обновляем сохраненные данные сообщения
-                try:
-                    if isinstance(data_value, bytes):
-                        self.message_data_storage[row_position] = (data_value, frame)
-                    else:
-                        # Парсим из строки
-                        hex_bytes = data_text.replace(' ', '')
-                        if len(hex_bytes) % 2 == 0:
-                            data_bytes_parsed = bytes.fromhex(hex_bytes)
-                            self.message_data_storage[row_position] = (data_bytes_parsed, frame)
-                except Exception:
-                    pass
-                
                 return
             pending_resp_key = resp_key
 
-        # Сохраняем данные сообщения для окна "Значения" перед добавлением строки
-        data_bytes = None
-        if message_type_value == "Ответ":
-            # Для ответов функций чтения данные начинаются после байта количества
-            if base_function in (0x01, 0x02, 0x03, 0x04) and len(frame.data) > 1:
-                data_bytes = frame.data[1:]  # пропускаем байт количества
-            elif base_function in (0x05, 0x06):
-                # Для функций 5 и 6 ответ содержит значение (2 байта после адреса)
-                if len(frame.data) >= 4:
-                    data_bytes = frame.data[2:4]  # значение (2 байта)
-            else:
-                data_bytes = frame.data
-        else:
-            # Для запросов функций чтения данные начинаются после первых 4 байт
-            if base_function in (0x01, 0x02, 0x03, 0x04) and len(frame.data) > 4:
-                data_bytes = frame.data[4:]
-            elif base_function in (0x05, 0x06):
-                # Для функций 5 и 6 запрос содержит значение (2 байта после адреса)
-                if len(frame.data) >= 4:
-                    data_bytes = frame.data[2:4]  # значение (2 байта)
-            elif base_function in (0x0F, 0x10):
-                # Для функций 15 и 16 данные начинаются после адреса (2) + количества (2) + байта количества (1)
-                if len(frame.data) > 5:
-                    data_bytes = frame.data[5:]  # значения после байта количества
-            else:
-                data_bytes = frame.data
-
         # Если не обновляли — добавляем новую строку
-        if message_type_value == "Ответ":
-            # Ищем последний запрос с таким же адресом и базовой функцией
+        if decoded.direction == Direction.RESPONSE:
+            # Вставляем ответ под строкой его запроса из транзакции
             insert_after = None
-            if (frame.address, base_function) in self.last_request_row_by_af:
-                insert_after = self.last_request_row_by_af[(frame.address, base_function)]
-            else:
-                # Ищем в таблице последнюю строку-запрос с таким же адресом и базовой функцией
-                insert_after = self.find_last_request_row(frame.address, base_function)
+            if transaction is not None and transaction.request is not None:
+                insert_after = self.request_index_by_bytes.get((port, transaction.request.frame.message))
+            if insert_after is None:
+                # Ответ без сопоставленного запроса - под последним запросом с тем же адресом и функцией
+                insert_after = self.last_request_row_by_af.get(af_key)
             
             if insert_after is not None:
-                new_row_index = self.add_row_to_table(row_data, message_type_value, insert_row_index=insert_after + 1, data_bytes=data_bytes, frame=frame)
-                # Сдвигаем индексы из словарей после вставки
-                try:
-                    for k in list(self.request_index_by_bytes.keys()):
-                        if self.request_index_by_bytes[k] >= insert_after + 1:
-                            self.request_index_by_bytes[k] += 1
-                    for k in list(self.response_index_by_signature.keys()):
-                        if self.response_index_by_signature[k] >= insert_after + 1:
-                            self.response_index_by_signature[k] += 1
-                    for k in list(self.last_request_row_by_af.keys()):
-                        if self.last_request_row_by_af[k] >= insert_after + 1:
-                            self.last_request_row_by_af[k] += 1
-                except Exception:
-                    pass
+                # Идентификаторы строк постоянны - после вставки индексы не сдвигаются
+                new_row_id = self.add_row_to_table(decoded, record, insert_after=insert_after, first_register=first_register,
+                                                   latency_ns=latency_ns)
             else:
                 # Соответствующий запрос не найден
                 # Если таблица пустая, сохраняем ответ, иначе добавляем в конец
-                if self.SnifferTable.rowCount() == 0:
+                if self.frame_store.row_count == 0:
                     # Таблица пустая - сохраняем ответ во временном хранилище
-                    key = (frame.address, base_function)
-                    if key not in self.pending_responses:
-                        self.pending_responses[key] = []
-                    self.pending_responses[key].append((row_data, frame, message_bytes))
+                    if af_key not in self.pending_responses:
+                        self.pending_responses[af_key] = []
+                    self.pending_responses[af_key].append((decoded, record))
                     return  # Не добавляем ответ в таблицу, пока не появится запрос
                 else:
                     # В таблице уже есть строки - добавляем ответ в конец (возможно, запрос будет добавлен позже)
-                    new_row_index = self.add_row_to_table(row_data, message_type_value, data_bytes=data_bytes, frame=frame)
-                    try:
-                        self.response_index_by_signature[pending_resp_key] = new_row_index
-                    except Exception:
-                        pass
-                    # Сохраняем данные сообщения
-                    if data_bytes is not None:
-                        self.message_data_storage[new_row_index] = (data_bytes, frame)
+                    new_row_id = self.add_row_to_table(decoded, record, first_register=first_register, latency_ns=latency_ns)
+                    self.response_index_by_signature[pending_resp_key] = new_row_id
                     return
         else:
             # Для запросов добавляем в конец
-            new_row_index = self.add_row_to_table(row_data, message_type_value, data_bytes=data_bytes, frame=frame)
-        
-        # Сохраняем данные сообщения
-        if data_bytes is not None:
-            self.message_data_storage[new_row_index] = (data_bytes, frame)
+            new_row_id = self.add_row_to_table(decoded, record, first_register=first_register)
         
         # Зафиксируем индексы для последующих обновлений
         try:
-            if message_type_value == "Запрос":
-                self.request_index_by_bytes[pending_req_key] = new_row_index
-                self.last_request_row_by_af[(frame.address, base_function)] = new_row_index
-                # Инициализируем счетчик для нового запроса
-                if pending_req_key not in self.message_counters:
-                    self.message_counters[pending_req_key] = 1
+            if decoded.direction == Direction.REQUEST:
+                self.request_index_by_bytes[pending_req_key] = new_row_id
+                self.last_request_row_by_af[af_key] = new_row_id
                 # Проверяем, есть ли ожидающие ответы для этого запроса
-                key = (frame.address, base_function)
-                if key in self.pending_responses and self.pending_responses[key]:
+                if af_key in self.pending_responses and self.pending_responses[af_key]:
                     # Вставляем все ожидающие ответы сразу после запроса
-                    pending_list = self.pending_responses.pop(key)
-                    current_insert_after = new_row_index
-                    for pending_row_data, pending_frame, pending_msg_bytes in pending_list:
-                        self.add_or_update_row(pending_frame, pending_msg_bytes)
+                    pending_list = self.pending_responses.pop(af_key)
+                    for pending_decoded, pending_record in pending_list:
+                        self.add_or_update_row(pending_decoded, pending_record)
             else:
-                self.response_index_by_signature[pending_resp_key] = new_row_index
-                # Инициализируем счетчик для нового ответа
-                if pending_resp_key not in self.message_counters:
-                    self.message_counters[pending_resp_key] = 1
+                self.response_index_by_signature[pending_resp_key] = new_row_id
         except Exception:
             pass
 
-    def find_last_request_row(self, address, base_function):
-        """Ищет в таблице последнюю строку-запрос с указанным адресом и базовой функцией"""
-        for row in range(self.SnifferTable.rowCount() - 1, -1, -1):
-            try:
-                # Проверяем тип сообщения (колонка 2)
-                msg_type_item = self.SnifferTable.item(row, 2)
-                if msg_type_item and msg_type_item.text() == "Запрос":
-                    # Проверяем адрес (колонка 3)
-                    addr_item = self.SnifferTable.item(row, 3)
-                    # Проверяем функцию (колонка 4)
-                    func_item = self.SnifferTable.item(row, 4)
-                    if addr_item and func_item:
-                        try:
-                            row_addr = int(addr_item.text())
-                            row_func = int(func_item.text())
-                            row_base_func = row_func & 0x7F
-                            if row_addr == address and row_base_func == base_function:
-                                return row
-                        except (ValueError, AttributeError):
-                            continue
-            except Exception:
-                continue
-        return None
+    def response_signature(self, decoded, port=0):
+        """Подпись ответа для объединения одинаковых ответов в одну строку (кортеж чисел)"""
+        return (
+            port,
+            decoded.direction,
+            decoded.address,
+            decoded.function,
+            decoded.start_address,
+            decoded.quantity,
+            decoded.byte_count,
+            decoded.exception_code,
+            bytes(decoded.frame.received_crc),
+            decoded.crc_ok,
+        )
 
-    def add_row_to_table(self, row_data, message_type_value=None, insert_row_index=None, data_bytes=None, frame=None):
-        """Функция добавления новой строки к таблице"""
-        # Страхуемся на случай расхождения числа колонок и данных
-        try:
-            if self.SnifferTable.columnCount() < len(row_data):
-                self.SnifferTable.setColumnCount(len(row_data))
-        except Exception:
-            pass
-        # Получаем позицию вставки в таблице
-        if insert_row_index is None:
-            row_position = self.SnifferTable.rowCount()
-            self.SnifferTable.insertRow(row_position)
-        else:
-            row_position = insert_row_index
-            self.SnifferTable.insertRow(row_position)
-        
-        # Получаем текущее время
-        current_time = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        
-        # Для новой строки счетчик всегда 1 (счетчик инициализируется при добавлении индекса)
-        message_counter_value = 1
-        # Определяем тип для окраски строки
-        if message_type_value is None:
-            try:
-                message_type_value = str(row_data[2]) if len(row_data) > 2 else None
-            except Exception:
-                message_type_value = None
-        if message_type_value == "Запрос":
-            row_color = QColor(215, 228, 242)  # light blue background
-        elif message_type_value == "Ответ":
-            # Если это ответ-исключение (MSB функции = 1), красим в светло-красный
-            try:
-                func_val = int(row_data[4])
-            except Exception:
-                func_val = 0
-            if (func_val & 0x80) != 0:
-                row_color = QColor(255, 199, 206)  # light red background
-            else:
-                row_color = QColor(226, 239, 218)  # light green background
-        else:
-            row_color = None
-        
-        # Заполняем ячейки новыми данными
-        for column, data in enumerate(row_data):
-            # Нулевая колонка - счетчик уникальных сообщений
-            if column == 0:
-                data = message_counter_value
-            # Первая колонка - время
-            elif column == 1:
-                data = current_time
-            
-            # Если data является байтовыми данными, преобразуем их в строку
-            if isinstance(data, bytes):  # Преобразуем байты в строку в шестнадцатеричном формате
-                data = ' '.join(f'{byte:02x}' for byte in data) 
-            else:  # остальные значения просто преобразовываем в строку
-                data = str(data)
-            item = QTableWidgetItem(data)  # Создаем новый элемент для ячейки
-            if row_color is not None:
-                item.setBackground(row_color)
-            # Включаем перенос текста для колонки "Количество регистров/байт" (колонка 6) для сообщений об ошибках
-            if column == 6:
-                item.setTextAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-                # Убеждаемся, что перенос текста включен для этой ячейки
-                item.setFlags(item.flags() | Qt.ItemFlag.ItemIsEnabled)
-            self.SnifferTable.setItem(row_position, column, item)  # Устанавливаем элемент в таблицу
-            # После добавления всех ячеек в строке обновляем высоту строки, если в колонке 6 длинный текст
-            if column == len(row_data) - 1:  # Последняя колонка в строке
-                col6_item = self.SnifferTable.item(row_position, 6)
-                if col6_item:
-                    col6_text = col6_item.text()
-                    # Проверяем, содержит ли текст "Ошибка:" или длиннее 15 символов
-                    if "Ошибка:" in col6_text or len(col6_text) > 15:
-                        # Принудительно обновляем высоту строки для переноса текста
-                        self.SnifferTable.resizeRowToContents(row_position)
+    def values_data(self, decoded):
+        """Возвращает байты значений для окна "Значения" или None, если значений нет"""
+        base_function = decoded.base_function
+        if base_function in (0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x17) or (
+                base_function in (0x0F, 0x10) and decoded.direction == Direction.REQUEST):
+            # Для функций чтения/записи берем данные значений после служебных полей
+            return decoded.payload if decoded.payload else None
+        # Для остальных функций (и ответов 15, 16) - все данные кадра
+        return decoded.frame.data
 
-        # Обновляем списки фильтров (адрес и функция)
-        # Колонка 3 - адрес, колонка 4 - функция
-        if len(row_data) > 3:
-            try:
-                address_str = str(row_data[3])
-                # Проверяем, есть ли уже такой адрес в списке
-                if address_str and self.comboBox_filter_address.findText(address_str) == -1:
-                    self.comboBox_filter_address.addItem(address_str)
-            except Exception:
-                pass
-        
-        if len(row_data) > 4:
-            try:
-                func_val = int(row_data[4])
-                # Для ошибок берем базовую функцию (без MSB)
-                base_func = func_val & 0x7F
-                func_str = str(base_func)
-                # Проверяем, есть ли уже такая функция в списке
-                if func_str and self.comboBox_filter_function.findText(func_str) == -1:
-                    self.comboBox_filter_function.addItem(func_str)
-            except Exception:
-                pass
+    def row_values_data(self, row_id):
+        """Байты значений для окна "Значения" по последнему кадру строки таблицы"""
+        store = self.frame_store
+        frame_id = store.row_frame[row_id]
+        if not store.frame_payload_length[frame_id]:
+            # В колонке "Данные" прочерк - значений нет
+            return None
+        direction = Direction.RESPONSE if store.frame_flags[frame_id] & FLAG_RESPONSE else Direction.REQUEST
+        # Кадр повторно разбирается из хранилища только при выборе строки
+        data = self.values_data(Frame(store.message(frame_id)).decode(direction))
+        return bytes(data) if data else None
+
+    def row_values_location(self, row_id):
+        """
+        Расположение данных значений последнего кадра строки в регистрах ведомого.
 
-        # Сохраняем данные сообщения для окна "Значения"
-        if data_bytes is not None and frame is not None:
-            self.message_data_storage[row_position] = (data_bytes, frame)
+        :return: (slave, space, start) или None (не регистры или адрес неизвестен)
+        """
+        store = self.frame_store
+        frame_id = store.row_frame[row_id]
+        space = register_space(store.frame_function[frame_id])
+        start = store.frame_value_start[frame_id]
+        if space is None or start == NONE:
+            return None
+        return store.frame_address[frame_id], space, start
 
-        # Применяем фильтры к новой строке
-        self.apply_filters()
+    def add_row_to_table(self, decoded, record, insert_after=None, first_register=None, latency_ns=NONE):
+        """
+        Функция добавления новой строки к таблице
 
-        return row_position
+        :param insert_after: Идентификатор строки, под которой вставить новую (None - в конец)
+        :param first_register: Номер регистра первого значения в данных кадра (None - неизвестен)
+        :param latency_ns: Время ответа по меткам захвата (NONE - показывать время)
+        :return: Постоянный идентификатор новой строки
+        """
+        # Кадр и строка сохраняются в колоночном хранилище, текст ячеек формирует модель
+        frame_id = self.frame_store.append_frame(decoded, record.timestamp_ns, record.port, first_register)
+        row_id = self.frame_store.add_row(frame_id, record.timestamp_ns, latency_ns)
+        self.sniffer_model.insert_row(row_id, insert_after)
+
+        # Обновляем списки фильтров (адрес и функция)
+        address_str = str(decoded.address)
+        if self.comboBox_filter_address.findText(address_str) == -1:
+            self.comboBox_filter_address.addItem(address_str)
+        # Для ошибок берем базовую функцию (без MSB)
+        func_str = str(decoded.base_function)
+        if self.comboBox_filter_function.findText(func_str) == -1:
+            self.comboBox_filter_function.addItem(func_str)
+
+        # Новая строка проверяется активным фильтром при вставке в модель
+        return row_id
 
     def process_pending_responses(self):
         """Обрабатывает ожидающие ответы: проверяет наличие запросов и вставляет оставшиеся в конец"""
@@ -1113,7 +1063,6 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         # Проверяем каждую группу ожидающих ответов
         keys_to_process = list(self.pending_responses.keys())
         for key in keys_to_process:
-            address, base_function = key
             pending_list = self.pending_responses.get(key, [])
             if not pending_list:
                 continue
@@ -1122,9 +1071,9 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             if key in self.last_request_row_by_af:
                 # Запрос найден - вставляем ответы после него
                 insert_after = self.last_request_row_by_af[key]
-                for pending_row_data, pending_frame, pending_msg_bytes in pending_list:
+                for pending_decoded, pending_record in pending_list:
                     try:
-                        self.add_or_update_row(pending_frame, pending_msg_bytes)
+                        self.add_or_update_row(pending_decoded, pending_record)
                     except Exception:
                         pass
                 # Удаляем обработанную группу
@@ -1133,28 +1082,11 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                 # Запроса все еще нет - если прошло достаточно времени, вставляем ответы в конец
                 if time_since_last >= 2.0:  # 2 секунды без новых сообщений
                     # Вставляем все ожидающие ответы в конец таблицы
-                    for pending_row_data, pending_frame, pending_msg_bytes in pending_list:
+                    for pending_decoded, pending_record in pending_list:
                         try:
-                            pending_row_data_local = pending_frame.get_list()
-                            pending_message_type = str(pending_row_data_local[2]) if len(pending_row_data_local) > 2 else None
-                            new_row_index = self.add_row_to_table(pending_row_data_local, pending_message_type)
+                            new_row_id = self.add_row_to_table(pending_decoded, pending_record)
                             # Сохраняем индекс для последующих обновлений
-                            try:
-                                pending_crc_hex = ' '.join(f'{b:02x}' for b in pending_row_data_local[9]) if isinstance(pending_row_data_local[9], bytes) else str(pending_row_data_local[9])
-                                pending_signature = (
-                                    pending_row_data_local[2],  # Тип сообщения
-                                    pending_row_data_local[3],  # Адрес
-                                    pending_row_data_local[4],  # Функция
-                                    pending_row_data_local[5],  # Адрес первого регистра / '-'
-                                    pending_row_data_local[6],  # Кол-во регистров/байт
-                                    pending_row_data_local[7],  # Количество байт далее (для функций 15, 16)
-                                    pending_crc_hex,
-                                    pending_row_data_local[10],  # CRC_OK
-                                )
-                                pending_resp_key = str(pending_signature)
-                                self.response_index_by_signature[pending_resp_key] = new_row_index
-                            except Exception:
-                                pass
+                            self.response_index_by_signature[self.response_signature(pending_decoded, pending_record.port)] = new_row_id
                         except Exception:
                             pass
                     # Удаляем обработанную группу
@@ -1184,62 +1116,8 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             except ValueError:
                 filter_function = None
         
-        for row in range(self.SnifferTable.rowCount()):
-            # Проверяем CRC_OK (колонка 10)
-            crc_ok_item = self.SnifferTable.item(row, 10)
-            crc_ok_value = False
-            if crc_ok_item:
-                try:
-                    crc_ok_text = str(crc_ok_item.text()).lower()
-                    crc_ok_value = crc_ok_text in ('true', '1', 'да')
-                except Exception:
-                    crc_ok_value = False
-            
-            # Проверяем, является ли сообщение ошибкой (колонка 4 - Функция)
-            is_error = False
-            func_item = self.SnifferTable.item(row, 4)
-            func_val = None
-            if func_item:
-                try:
-                    func_val = int(func_item.text())
-                    is_error = (func_val & 0x80) != 0
-                except Exception:
-                    is_error = False
-            
-            # Проверяем адрес (колонка 3)
-            address_val = None
-            address_item = self.SnifferTable.item(row, 3)
-            if address_item:
-                try:
-                    address_val = int(address_item.text())
-                except Exception:
-                    address_val = None
-            
-            # Определяем, должна ли строка быть видимой
-            should_show = True
-            
-            # Фильтр по CRC_OK: скрывать невалидные CRC
-            if filter_crc_ok and not crc_ok_value:
-                should_show = False
-            
-            # Фильтр по ошибкам: показывать только ошибки
-            if filter_errors_only and not is_error:
-                should_show = False
-            
-            # Фильтр по адресу
-            if filter_address is not None and address_val is not None:
-                if address_val != filter_address:
-                    should_show = False
-            
-            # Фильтр по функции (с учетом ошибок - для ошибок проверяем базовую функцию)
-            if filter_function is not None and func_val is not None:
-                # Для ошибок берем базовую функцию (без MSB)
-                base_func_val = func_val & 0x7F
-                if base_func_val != filter_function:
-                    should_show = False
-            
-            # Применяем видимость
-            self.SnifferTable.setRowHidden(row, not should_show)
+        # Видимость строк считает модель по колонкам хранилища, текст ячеек не разбирается
+        self.sniffer_model.set_filter(filter_crc_ok, filter_errors_only, filter_address, filter_function)
 
     def reset_all_filters(self):
         """Сбрасывает все фильтры к значениям по умолчанию"""
@@ -1256,8 +1134,11 @@ class MainWindow(QMainWindow, Ui_MainWindow):
     
     def clear_table(self):
         """Очищает таблицу Сниффер полностью и сбрасывает все счетчики и индексы"""
-        # Очищаем таблицу
-        self.SnifferTable.setRowCount(0)
+        # Очищаем таблицу и хранилище кадров
+        self.sniffer_model.clear()
+        self.frame_store.clear()
+        self.registers_model.clear()
+        self.register_history.clear()
         
         # Очищаем списки фильтров (оставляем только пустой элемент)
         self.comboBox_filter_address.clear()
@@ -1271,353 +1152,83 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.last_request_time_by_af.clear()
         self.last_request_row_by_af.clear()
         self.pending_responses.clear()
-        self.message_counters.clear()
+        for matcher in self.matchers.values():
+            matcher.reset()
         
         # Сбрасываем счетчики
-        self.message_counter = 0
         self.last_message_time = None
+        self.ingest_lag_ns = 0
         
         # Применяем фильтры (на случай, если они включены)
         self.apply_filters()
-        
-        # Очищаем хранилище данных
-        self.message_data_storage.clear()
-        self.register_types_storage.clear()
+
+        # Типы регистров не очищаются: они заданы для регистров ведомых, а не для строк
         
         # Сбрасываем флаг ожидания первого запроса после очистки
         self.waiting_for_first_request = True
 
+    def on_save_types_clicked(self):
+        """Сохраняет типы регистров ведомых в файл"""
+        path, _ = QFileDialog.getSaveFileName(self, "Сохранить типы регистров", "register_types.json", "Типы регистров (*.json)")
+        if not path:
+            return
+        try:
+            self.register_profiles.save(path)
+        except OSError as e:
+            QMessageBox.warning(self, "Ошибка сохранения", str(e))
+
+    def on_load_types_clicked(self):
+        """Загружает типы регистров ведомых из файла вместо текущих"""
+        path, _ = QFileDialog.getOpenFileName(self, "Загрузить типы регистров", "", "Типы регистров (*.json);;Все файлы (*)")
+        if not path:
+            return
+        try:
+            self.register_profiles.load(path)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Ошибка загрузки", str(e))
+            return
+        self.values_model.refresh()
+        self.registers_model.types_changed()
+
     def on_row_selected(self):
         """Обработчик выбора строки в таблице - заполняет окно "Значения" """
-        selected_rows = self.SnifferTable.selectedIndexes()
+        selected_rows = self.SnifferTable.selectionModel().selectedRows()
         if not selected_rows:
             # Очищаем окно значений, если ничего не выбрано
-            self.ValuesTable.setRowCount(0)
+            self.values_model.clear()
             return
         
-        # Берем первую выбранную строку
-        row_position = selected_rows[0].row()
-        
-        # Проверяем наличие данных в столбце "Данные" (колонка 8)
-        data_item = self.SnifferTable.item(row_position, 8)  # Данные теперь в колонке 8
-        if not data_item:
-            # Если ячейка не существует, показываем прочерк
-            self.ValuesTable.setRowCount(1)
-            self.ValuesTable.setItem(0, 0, QTableWidgetItem("-"))
-            self.ValuesTable.setItem(0, 1, QTableWidgetItem("-"))
-            self.ValuesTable.setItem(0, 2, QTableWidgetItem("-"))
-            # Убираем выпадающий список из колонки типов данных
-            self.ValuesTable.setCellWidget(0, 1, None)
-            return
-        
-        data_text = data_item.text().strip()
-        
-        # Проверяем, есть ли данные (не пустая строка и не прочерк)
-        if not data_text or data_text == "-" or data_text == "":
-            # Нет данных - показываем прочерк
-            self.ValuesTable.setRowCount(1)
-            self.ValuesTable.setItem(0, 0, QTableWidgetItem("-"))
-            self.ValuesTable.setItem(0, 1, QTableWidgetItem("-"))
-            self.ValuesTable.setItem(0, 2, QTableWidgetItem("-"))
-            # Убираем выпадающий список из колонки типов данных
-            self.ValuesTable.setCellWidget(0, 1, None)
-            return
+        # Берем первую выбранную строку (постоянный идентификатор строки хранилища)
+        row_id = self.sniffer_model.row_id(selected_rows[0].row())
         
-        # Получаем данные сообщения
-        data_bytes = None
-        frame = None
-        
-        if row_position in self.message_data_storage:
-            data_bytes, frame = self.message_data_storage[row_position]
-        else:
-            # Пытаемся получить данные из ячейки таблицы "Данные" (колонка 8)
-            try:
-                # Парсим hex строку вида "aa bb cc dd"
-                hex_bytes = data_text.replace(' ', '')
-                if len(hex_bytes) % 2 == 0 and len(hex_bytes) > 0:
-                    data_bytes = bytes.fromhex(hex_bytes)
-                else:
-                    # Невалидные данные - показываем прочерк
-                    self.ValuesTable.setRowCount(1)
-                    self.ValuesTable.setItem(0, 0, QTableWidgetItem("-"))
-                    self.ValuesTable.setItem(0, 1, QTableWidgetItem("-"))
-                    self.ValuesTable.setItem(0, 2, QTableWidgetItem("-"))
-                    # Убираем выпадающий список из колонки типов данных
-                    self.ValuesTable.setCellWidget(0, 1, None)
-                    return
-            except Exception:
-                # Ошибка парсинга - показываем прочерк
-                self.ValuesTable.setRowCount(1)
-                self.ValuesTable.setItem(0, 0, QTableWidgetItem("-"))
-                self.ValuesTable.setItem(0, 1, QTableWidgetItem("-"))
-                self.ValuesTable.setItem(0, 2, QTableWidgetItem("-"))
-                # Убираем выпадающий список из колонки типов данных
-                self.ValuesTable.setCellWidget(0, 1, None)
-                return
+        # Получаем данные значений из последнего кадра строки
+        data_bytes = self.row_values_data(row_id)
         
         if data_bytes is None or len(data_bytes) == 0:
             # Нет данных - показываем прочерк
-            self.ValuesTable.setRowCount(1)
-            self.ValuesTable.setItem(0, 0, QTableWidgetItem("-"))
-            self.ValuesTable.setItem(0, 1, QTableWidgetItem("-"))
-            self.ValuesTable.setItem(0, 2, QTableWidgetItem("-"))
-            # Убираем выпадающий список из колонки типов данных
-            self.ValuesTable.setCellWidget(0, 1, None)
+            self.values_model.set_frame(None)
             return
         
-        # Вычисляем количество регистров (по умолчанию количество байт / 2)
-        num_registers = len(data_bytes) // 2
-        
-        # Загружаем сохраненные типы для этого сообщения
-        if row_position not in self.register_types_storage:
-            self.register_types_storage[row_position] = ["Signed"] * num_registers
-        
-        register_types = self.register_types_storage[row_position]
-        
-        # Убеждаемся, что количество типов соответствует количеству регистров
-        while len(register_types) < num_registers:
-            register_types.append("Signed")
-        
-        # Заполняем таблицу регистров
-        self.ValuesTable.setRowCount(num_registers)
-        reserved_registers = set()  # Регистры, зарезервированные 4-байтными типами
-        
-        # Определяем зарезервированные регистры на основе сохраненных типов
-        for reg_idx in range(num_registers):
-            if reg_idx < len(register_types):
-                reg_type = register_types[reg_idx]
-                if reg_type in ["float (ABCD)", "float (CDAB)", "float (BADC)", "float (DCBA)", "long (ABCD)", "long (CDAB)", "long (BADC)", "long (DCBA)"]:
-                    # Этот регистр занимает 4 байта (2 регистра), следующий зарезервирован
-                    if reg_idx + 1 < num_registers:
-                        reserved_registers.add(reg_idx + 1)
-        
-        for reg_idx in range(num_registers):
-            # Колонка 0: номер регистра
-            reg_item = QTableWidgetItem(f"Регистр {reg_idx}")
-            if reg_idx in reserved_registers:
-                # Устанавливаем серый цвет для зарезервированных регистров
-                gray_color = QColor(220, 220, 220)  # Светло-серый цвет
-                reg_item.setBackground(gray_color)
-            reg_item.setFlags(reg_item.flags() | Qt.ItemFlag.ItemIsEnabled)
-            self.ValuesTable.setItem(reg_idx, 0, reg_item)
-            
-            # Колонка 1: выпадающий список типов данных
-            type_combo = QComboBox()
-            type_combo.addItems(["Signed", "Unsigned", "HEX", "Binary", "float (ABCD)", "float (CDAB)", "float (BADC)", "float (DCBA)", "long (ABCD)", "long (CDAB)", "long (BADC)", "long (DCBA)"])
-            
-            # Устанавливаем сохраненный тип
-            if reg_idx < len(register_types):
-                current_type = register_types[reg_idx]
-                index = type_combo.findText(current_type)
-                if index >= 0:
-                    type_combo.setCurrentIndex(index)
-            
-            # Если регистр зарезервирован - отключаем выбор типа
-            if reg_idx in reserved_registers:
-                type_combo.setEnabled(False)
-                reg_item.setFlags(reg_item.flags() & ~Qt.ItemFlag.ItemIsEnabled)
-                # Устанавливаем серый цвет для комбобокса (через стиль)
-                type_combo.setStyleSheet("background-color: rgb(220, 220, 220);")
-            else:
-                # Подключаем обработчик изменения типа
-                type_combo.currentTextChanged.connect(lambda text, r=reg_idx, rp=row_position: self.on_register_type_changed(rp, r, text))
-            
-            self.ValuesTable.setCellWidget(reg_idx, 1, type_combo)
-            
-            # Колонка 2: значение (будет заполнено после выбора типа)
-            value_item = QTableWidgetItem("")
-            if reg_idx in reserved_registers:
-                # Устанавливаем серый цвет для зарезервированных регистров
-                gray_color = QColor(220, 220, 220)
-                value_item.setBackground(gray_color)
-            self.ValuesTable.setItem(reg_idx, 2, value_item)
-        
-        # Обновляем значения для всех регистров
-        self.update_register_values(row_position, data_bytes)
-
-    def on_register_type_changed(self, row_position, reg_idx, new_type):
-        """Обработчик изменения типа данных регистра"""
-        # Получаем старый тип
-        old_type = None
-        if row_position in self.register_types_storage and reg_idx < len(self.register_types_storage[row_position]):
-            old_type = self.register_types_storage[row_position][reg_idx]
-        
-        # Сохраняем новый тип
-        if row_position not in self.register_types_storage:
-            self.register_types_storage[row_position] = []
-        
-        register_types = self.register_types_storage[row_position]
-        while len(register_types) <= reg_idx:
-            register_types.append("Signed")
-        
-        register_types[reg_idx] = new_type
-        
-        # Если старый тип был 4-байтным, а новый нет - разблокируем следующий регистр
-        if old_type and old_type in ["float (ABCD)", "float (CDAB)", "float (BADC)", "float (DCBA)", "long (ABCD)", "long (CDAB)", "long (BADC)", "long (DCBA)"]:
-            if new_type not in ["float (ABCD)", "float (CDAB)", "float (BADC)", "float (DCBA)", "long (ABCD)", "long (CDAB)", "long (BADC)", "long (DCBA)"]:
-                if reg_idx + 1 < self.ValuesTable.rowCount():
-                    next_combo = self.ValuesTable.cellWidget(reg_idx + 1, 1)
-                    if next_combo:
-                        next_combo.setEnabled(True)
-                next_item = self.ValuesTable.item(reg_idx + 1, 0)
-                if next_item:
-                    next_item.setText(f"Регистр {reg_idx + 1}")
-                    next_item.setFlags(next_item.flags() | Qt.ItemFlag.ItemIsEnabled)
-                    # Убираем серый цвет
-                    next_item.setBackground(QColor(255, 255, 255))
-                # Также обновляем цвет комбобокса и значения
-                next_combo = self.ValuesTable.cellWidget(reg_idx + 1, 1)
-                if next_combo:
-                    next_combo.setStyleSheet("")
-                next_value_item = self.ValuesTable.item(reg_idx + 1, 2)
-                if next_value_item:
-                    next_value_item.setBackground(QColor(255, 255, 255))
-        
-        # Если выбран 4-байтный тип, резервируем следующий регистр
-        if new_type in ["float (ABCD)", "float (CDAB)", "float (BADC)", "float (DCBA)", "long (ABCD)", "long (CDAB)", "long (BADC)", "long (DCBA)"]:
-            if reg_idx + 1 < self.ValuesTable.rowCount():
-                next_combo = self.ValuesTable.cellWidget(reg_idx + 1, 1)
-                if next_combo:
-                    next_combo.setEnabled(False)
-                    next_combo.setCurrentIndex(0)  # Сбрасываем на первый тип
-                next_item = self.ValuesTable.item(reg_idx + 1, 0)
-                if next_item:
-                    next_item.setText(f"Регистр {reg_idx + 1}")
-                    next_item.setFlags(next_item.flags() & ~Qt.ItemFlag.ItemIsEnabled)
-                    # Устанавливаем серый цвет для зарезервированного регистра
-                    gray_color = QColor(220, 220, 220)
-                    next_item.setBackground(gray_color)
-                # Также устанавливаем серый цвет для комбобокса и значения
-                next_combo.setStyleSheet("background-color: rgb(220, 220, 220);")
-                next_value_item = self.ValuesTable.item(reg_idx + 1, 2)
-                if next_value_item:
-                    next_value_item.setBackground(gray_color)
-        
-        # Обновляем значения
-        if row_position in self.message_data_storage:
-            data_bytes, _ = self.message_data_storage[row_position]
-            self.update_register_values(row_position, data_bytes)
-
-    def update_register_values(self, row_position, data_bytes):
-        """Обновляет значения регистров в окне "Значения" """
-        if row_position not in self.register_types_storage:
+        # Типы регистров - из профилей ведомого, значения кадра считаются один раз
+        self.values_port = self.frame_store.frame_port[self.frame_store.row_frame[row_id]]
+        self.values_model.set_frame(data_bytes, self.row_values_location(row_id))
+
+    def on_values_selected(self):
+        """Выбранные регистры окна "Значения" - на график"""
+        location = self.values_model.location
+        if location is None:
             return
-        
-        register_types = self.register_types_storage[row_position]
-        num_registers = len(data_bytes) // 2
-        
-        for reg_idx in range(min(num_registers, self.ValuesTable.rowCount())):
-            # Проверяем, не зарезервирован ли этот регистр предыдущим 4-байтным типом
-            if reg_idx > 0 and reg_idx - 1 < len(register_types):
-                prev_type = register_types[reg_idx - 1]
-                if prev_type in ["float (ABCD)", "float (CDAB)", "float (BADC)", "float (DCBA)", "long (ABCD)", "long (CDAB)", "long (BADC)", "long (DCBA)"]:
-                    # Этот регистр зарезервирован - оставляем пустым
-                    value_item = self.ValuesTable.item(reg_idx, 2)
-                    if value_item:
-                        value_item.setText("")
-                        # Убеждаемся, что серый цвет сохранен
-                        gray_color = QColor(220, 220, 220)
-                        value_item.setBackground(gray_color)
-                    continue
-            
-            if reg_idx >= len(register_types):
-                continue
-            
-            reg_type = register_types[reg_idx]
-            
-            # Получаем байты для регистра
-            if reg_type in ["float (ABCD)", "float (CDAB)", "float (BADC)", "float (DCBA)", "long (ABCD)", "long (CDAB)", "long (BADC)", "long (DCBA)"]:
-                # 4-байтный тип - берем 2 регистра (4 байта)
-                start_byte = reg_idx * 2
-                if start_byte + 3 < len(data_bytes):
-                    bytes_for_value = data_bytes[start_byte:start_byte + 4]
-                else:
-                    value_item = self.ValuesTable.item(reg_idx, 2)
-                    if value_item:
-                        value_item.setText("Недостаточно данных")
-                    continue
-            else:
-                # 2-байтный тип
-                start_byte = reg_idx * 2
-                if start_byte + 1 < len(data_bytes):
-                    bytes_for_value = data_bytes[start_byte:start_byte + 2]
-                else:
-                    value_item = self.ValuesTable.item(reg_idx, 2)
-                    if value_item:
-                        value_item.setText("Недостаточно данных")
-                    continue
-            
-            # Преобразуем значение в зависимости от типа
-            value_str = self.convert_register_value(bytes_for_value, reg_type, reg_idx, data_bytes)
-            
-            # Обновляем значение в таблице
-            value_item = self.ValuesTable.item(reg_idx, 2)
-            if value_item:
-                value_item.setText(value_str)
+        slave, space, start = location
+        rows = sorted(index.row() for index in self.ValuesTable.selectionModel().selectedRows())
+        if rows:
+            self.TrendPlot.set_keys([(self.values_port, slave, space, start + row) for row in rows])
+
+    def on_registers_selected(self):
+        """Выбранные строки таблицы "Регистры" - на график"""
+        rows = sorted(index.row() for index in self.RegistersTable.selectionModel().selectedRows())
+        if rows:
+            self.TrendPlot.set_keys([self.registers_model.key(row) for row in rows])
 
-    def convert_register_value(self, bytes_data, reg_type, reg_idx, all_data_bytes):
-        """Преобразует байты регистра в значение согласно типу"""
-        try:
-            if reg_type == "Signed":
-                if len(bytes_data) == 2:
-                    value = struct.unpack('>h', bytes_data)[0]  # big-endian signed short
-                    return str(value)
-            
-            elif reg_type == "Unsigned":
-                if len(bytes_data) == 2:
-                    value = struct.unpack('>H', bytes_data)[0]  # big-endian unsigned short
-                    return str(value)
-            
-            elif reg_type == "HEX":
-                if len(bytes_data) == 2:
-                    return f"0x{bytes_data[0]:02X}{bytes_data[1]:02X}"
-            
-            elif reg_type == "Binary":
-                if len(bytes_data) == 2:
-                    return f"{bytes_data[0]:08b} {bytes_data[1]:08b}"
-            
-            elif reg_type.startswith("float"):
-                if len(bytes_data) == 4:
-                    # Определяем порядок байт
-                    order = reg_type.split("(")[1].split(")")[0]
-                    reordered = self.reorder_bytes(bytes_data, order, reg_idx, all_data_bytes)
-                    # После переупорядочивания байты в формате big-endian
-                    value = struct.unpack('>f', reordered)[0]  # big-endian float
-                    return f"{value:.6f}"
-            
-            elif reg_type.startswith("long"):
-                if len(bytes_data) == 4:
-                    # Определяем порядок байт
-                    order = reg_type.split("(")[1].split(")")[0]
-                    reordered = self.reorder_bytes(bytes_data, order, reg_idx, all_data_bytes)
-                    # После переупорядочивания байты в формате big-endian
-                    value = struct.unpack('>l', reordered)[0]  # big-endian signed long
-                    return str(value)
-        
-        except Exception as e:
-            return f"Ошибка: {e}"
-        
-        return "Неизвестный тип"
-
-    def reorder_bytes(self, bytes_data, order, reg_idx, all_data_bytes):
-        """Переупорядочивает байты согласно порядку ABCD, CDAB, BADC, DCBA"""
-        # bytes_data содержит 4 байта для float/long
-        # order: ABCD, CDAB, BADC, DCBA
-        # ABCD - байты [0,1,2,3] (обычный порядок)
-        # CDAB - байты [2,3,0,1] (поменять местами регистры)
-        # BADC - байты [1,0,3,2] (поменять байты в каждом регистре)
-        # DCBA - байты [3,2,1,0] (полная инверсия)
-        
-        if order == "ABCD":
-            return bytes_data
-        elif order == "CDAB":
-            return bytes([bytes_data[2], bytes_data[3], bytes_data[0], bytes_data[1]])
-        elif order == "BADC":
-            return bytes([bytes_data[1], bytes_data[0], bytes_data[3], bytes_data[2]])
-        elif order == "DCBA":
-            return bytes([bytes_data[3], bytes_data[2], bytes_data[1], bytes_data[0]])
-        else:
-            return bytes_data
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
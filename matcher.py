@@ -0,0 +1,122 @@
+from decode import Direction, FUNCTIONS
+
+# Функции, ответ которых - эхо запроса (повтор запроса неотличим от ответа)
+ECHO_FUNCTIONS = frozenset((0x05, 0x06, 0x08, 0x15, 0x16))
+
+
+class Transaction:
+    """
+    Транзакция Modbus: запрос мастера и ответ ведомого.
+
+    request/response - DecodedFrame (response = None, пока ответ не пришел;
+    request = None для ответа без запроса), request_ns/response_ns - монотонное
+    время захвата кадров, latency_ns - пауза от конца запроса до начала ответа.
+    """
+    __slots__ = ('request', 'response', 'request_ns', 'response_ns', 'expected_length', 'latency_ns')
+
+    def __init__(self, request=None, request_ns=None, expected_length=None):
+        self.request = request
+        self.response = None
+        self.request_ns = request_ns
+        self.response_ns = None
+        self.expected_length = expected_length  # Ожидаемая длина ответа (None - переменная)
+        self.latency_ns = None
+
+    @property
+    def complete(self):
+        return self.request is not None and self.response is not None
+
+    def __repr__(self):
+        return (f"Transaction(request={self.request!r}, response={self.response!r}, "
+                f"latency_ns={self.latency_ns})")
+
+
+class TransactionMatcher:
+    """
+    Сопоставляет запросы и ответы по адресу ведомого.
+
+    Для каждого запроса по таблице функций decode.FUNCTIONS предсказывается
+    длина ответа; следующий кадр с тем же адресом и функцией (или исключение
+    на эту функцию) и подходящей длиной считается ответом, если это не повтор
+    того же запроса мастером (кроме функций с эхо-ответом). На адрес хранится
+    не более одной ожидающей транзакции, поэтому сопоставление выполняется
+    за O(1) и не зависит от количества отображаемых строк.
+    """
+
+    def __init__(self, symbol_time_ns=0):
+        """
+        :param symbol_time_ns: Время передачи одного символа для расчета конца запроса
+        """
+        self.symbol_time_ns = symbol_time_ns
+        self.pending = {}  # Ожидающие ответа транзакции: ключ = адрес ведомого
+
+    def reset(self):
+        """Сбрасывает все ожидающие транзакции"""
+        self.pending.clear()
+
+    def feed(self, decoded, timestamp_ns):
+        """
+        Обрабатывает очередной кадр в порядке захвата.
+
+        Уточняет decoded.direction (эхо-ответы функций 5, 6, 8, 15-16, 21, 22
+        неотличимы от запроса без контекста) и возвращает транзакцию, к которой
+        относится кадр.
+
+        :param decoded: DecodedFrame очередного кадра
+        :param timestamp_ns: Монотонное время захвата кадра
+        :return: Transaction
+        """
+        address = decoded.address
+        function = decoded.function
+        transaction = self.pending.get(address)
+        if transaction is not None and transaction.request.function == function & 0x7F:
+            expected_length = transaction.expected_length
+            if function & 0x80 or ((expected_length is None or expected_length == len(decoded.frame.message))
+                                   and not _is_repeat(transaction.request, decoded)):
+                # Кадр соответствует ожидаемому ответу
+                del self.pending[address]
+                if decoded.direction != Direction.RESPONSE:
+                    # Эхо-ответ или ответ, похожий на запрос: разбираем заново как ответ
+                    decoded.frame.decode_into(decoded, Direction.RESPONSE)
+                transaction.response = decoded
+                transaction.response_ns = timestamp_ns
+                if transaction.request_ns is not None and timestamp_ns is not None:
+                    request_end_ns = transaction.request_ns + len(transaction.request.frame.message) * self.symbol_time_ns
+                    transaction.latency_ns = timestamp_ns - request_end_ns
+                return transaction
+
+        spec = FUNCTIONS[function & 0x7F]
+        if decoded.direction == Direction.RESPONSE and not function & 0x80 and spec is not None:
+            # Без ожидающего запроса кадр, подходящий по длине под запрос, считаем запросом
+            # (например, запрос 01 с адресом 0x03xx неотличим от ответа на 3 байта)
+            message = decoded.frame.message
+            if spec.request_length(message, 0) == len(message):
+                decoded.frame.decode_into(decoded, Direction.REQUEST)
+
+        if decoded.direction == Direction.RESPONSE:
+            # Ответ без ожидающего запроса
+            transaction = Transaction()
+            transaction.response = decoded
+            transaction.response_ns = timestamp_ns
+            return transaction
+
+        expected_length = spec.predict_response(decoded) if spec is not None else None
+        transaction = Transaction(decoded, timestamp_ns, expected_length)
+        # На широковещательный запрос (адрес 0) ответа нет
+        if address != 0:
+            self.pending[address] = transaction
+        return transaction
+
+
+def _is_repeat(request, decoded):
+    """
+    Кадр - повтор ожидающего запроса (мастер повторил запрос до ответа), а не
+    ответ: совпадает с запросом побайтно или разбирается как запрос с теми же
+    адресом и количеством. Для функций с эхо-ответом не проверяется.
+    """
+    if request.function in ECHO_FUNCTIONS:
+        return False
+    if decoded.frame.message == request.frame.message:
+        return True
+    return (decoded.direction == Direction.REQUEST and decoded.start_address is not None
+            and decoded.start_address == request.start_address and decoded.quantity == request.quantity)
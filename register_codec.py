@@ -0,0 +1,149 @@
+"""
+Пакетное преобразование регистров Modbus для окна "Значения".
+
+Данные кадра разбираются сразу целиком для каждого используемого типа:
+одним вызовом struct.Struct.unpack_from на все регистры, а не по регистру.
+4-байтные типы (float, long) считаются для каждого начального регистра:
+окна с четных регистров - из данных со смещения 0, с нечетных - со
+смещения 2. Порядок байт сводится к порядку чтения и обмену байт в
+регистрах (BADC):
+    ABCD - big-endian          DCBA - little-endian
+    BADC - big-endian по данным с переставленными байтами регистров
+    CDAB - little-endian по данным с переставленными байтами регистров
+"""
+import struct
+
+REGISTER_TYPES = [
+    "Signed", "Unsigned", "HEX", "Binary",
+    "float (ABCD)", "float (CDAB)", "float (BADC)", "float (DCBA)",
+    "long (ABCD)", "long (CDAB)", "long (BADC)", "long (DCBA)",
+]
+DEFAULT_TYPE = "Signed"
+
+# Тип: (символ struct, порядок чтения, байты регистров переставлены, функция текста значения)
+_LAYOUTS = {
+    "Signed": ("h", ">", False, str),
+    "Unsigned": ("H", ">", False, str),
+    "HEX": ("H", ">", False, lambda value: f"0x{value:04X}"),
+    "Binary": ("H", ">", False, lambda value: f"{_BINARY[value >> 8]} {_BINARY[value & 0xFF]}"),
+}
+for _kind, _char, _format in (("float", "f", lambda value: f"{value:.6f}"), ("long", "l", str)):
+    _LAYOUTS[f"{_kind} (ABCD)"] = (_char, ">", False, _format)
+    _LAYOUTS[f"{_kind} (DCBA)"] = (_char, "<", False, _format)
+    _LAYOUTS[f"{_kind} (BADC)"] = (_char, ">", True, _format)
+    _LAYOUTS[f"{_kind} (CDAB)"] = (_char, "<", True, _format)
+
+# Типы, занимающие 2 регистра (следующий регистр зарезервирован)
+WIDE_TYPES = frozenset(reg_type for reg_type, layout in _LAYOUTS.items() if layout[0] in "fl")
+
+NOT_ENOUGH_DATA = "Недостаточно данных"
+
+_BINARY = [f"{byte:08b}" for byte in range(256)]
+
+# Скомпилированные struct.Struct по формату ('>125h', '<31f', ...)
+_structs = {}
+
+
+def _struct(fmt):
+    compiled = _structs.get(fmt)
+    if compiled is None:
+        compiled = _structs[fmt] = struct.Struct(fmt)
+    return compiled
+
+
+def register_width(reg_type):
+    """Число регистров, занимаемых значением типа"""
+    return 2 if reg_type in WIDE_TYPES else 1
+
+
+def register_value(data, reg_type):
+    """
+    Число значения типа reg_type с начала данных (для графиков).
+
+    :param data: Байты регистра (4 байта для 4-байтных типов)
+    :return: int или float; None - данных не хватает
+    """
+    layout = _LAYOUTS.get(reg_type)
+    if layout is None:
+        raise ValueError(f"Неизвестный тип: {reg_type}")
+    char, order, swapped, _ = layout
+    if len(data) < 2 * register_width(reg_type):
+        return None
+    return _unpack_column(data[:2 * register_width(reg_type)], char, order, swapped)[0]
+
+
+def _swap_register_bytes(data, length):
+    """Копия первых length байт с переставленными байтами в каждом регистре"""
+    swapped = bytearray(length)
+    swapped[0::2] = data[1:length:2]
+    swapped[1::2] = data[0:length:2]
+    return swapped
+
+
+def _unpack_column(data, char, order, swapped):
+    """
+    Числа для каждого регистра данных одним проходом struct: 2-байтные -
+    по регистрам, 4-байтные - с каждого регистра (None - данных не хватает).
+    """
+    count = len(data) // 2
+    if char in "hH":
+        return list(_struct(f"{order}{count}{char}").unpack_from(data))
+    source = _swap_register_bytes(data, count * 2) if swapped else data
+    even = _struct(f"{order}{count // 2}{char}").unpack_from(source, 0)
+    odd = _struct(f"{order}{(count - 1) // 2}{char}").unpack_from(source, 2) if count > 1 else ()
+    column = [None] * count
+    column[0:2 * len(even):2] = even
+    column[1:1 + 2 * len(odd):2] = odd
+    return column
+
+
+def decode_column(data, reg_type):
+    """
+    Значения типа reg_type для каждого регистра данных (значение
+    4-байтного типа начинается с этого регистра).
+
+    :param data: Байты значений кадра
+    :param reg_type: Тип из REGISTER_TYPES
+    :return: Список строк длиной len(data) // 2; None - данных не хватает
+    """
+    layout = _LAYOUTS.get(reg_type)
+    if layout is None:
+        raise ValueError(f"Неизвестный тип: {reg_type}")
+    char, order, swapped, fmt = layout
+    return [None if value is None else fmt(value) for value in _unpack_column(data, char, order, swapped)]
+
+
+def format_registers(data, register_types):
+    """
+    Текст значений всех регистров кадра по их типам.
+
+    Данные распаковываются один раз на каждый используемый формат struct
+    (HEX, Binary и Unsigned - общий), в текст переводятся только
+    показываемые значения. Регистр после 4-байтного типа зарезервирован
+    (пустая строка), как и регистры без заданного типа.
+
+    :param data: Байты значений кадра
+    :param register_types: Типы регистров по номеру (может быть короче данных)
+    :return: Список строк длиной len(data) // 2
+    """
+    count = len(data) // 2
+    columns = {}
+    values = []
+    previous = None
+    for reg_idx in range(count):
+        reg_type = register_types[reg_idx] if reg_idx < len(register_types) else None
+        if reg_type is None or previous in WIDE_TYPES:
+            values.append("")
+        else:
+            layout = _LAYOUTS.get(reg_type)
+            if layout is None:
+                raise ValueError(f"Неизвестный тип: {reg_type}")
+            char, order, swapped, fmt = layout
+            key = (char, order, swapped)
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = _unpack_column(data, char, order, swapped)
+            value = column[reg_idx]
+            values.append(NOT_ENOUGH_DATA if value is None else fmt(value))
+        previous = reg_type
+    return values
@@ -0,0 +1,306 @@
+"""
+История значений регистров для графиков.
+
+История пополняется из образа регистров (RegisterImage.listeners) только при
+изменении значения; между точками значение держится (ступенька). Регистр
+хранения или входной регистр записывается числом по типу из профилей
+(4-байтный тип - вместе со следующим регистром), катушка - 0/1. При смене
+типа регистра его история начинается заново.
+
+Для каждого регистра хранятся уровни разрешения: последние
+CHANGES_CAPACITY изменений как есть и корзины LEVELS фиксированной
+длительности с минимумом, максимумом и последним значением. Уровень -
+кольцо массивов, которые растут до своей емкости и затем перезаписываются
+по кругу, поэтому память регистра ограничена, а пустые интервалы места не
+занимают. Для графика берется самый
+подробный уровень, покрывающий окно, и его точки сводятся к корзинам
+min/max по ширине графика: 24 часа рисуются из 1440 минутных корзин, а не из
+всех опросов.
+"""
+import struct
+from array import array
+from bisect import bisect_right
+
+from register_codec import DEFAULT_TYPE, WIDE_TYPES, register_value
+from register_image import BIT_SPACES
+
+# Последних изменений, хранимых как есть
+CHANGES_CAPACITY = 1024
+
+# Уровни корзин: (длительность корзины, нс; емкость кольца)
+LEVELS = (
+    (1_000_000_000, 900),  # 15 минут
+    (10_000_000_000, 1440),  # 4 часа
+    (60_000_000_000, 1440),  # 24 часа
+)
+
+# Наибольшее число регистров с историей (новые регистры сверх него не записываются)
+MAX_SERIES = 1000
+
+_WORD = struct.Struct(">H")
+
+
+class _Changes:
+    """Кольцо последних изменений: время и значение"""
+
+    __slots__ = ('capacity', 'times', 'values', 'head')
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.times = array('q')
+        self.values = array('d')
+        self.head = 0  # Самое старое изменение заполненного кольца
+
+    def add(self, time_ns, value):
+        if len(self.times) < self.capacity:
+            self.times.append(time_ns)
+            self.values.append(value)
+            return
+        head = self.head
+        self.times[head] = time_ns
+        self.values[head] = value
+        self.head = (head + 1) % self.capacity
+
+    def covers(self, start_ns):
+        """Кольцо хранит все изменения от start_ns"""
+        return len(self.times) < self.capacity or self.times[self.head] <= start_ns
+
+    def ordered(self, column):
+        head = self.head
+        return column[head:] + column[:head] if head else column[:]
+
+    def columns(self):
+        """(times, mins, maxs, lasts) в порядке времени; у изменения все три значения равны"""
+        values = self.ordered(self.values)
+        return [self.ordered(self.times), values, values, values]
+
+
+class _Level:
+    """
+    Кольцо корзин одной длительности: начало, минимум, максимум, последнее
+    значение. Закрытая корзина сливается в уровень coarser, поэтому каждое
+    изменение попадает только в самый подробный уровень.
+    """
+
+    __slots__ = ('width_ns', 'capacity', 'coarser', 'times', 'mins', 'maxs', 'lasts', 'head',
+                 'open_time', 'open_min', 'open_max', 'open_last')
+
+    def __init__(self, width_ns, capacity, coarser=None):
+        self.width_ns = width_ns
+        self.coarser = coarser
+        self.capacity = capacity
+        self.times = array('q')
+        self.mins = array('d')
+        self.maxs = array('d')
+        self.lasts = array('d')
+        self.head = 0  # Самая старая точка заполненного кольца
+        self.open_time = None  # Начало текущей (незакрытой) корзины
+        self.open_min = self.open_max = self.open_last = 0.0
+
+    def add(self, time_ns, minimum, maximum, last):
+        """Добавляет значение или корзину более подробного уровня"""
+        bucket = time_ns - time_ns % self.width_ns
+        if bucket == self.open_time:
+            if minimum < self.open_min:
+                self.open_min = minimum
+            if maximum > self.open_max:
+                self.open_max = maximum
+            self.open_last = last
+            return
+        if self.open_time is not None:
+            self._push(self.open_time, self.open_min, self.open_max, self.open_last)
+            if self.coarser is not None:
+                self.coarser.add(self.open_time, self.open_min, self.open_max, self.open_last)
+        self.open_time = bucket
+        self.open_min = minimum
+        self.open_max = maximum
+        self.open_last = last
+
+    def _push(self, time_ns, minimum, maximum, last):
+        if len(self.times) < self.capacity:
+            self.times.append(time_ns)
+            self.mins.append(minimum)
+            self.maxs.append(maximum)
+            self.lasts.append(last)
+            return
+        head = self.head
+        self.times[head] = time_ns
+        self.mins[head] = minimum
+        self.maxs[head] = maximum
+        self.lasts[head] = last
+        self.head = (head + 1) % self.capacity
+
+    def covers(self, start_ns):
+        """Уровень хранит все точки от start_ns (кольцо не перезаписывало более поздние)"""
+        return len(self.times) < self.capacity or self.times[self.head] <= start_ns
+
+    def ordered(self, column):
+        """Столбец в порядке времени (без текущей корзины)"""
+        head = self.head
+        return column[head:] + column[:head] if head else column[:]
+
+    def columns(self, pending=()):
+        """
+        (times, mins, maxs, lasts) в порядке времени вместе с текущей корзиной.
+
+        :param pending: Текущие корзины более подробных уровней (еще не слитые
+            в этот уровень) в порядке времени
+        """
+        columns = [self.ordered(column) for column in (self.times, self.mins, self.maxs, self.lasts)]
+        times, mins, maxs, lasts = columns
+        width = self.width_ns
+        for time_ns, minimum, maximum, last in ((self.open_time, self.open_min, self.open_max, self.open_last), *pending):
+            if time_ns is None:
+                continue
+            bucket = time_ns - time_ns % width
+            if times and times[-1] == bucket:
+                mins[-1] = min(mins[-1], minimum)
+                maxs[-1] = max(maxs[-1], maximum)
+                lasts[-1] = last
+            else:
+                times.append(bucket)
+                mins.append(minimum)
+                maxs.append(maximum)
+                lasts.append(last)
+        return columns
+
+
+class SeriesHistory:
+    """История одного регистра на всех уровнях разрешения"""
+
+    def __init__(self, reg_type=None):
+        self.reg_type = reg_type  # Тип значения (None - катушка)
+        self.changes = _Changes(CHANGES_CAPACITY)
+        self.levels = []
+        coarser = None
+        for width_ns, capacity in reversed(LEVELS):
+            coarser = _Level(width_ns, capacity, coarser)
+            self.levels.insert(0, coarser)
+
+    def add(self, time_ns, value):
+        self.changes.add(time_ns, value)
+        self.levels[0].add(time_ns, value, value, value)
+
+    def points(self, start_ns, end_ns, max_points):
+        """
+        Точки графика окна [start_ns, end_ns] - не больше max_points.
+
+        Первая точка - последнее изменение до начала окна (значение на начало
+        окна), если оно есть. Точка - начало корзины (или время изменения) и
+        минимум, максимум и последнее значение в ней.
+
+        :return: (times, mins, maxs, lasts)
+        """
+        max_points = max(max_points, 1)
+        levels = [self.changes] + self.levels
+        for number, level in enumerate(levels):
+            if not level.covers(start_ns):
+                continue
+            # Точек уровня в окне (без текущих корзин)
+            times = level.ordered(level.times)
+            if len(times) - max(bisect_right(times, start_ns) - 1, 0) < max_points:
+                break
+        if number:
+            # Текущие корзины более подробных уровней еще не слиты в выбранный
+            pending = [(finer.open_time, finer.open_min, finer.open_max, finer.open_last)
+                       for finer in reversed(levels[1:number])]
+            columns = level.columns(pending)
+        else:
+            columns = level.columns()
+        times = columns[0]
+        return _reduce(columns, max(bisect_right(times, start_ns) - 1, 0), bisect_right(times, end_ns), max_points)
+
+
+def _reduce(columns, first, last, max_points):
+    """Сводит точки [first, last) к max_points корзинам min/max по size соседних точек"""
+    times, mins, maxs, lasts = columns
+    if last - first <= max_points:
+        return times[first:last], mins[first:last], maxs[first:last], lasts[first:last]
+    size = -(-(last - first) // max_points)
+    # Полные корзины - срезами с шагом size, без цикла по точкам
+    end = last - (last - first) % size
+    reduced_times = times[first:end:size].tolist()
+    reduced_mins = list(map(min, *(mins[first + offset:end:size] for offset in range(size))))
+    reduced_maxs = list(map(max, *(maxs[first + offset:end:size] for offset in range(size))))
+    reduced_lasts = lasts[first + size - 1:end:size].tolist()
+    if end < last:
+        reduced_times.append(times[end])
+        reduced_mins.append(min(mins[end:last]))
+        reduced_maxs.append(max(maxs[end:last]))
+        reduced_lasts.append(lasts[last - 1])
+    return reduced_times, reduced_mins, reduced_maxs, reduced_lasts
+
+
+class RegisterHistory:
+    """
+    История значений регистров по ключу (порт, ведомый, пространство, адрес).
+
+    time_ns - время последнего обработанного кадра (правый край графиков),
+    version увеличивается при каждом изменении истории.
+
+    :param image: RegisterImage - источник изменений
+    :param profiles: RegisterProfiles - типы значений регистров
+    """
+
+    def __init__(self, image, profiles):
+        self.image = image
+        self.profiles = profiles
+        self.series = {}
+        self.time_ns = None
+        self.version = 0
+        image.listeners.append(self.on_changed)
+
+    def clear(self):
+        self.series.clear()
+        self.time_ns = None
+        self.version += 1
+
+    def on_changed(self, port, slave, space, start, values, addresses, time_ns):
+        """Слушатель образа регистров: записывает новые значения изменившихся адресов"""
+        self.time_ns = time_ns
+        self.version += 1
+        add = self._add
+        if space in BIT_SPACES:
+            for address in addresses:
+                add((port, slave, space, address), None, time_ns, values[address - start])
+            return
+        if not self.profiles.registers.get((slave, space)):
+            # Типы не заданы: все регистры Signed
+            for address in addresses:
+                value = values[address - start]
+                add((port, slave, space, address), DEFAULT_TYPE, time_ns, value - 0x10000 if value & 0x8000 else value)
+            return
+        # Типы диапазона изменений и соседних регистров - одним поиском в профилях
+        image = self.image.space(port, slave, space)
+        first = addresses[0] - 1
+        types = self.profiles.types_for(slave, space, first, addresses[-1] - first + 2)
+        changed = addresses
+        if not WIDE_TYPES.isdisjoint(types):
+            # Изменение регистра меняет и 4-байтное значение, начатое предыдущим регистром
+            changed = sorted(set(addresses).union(
+                address - 1 for address in addresses if types[address - 1 - first] in WIDE_TYPES))
+        for address in changed:
+            index = address - first
+            if index > 0 and types[index - 1] in WIDE_TYPES:
+                continue
+            reg_type = types[index]
+            entry = image.get(address)
+            if entry is None:
+                continue
+            value = entry[0]
+            if reg_type == DEFAULT_TYPE:
+                value = value - 0x10000 if value & 0x8000 else value
+            elif reg_type in WIDE_TYPES:
+                following = image.get(address + 1)
+                if following is None:
+                    continue
+                value = register_value(_WORD.pack(value) + _WORD.pack(following[0]), reg_type)
+            add((port, slave, space, address), reg_type, time_ns, value)
+
+    def _add(self, key, reg_type, time_ns, value):
+        series = self.series.get(key)
+        if series is None or series.reg_type != reg_type:
+            if series is None and len(self.series) >= MAX_SERIES:
+                return
+            series = self.series[key] = SeriesHistory(reg_type)
+        series.add(time_ns, value)
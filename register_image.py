@@ -0,0 +1,206 @@
+"""
+Текущее состояние регистров и катушек ведомых по наблюдаемому обмену.
+
+Образ обновляется на месте из ответов на чтение (адрес - из запроса
+транзакции) и из запросов записи. Для каждого (порт, ведомый,
+пространство) значения хранятся страницами по PAGE_SIZE адресов,
+создаваемыми при первом обращении: регистры - array('H'), катушки и
+дискретные входы - bytearray (байт 0/1 на катушку, чтобы сравнивать и
+копировать срезами). Для каждого адреса хранятся время последнего
+изменения и счетчик изменений.
+
+Повторный опрос с теми же значениями стоит одного сравнения среза на
+страницу. Изменившиеся адреса копятся в changed до take_changes(), поэтому
+представление обновляет только их.
+"""
+import sys
+from array import array
+
+from register_profiles import HOLDING_REGISTERS, INPUT_REGISTERS
+
+# Пространства катушек и дискретных входов (по биту на адрес)
+COILS = "coils"
+DISCRETE_INPUTS = "discrete_inputs"
+BIT_SPACES = (COILS, DISCRETE_INPUTS)
+
+PAGE_SIZE = 256
+
+# Пространство значений ответа на чтение по функции
+READ_SPACES = {0x01: COILS, 0x02: DISCRETE_INPUTS, 0x03: HOLDING_REGISTERS, 0x04: INPUT_REGISTERS, 0x17: HOLDING_REGISTERS}
+
+# Байт упакованных катушек (младший бит - первая катушка) -> 8 байт 0/1
+_BITS = [bytes((byte >> bit) & 1 for bit in range(8)) for byte in range(256)]
+
+
+def unpack_bits(packed, quantity):
+    """Упакованные катушки Modbus -> bytearray из quantity значений 0/1"""
+    return bytearray(b"".join(map(_BITS.__getitem__, packed))[:quantity])
+
+
+def unpack_words(data):
+    """Регистры big-endian -> array('H')"""
+    words = array('H')
+    words.frombytes(data[:len(data) // 2 * 2])
+    if sys.byteorder == "little":
+        words.byteswap()
+    return words
+
+
+class _Page:
+    __slots__ = ('values', 'known', 'changed_ns', 'changes')
+
+    def __init__(self, bits):
+        self.values = bytearray(PAGE_SIZE) if bits else array('H', bytes(2 * PAGE_SIZE))
+        self.known = bytearray(PAGE_SIZE)  # 1 - значение получено
+        self.changed_ns = array('q', bytes(8 * PAGE_SIZE))  # Время последнего изменения (monotonic_ns захвата)
+        self.changes = array('I', bytes(4 * PAGE_SIZE))  # Изменений после первого значения
+
+
+class SpaceImage:
+    """Значения одного пространства одного ведомого"""
+
+    def __init__(self, bits):
+        self.bits = bits
+        self.pages = {}  # Номер страницы -> _Page
+
+    def write(self, start, values, time_ns, changed):
+        """
+        Записывает значения с адреса start.
+
+        :param values: array('H') регистров или bytearray катушек
+        :param changed: Список, в который добавляются изменившиеся и новые адреса
+        """
+        position = 0
+        count = len(values)
+        while position < count:
+            address = start + position
+            page_number, offset = divmod(address, PAGE_SIZE)
+            length = min(PAGE_SIZE - offset, count - position)
+            page = self.pages.get(page_number)
+            if page is None:
+                page = self.pages[page_number] = _Page(self.bits)
+            new = values[position:position + length]
+            end = offset + length
+            old = page.values[offset:end]
+            known = page.known
+            # Повтор тех же известных значений - только сравнение срезов
+            if old != new or known.find(0, offset, end) != -1:
+                page.values[offset:end] = new
+                for index in [index for index, previous, value, is_known in zip(range(length), old, new, known[offset:end])
+                              if previous != value or not is_known]:
+                    slot = offset + index
+                    if known[slot]:
+                        page.changes[slot] += 1
+                    else:
+                        known[slot] = 1
+                    page.changed_ns[slot] = time_ns
+                    changed.append(address + index)
+            position += length
+
+    def get(self, address):
+        """(значение, время изменения, изменений) или None, если значение не получено"""
+        page = self.pages.get(address // PAGE_SIZE)
+        slot = address % PAGE_SIZE
+        if page is None or not page.known[slot]:
+            return None
+        return page.values[slot], page.changed_ns[slot], page.changes[slot]
+
+
+class RegisterImage:
+    """
+    Образ регистров всех ведомых: (порт, ведомый, пространство) -> SpaceImage.
+
+    changed - ключи (порт, ведомый, пространство, адрес), изменившиеся после
+    последнего take_changes(). listeners вызываются при каждом изменении:
+    listener(port, slave, space, start, values, addresses, time_ns) -
+    записанные значения с адреса start и изменившиеся из них адреса.
+    """
+
+    def __init__(self):
+        self.spaces = {}
+        self.changed = set()
+        self.listeners = []
+
+    def clear(self):
+        self.spaces.clear()
+        self.changed.clear()
+
+    def space(self, port, slave, space):
+        key = (port, slave, space)
+        image = self.spaces.get(key)
+        if image is None:
+            image = self.spaces[key] = SpaceImage(space in BIT_SPACES)
+        return image
+
+    def write(self, port, slave, space, start, values, time_ns):
+        """Записывает значения в образ, возвращает список изменившихся адресов"""
+        changed = []
+        self.space(port, slave, space).write(start, values, time_ns, changed)
+        if changed:
+            self.changed.update((port, slave, space, address) for address in changed)
+            for listener in self.listeners:
+                listener(port, slave, space, start, values, changed, time_ns)
+        return changed
+
+    def get(self, port, slave, space, address):
+        """(значение, время изменения, изменений) или None"""
+        image = self.spaces.get((port, slave, space))
+        return image.get(address) if image is not None else None
+
+    def take_changes(self):
+        """Ключи, изменившиеся с прошлого вызова"""
+        changed, self.changed = self.changed, set()
+        return changed
+
+    def apply(self, decoded, request, time_ns, port=0):
+        """
+        Обновляет образ по кадру.
+
+        Ответ на чтение (1-4, 23) записывается с адреса запроса своей
+        транзакции, запрос записи (5, 6, 15, 16, 22, 23) - с адреса из
+        запроса. Кадры с неверной CRC и исключения не учитываются.
+
+        :param decoded: DecodedFrame
+        :param request: DecodedFrame запроса транзакции (для ответа) или None
+        :param time_ns: Монотонное время захвата кадра
+        :return: Список изменившихся адресов (пустой, если кадр не меняет образ)
+        """
+        if not decoded.crc_ok or decoded.exception_code is not None:
+            return []
+        function = decoded.base_function
+        slave = decoded.address
+        payload = decoded.payload
+        if decoded.is_response:
+            space = READ_SPACES.get(function)
+            if space is None or request is None or request.base_function != function or request.start_address is None:
+                return []
+            quantity = request.quantity
+            if space in BIT_SPACES:
+                if quantity is None or len(payload) * 8 < quantity:
+                    return []
+                return self.write(port, slave, space, request.start_address, unpack_bits(payload, quantity), time_ns)
+            if quantity is not None and len(payload) != quantity * 2:
+                return []
+            return self.write(port, slave, space, request.start_address, unpack_words(payload), time_ns)
+        start = decoded.start_address
+        if start is None:
+            return []
+        if function == 0x05 and len(payload) == 2:
+            return self.write(port, slave, COILS, start, bytearray([payload[0] == 0xFF]), time_ns)
+        if function == 0x06 and len(payload) == 2:
+            return self.write(port, slave, HOLDING_REGISTERS, start, unpack_words(payload), time_ns)
+        if function == 0x0F and decoded.quantity is not None and len(payload) * 8 >= decoded.quantity:
+            return self.write(port, slave, COILS, start, unpack_bits(payload, decoded.quantity), time_ns)
+        if function == 0x10 and len(payload) >= 2:
+            return self.write(port, slave, HOLDING_REGISTERS, start, unpack_words(payload), time_ns)
+        if function == 0x16 and len(payload) == 4:
+            # Запись по маске: (текущее AND and_mask) OR (or_mask AND NOT and_mask), если текущее известно
+            current = self.get(port, slave, HOLDING_REGISTERS, start)
+            if current is None:
+                return []
+            and_mask, or_mask = unpack_words(payload)
+            value = (current[0] & and_mask) | (or_mask & ~and_mask & 0xFFFF)
+            return self.write(port, slave, HOLDING_REGISTERS, start, array('H', [value]), time_ns)
+        if function == 0x17 and decoded.write_address is not None and len(payload) >= 2:
+            return self.write(port, slave, HOLDING_REGISTERS, decoded.write_address, unpack_words(payload), time_ns)
+        return []
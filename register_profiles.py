@@ -0,0 +1,203 @@
+"""
+Типы регистров ведомых (профили) для окна "Значения".
+
+Тип задается для регистра (адрес ведомого, пространство регистров, номер
+регистра), а не для строки таблицы: выбор сохраняется при сдвиге строк,
+очистке таблицы и действует для всех кадров, затрагивающих регистр.
+Регистры без записи в профиле имеют тип по умолчанию.
+
+Для каждой пары (ведомый, пространство) хранятся отсортированные номера
+регистров с заданным типом и параллельный список типов, поэтому типы
+диапазона регистров кадра находятся двоичным поиском за O(log n + k).
+"""
+import json
+from bisect import bisect_left
+
+from register_codec import REGISTER_TYPES, WIDE_TYPES, DEFAULT_TYPE, format_registers
+
+# Пространства 16-битных регистров Modbus
+HOLDING_REGISTERS = "holding_registers"
+INPUT_REGISTERS = "input_registers"
+
+# Пространство регистров значений кадра по базовой функции
+FUNCTION_SPACES = {
+    0x03: HOLDING_REGISTERS,
+    0x04: INPUT_REGISTERS,
+    0x06: HOLDING_REGISTERS,
+    0x10: HOLDING_REGISTERS,
+    0x17: HOLDING_REGISTERS,
+}
+
+PROFILE_VERSION = 1
+
+# Кэш значений кадров: записей до полной очистки
+VALUES_CACHE_SIZE = 4096
+
+
+def register_space(function):
+    """Пространство регистров значений кадра функции function или None"""
+    return FUNCTION_SPACES.get(function & 0x7F)
+
+
+def value_start(decoded, request=None):
+    """
+    Номер регистра первого значения в данных кадра.
+
+    Запросы записи несут адрес сами (у 23 - адрес записи), ответы на чтение -
+    адрес из запроса своей транзакции.
+
+    :param decoded: DecodedFrame
+    :param request: DecodedFrame запроса транзакции (для ответов)
+    :return: Номер регистра или None (не регистры или адрес неизвестен)
+    """
+    function = decoded.base_function
+    if function not in FUNCTION_SPACES or decoded.exception_code is not None:
+        return None
+    if not decoded.is_response:
+        return decoded.write_address if function == 0x17 else decoded.start_address
+    if decoded.start_address is not None:
+        return decoded.start_address
+    if request is not None and request.base_function == function:
+        return request.start_address
+    return None
+
+
+class RegisterProfiles:
+    """
+    Типы регистров по (адрес ведомого, пространство, номер регистра).
+
+    version увеличивается при каждом изменении; значения кадров,
+    посчитанные при прежних типах, сбрасываются из кэша.
+    """
+
+    def __init__(self):
+        self.registers = {}  # (slave, space) -> отсортированный список номеров регистров
+        self.types = {}  # (slave, space) -> типы регистров в том же порядке
+        self.version = 0
+        self.values_cache = {}
+
+    def __len__(self):
+        return sum(len(registers) for registers in self.registers.values())
+
+    def register_type(self, slave, space, register):
+        """Тип регистра (DEFAULT_TYPE, если не задан)"""
+        registers = self.registers.get((slave, space))
+        if registers:
+            index = bisect_left(registers, register)
+            if index < len(registers) and registers[index] == register:
+                return self.types[(slave, space)][index]
+        return DEFAULT_TYPE
+
+    def types_for(self, slave, space, start, count):
+        """
+        Типы count регистров начиная с start (типы значений кадра).
+
+        :return: Список типов длиной count
+        """
+        types = [DEFAULT_TYPE] * count
+        registers = self.registers.get((slave, space))
+        if not registers:
+            return types
+        field_types = self.types[(slave, space)]
+        index = bisect_left(registers, start)
+        end = bisect_left(registers, start + count, index)
+        for register, reg_type in zip(registers[index:end], field_types[index:end]):
+            types[register - start] = reg_type
+        return types
+
+    def _remove(self, key, register):
+        registers = self.registers.get(key)
+        if not registers:
+            return
+        index = bisect_left(registers, register)
+        if index < len(registers) and registers[index] == register:
+            del registers[index]
+            del self.types[key][index]
+
+    def set_type(self, slave, space, register, reg_type):
+        """
+        Задает тип регистра. 4-байтный тип занимает и следующий регистр -
+        его собственный тип сбрасывается; так же сбрасывается 4-байтный тип
+        предыдущего регистра, занимавший этот.
+        """
+        if reg_type not in REGISTER_TYPES:
+            raise ValueError(f"Неизвестный тип: {reg_type}")
+        key = (slave, space)
+        self._remove(key, register)
+        if self.register_type(slave, space, register - 1) in WIDE_TYPES:
+            self._remove(key, register - 1)
+        if reg_type in WIDE_TYPES:
+            self._remove(key, register + 1)
+        if reg_type != DEFAULT_TYPE:
+            registers = self.registers.setdefault(key, [])
+            types = self.types.setdefault(key, [])
+            index = bisect_left(registers, register)
+            registers.insert(index, register)
+            types.insert(index, reg_type)
+        self.version += 1
+        self.values_cache.clear()
+
+    def clear(self):
+        self.registers.clear()
+        self.types.clear()
+        self.version += 1
+        self.values_cache.clear()
+
+    def format(self, slave, space, start, data):
+        """
+        Текст значений регистров данных кадра по типам профиля.
+
+        Результат кэшируется по кадру (ведомый, пространство, адрес, данные)
+        до изменения типов: повторный выбор строки и другие представления
+        того же кадра не разбирают данные заново.
+
+        :return: (типы регистров, текст значений)
+        """
+        key = (slave, space, start, data)
+        cached = self.values_cache.get(key)
+        if cached is None:
+            types = self.types_for(slave, space, start, len(data) // 2)
+            if len(self.values_cache) >= VALUES_CACHE_SIZE:
+                self.values_cache.clear()
+            cached = self.values_cache[key] = (types, format_registers(data, types))
+        return cached
+
+    def save(self, path):
+        """Сохраняет профили в JSON-файл"""
+        entries = []
+        for (slave, space), registers in sorted(self.registers.items()):
+            for register, reg_type in zip(registers, self.types[(slave, space)]):
+                entries.append({"slave": slave, "space": space, "register": register, "type": reg_type})
+        with open(path, "w", encoding="utf-8") as profile_file:
+            json.dump({"version": PROFILE_VERSION, "registers": entries}, profile_file, ensure_ascii=False, indent=1)
+
+    def load(self, path):
+        """
+        Загружает профили из JSON-файла вместо текущих.
+
+        :raises ValueError: Файл не является файлом профилей
+        """
+        with open(path, encoding="utf-8") as profile_file:
+            try:
+                content = json.load(profile_file)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}: {e}") from None
+        if not isinstance(content, dict) or content.get("version") != PROFILE_VERSION:
+            raise ValueError(f"{path}: не файл типов регистров или неизвестная версия")
+        registers = {}
+        types = {}
+        try:
+            for entry in content["registers"]:
+                slave, space, register, reg_type = entry["slave"], entry["space"], entry["register"], entry["type"]
+                if reg_type not in REGISTER_TYPES or space not in (HOLDING_REGISTERS, INPUT_REGISTERS):
+                    raise ValueError(f"{path}: неверная запись {entry}")
+                key = (int(slave), space)
+                index = bisect_left(registers.setdefault(key, []), int(register))
+                registers[key].insert(index, int(register))
+                types.setdefault(key, []).insert(index, reg_type)
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"{path}: неверная запись ({e})") from None
+        self.registers = registers
+        self.types = types
+        self.version += 1
+        self.values_cache.clear()
@@ -0,0 +1,152 @@
+import struct
+from bisect import bisect_left
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from register_codec import WIDE_TYPES, format_registers
+from register_image import COILS, DISCRETE_INPUTS, BIT_SPACES
+from register_profiles import HOLDING_REGISTERS, INPUT_REGISTERS
+from sniffer_model import format_wall_time
+
+# Заголовки колонок таблицы "Регистры"
+REGISTERS_HEADERS = ["Ведомый", "Пространство", "Регистр", "Значение", "Изменен", "Изменений"]
+VALUE_COLUMN = 3
+
+SPACE_NAMES = {
+    COILS: "Катушки",
+    DISCRETE_INPUTS: "Дискретные входы",
+    HOLDING_REGISTERS: "Регистры хранения",
+    INPUT_REGISTERS: "Входные регистры",
+}
+
+# Новых регистров за обновление, начиная с которых модель сбрасывается целиком
+RESET_ROWS = 256
+
+_WORD = struct.Struct(">H")
+
+
+class RegistersModel(QAbstractTableModel):
+    """
+    Модель таблицы "Регистры" поверх RegisterImage: строка на каждый
+    полученный регистр или катушку.
+
+    Строки упорядочены по ключу (порт, ведомый, пространство, адрес).
+    refresh() забирает из образа только изменившиеся ключи: новые
+    вставляются на свои места, для остальных отправляется один
+    dataChanged, и представление перерисовывает только видимые из них.
+    Таблица кадров при этом не просматривается.
+
+    :param image: RegisterImage
+    :param profiles: RegisterProfiles (типы для текста значений)
+    :param session: SnifferModel - время сеанса (clock) и имена портов (port_names)
+    """
+
+    def __init__(self, image, profiles, session, parent=None):
+        super().__init__(parent)
+        self.image = image
+        self.profiles = profiles
+        self.session = session
+        self.keys = []  # Отсортированные ключи строк
+        self.key_set = set()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.keys)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(REGISTERS_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole:
+            if orientation == Qt.Orientation.Horizontal:
+                return REGISTERS_HEADERS[section]
+            return str(section + 1)
+        return None
+
+    def key(self, row):
+        """(порт, ведомый, пространство, адрес) строки"""
+        return self.keys[row]
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return self.cell_text(self.keys[index.row()], index.column())
+
+    def cell_text(self, key, column):
+        port, slave, space, address = key
+        if column == 0:
+            # При захвате нескольких портов один адрес может быть у разных ведомых
+            port_names = self.session.port_names
+            return f"{port_names[port]}: {slave}" if len(port_names) > 1 and port < len(port_names) else str(slave)
+        if column == 1:
+            return SPACE_NAMES.get(space, space)
+        if column == 2:
+            return str(address)
+        entry = self.image.get(port, slave, space, address)
+        if entry is None:
+            return "-"
+        value, changed_ns, changes = entry
+        if column == VALUE_COLUMN:
+            return self.value_text(key, value)
+        if column == 4:
+            return format_wall_time(self.session.clock.wall_time_ns(changed_ns))
+        return str(changes)
+
+    def value_text(self, key, value):
+        """Текст значения по типу регистра из профилей; регистр 4-байтного значения предыдущего - пусто"""
+        port, slave, space, address = key
+        if space in BIT_SPACES:
+            return str(value)
+        profiles = self.profiles
+        if profiles.register_type(slave, space, address - 1) in WIDE_TYPES:
+            return ""
+        reg_type = profiles.register_type(slave, space, address)
+        data = _WORD.pack(value)
+        if reg_type in WIDE_TYPES:
+            following = self.image.get(port, slave, space, address + 1)
+            if following is not None:
+                data += _WORD.pack(following[0])
+        return format_registers(data, [reg_type])[0]
+
+    def refresh(self):
+        """Переносит в таблицу изменения образа с прошлого обновления"""
+        changed = self.image.take_changes()
+        if not changed:
+            return
+        key_set = self.key_set
+        new_keys = [key for key in changed if key not in key_set]
+        if new_keys:
+            key_set.update(new_keys)
+            if len(new_keys) >= RESET_ROWS:
+                self.beginResetModel()
+                self.keys = sorted(key_set)
+                self.endResetModel()
+                return
+            keys = self.keys
+            for key in sorted(new_keys):
+                row = bisect_left(keys, key)
+                self.beginInsertRows(QModelIndex(), row, row)
+                keys.insert(row, key)
+                self.endInsertRows()
+        keys = self.keys
+        rows = [bisect_left(keys, key) for key in changed]
+        # 4-байтное значение показывается в строке предыдущего регистра
+        rows += [bisect_left(keys, (port, slave, space, address - 1))
+                 for port, slave, space, address in changed
+                 if space not in BIT_SPACES and (port, slave, space, address - 1) in key_set]
+        self.dataChanged.emit(self.index(min(rows), 0), self.index(max(rows), len(REGISTERS_HEADERS) - 1))
+
+    def types_changed(self):
+        """Типы регистров изменились - перерисовать значения"""
+        if self.keys:
+            self.dataChanged.emit(self.index(0, VALUE_COLUMN), self.index(len(self.keys) - 1, VALUE_COLUMN))
+
+    def clear(self):
+        self.beginResetModel()
+        self.image.clear()
+        self.keys = []
+        self.key_set = set()
+        self.endResetModel()
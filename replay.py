@@ -0,0 +1,189 @@
+"""
+Воспроизведение записанного захвата через конвейер сниффера.
+
+Источник выдает те же FrameRecord, что и read_from_com, в message_queue:
+из файла захвата (capture.py) или из текстового дампа порции байт с
+временем. Скорость - реальное время, ускорение в N раз или максимальная
+(с ожиданием места в очереди, без потерь).
+
+Запуск как скрипта - замер пропускной способности GUI конвейера
+(decode_messages -> add_or_update_row) на максимальной скорости:
+    python replay.py capture.mbcap
+"""
+import sys
+import threading
+import time
+
+from capture import MAGIC, CaptureReader
+from serial_reader import RtuFramer, SessionClock
+
+
+def capture_source(path):
+    """
+    Кадры файла захвата. Файл закрывается, когда кадры кончились или
+    итератор закрыт (Replay закрывает его по окончании или остановке).
+
+    :return: (итератор FrameRecord, скорость порта, SessionClock записи)
+    """
+    reader = CaptureReader(path)
+
+    def records():
+        try:
+            yield from reader.records()
+        finally:
+            reader.close()
+
+    return records(), reader.baudrate, reader.clock
+
+
+def dump_source(path, baudrate):
+    """
+    Кадры текстового дампа с временем: строка "<секунды> <байты hex>" на
+    порцию байт, время - момент чтения порции (как в read_from_com).
+    Пустые строки и строки с # пропускаются. Порции делятся на сообщения
+    RtuFramer по паузам T3.5, как при чтении порта.
+
+    :return: (итератор FrameRecord, скорость порта, SessionClock)
+    """
+    def chunks():
+        with open(path, encoding="utf-8") as dump:
+            for line in dump:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                seconds, _, data = line.partition(" ")
+                yield int(float(seconds) * 1_000_000_000), bytes.fromhex(data)
+
+    def records(first):
+        framer = RtuFramer(baudrate)
+        if first is not None:
+            yield from framer.feed(first[1], first[0])
+        for timestamp_ns, data in source:
+            yield from framer.feed(data, timestamp_ns)
+        record = framer.flush()
+        if record is not None:
+            yield record
+
+    source = chunks()
+    first = next(source, None)
+    # Секунды дампа отсчитываются от произвольной эпохи: первая порция - момент открытия дампа
+    clock = SessionClock()
+    if first is not None:
+        clock.monotonic_ns = first[0]
+    return records(first), baudrate, clock
+
+
+def open_source(path, baudrate=None):
+    """Источник по содержимому файла: файл захвата или дамп (скорость обязательна)"""
+    with open(path, "rb") as source:
+        magic = source.read(len(MAGIC))
+    if magic == MAGIC:
+        return capture_source(path)
+    if baudrate is None:
+        raise ValueError(f"{path}: для дампа нужна скорость порта")
+    return dump_source(path, baudrate)
+
+
+class Replay:
+    """
+    Воспроизведение кадров в очередь сообщений.
+
+    Времена захвата сдвигаются к текущему monotonic_ns с сохранением
+    интервалов между кадрами (задержки ответов и паузы - как в записи), а
+    clock переводит их в исходное настенное время. speed задает темп выдачи:
+    1 - реальное время, N - в N раз быстрее, None - максимальный.
+
+    :param records: Итератор FrameRecord в порядке захвата
+    :param baudrate: Скорость порта записи
+    :param clock: SessionClock записи
+    :param speed: Ускорение или None
+    """
+
+    def __init__(self, records, baudrate, clock, speed=1.0):
+        self.records = iter(records)
+        self.baudrate = baudrate
+        self.speed = speed
+        self.first = next(self.records, None)
+        first_ns = self.first.timestamp_ns if self.first is not None else 0
+        self.offset_ns = time.monotonic_ns() - first_ns
+        self.clock = SessionClock()
+        self.clock.monotonic_ns = first_ns + self.offset_ns
+        self.clock.wall_ns = clock.wall_time_ns(first_ns)
+        self.sent = 0
+        self.started_ns = None
+        self.finished_ns = None
+        self.stop_event = threading.Event()
+
+    @property
+    def finished(self):
+        return self.finished_ns is not None
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self, message_queue, backlog=None):
+        """
+        Выдает кадры в message_queue (цель потока воспроизведения).
+
+        :param backlog: Функция без аргументов, True - конвейер заполнен и на
+            максимальной скорости надо подождать (по умолчанию message_queue.full)
+        """
+        self.started_ns = time.monotonic_ns()
+        try:
+            if self.first is not None:
+                self._run(message_queue, backlog or message_queue.full)
+        finally:
+            # Освобождаем источник (файл захвата) и при остановке до конца записи
+            close = getattr(self.records, "close", None)
+            if close is not None:
+                close()
+            self.finished_ns = time.monotonic_ns()
+
+    def _run(self, message_queue, backlog):
+        stop_event = self.stop_event
+        offset_ns = self.offset_ns
+        speed = self.speed
+        first_ns = self.first.timestamp_ns
+        record = self.first
+        records = self.records
+        while record is not None and not stop_event.is_set():
+            if speed is None:
+                # Максимальная скорость: ждем место в конвейере вместо потерь
+                while backlog():
+                    if stop_event.wait(0.001):
+                        return
+            else:
+                remaining = self.started_ns + (record.timestamp_ns - first_ns) / speed - time.monotonic_ns()
+                # Паузы меньше миллисекунды не выдерживаем: точность sleep ниже
+                if remaining > 1_000_000 and stop_event.wait(remaining / 1e9):
+                    return
+            message_queue.put(record._replace(timestamp_ns=record.timestamp_ns + offset_ns))
+            self.sent += 1
+            record = next(records, None)
+
+
+def benchmark(path, baudrate=None):
+    """
+    Воспроизводит захват на максимальной скорости через MainWindow без
+    экрана и возвращает (кадров, секунд) от первого кадра до последней
+    строки таблицы.
+    """
+    import os
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+    import main
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = main.MainWindow()
+    window.start_replay(Replay(*open_source(path, baudrate), speed=None))
+    timer = QTimer()
+    timer.timeout.connect(lambda: window.replay is None and app.quit())
+    timer.start(50)
+    app.exec()
+    return window.replay_result
+
+
+if __name__ == "__main__":
+    frames, seconds = benchmark(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    print(f"{frames} кадров за {seconds:.3f} с: {frames / seconds:.0f} кадров/с")
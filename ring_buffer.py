@@ -0,0 +1,235 @@
+import queue
+import threading
+import time
+
+# Политики переполнения
+DROP_OLDEST = "drop-oldest"  # Новый элемент вытесняет самый старый
+DROP_NEWEST = "drop-newest"  # Новый элемент отбрасывается
+BLOCK = "block"  # Производитель ждет освобождения места
+
+
+class RingBuffer:
+    """
+    Кольцевой буфер фиксированной емкости для одного производителя и одного
+    потребителя (SPSC).
+
+    Производитель меняет только tail, потребитель - head (счетчики растут
+    монотонно, ячейка - счетчик % capacity). Запись в свободную ячейку идет
+    без блокировки; короткая блокировка берется только при сдвиге head
+    (чтение и вытеснение старого элемента при DROP_OLDEST), ожидание пустого
+    и полного буфера - через события. Потерянные элементы считаются точно:
+    pushed = tail + dropped_newest, head = выдано + dropped_oldest.
+
+    Интерфейс совместим с queue.Queue в используемой части: put, put_nowait,
+    get, get_nowait, qsize, empty (исключения queue.Full и queue.Empty).
+
+    :param not_empty: Событие "есть данные", общее для буферов RingBufferGroup
+        (None - свое событие)
+    """
+
+    def __init__(self, capacity, policy=DROP_OLDEST, not_empty=None):
+        if policy not in (DROP_OLDEST, DROP_NEWEST, BLOCK):
+            raise ValueError(f"Неизвестная политика переполнения: {policy}")
+        self.capacity = capacity
+        self.policy = policy
+        self.items = [None] * capacity
+        self.head = 0  # Следующий элемент для чтения (меняет потребитель)
+        self.tail = 0  # Следующая ячейка для записи (меняет производитель)
+        self.pushed = 0  # Всего предложено элементов
+        self.dropped_newest = 0  # Отброшено новых (DROP_NEWEST, put_nowait)
+        self.dropped_oldest = 0  # Вытеснено старых (DROP_OLDEST)
+        self.head_lock = threading.Lock()
+        self.not_empty = not_empty if not_empty is not None else threading.Event()
+        self.not_full = threading.Event()
+        self.closed = False  # Производитель завершен (буфер удаляется из группы, когда опустеет)
+
+    @property
+    def dropped(self):
+        """Всего потерянных элементов"""
+        return self.dropped_newest + self.dropped_oldest
+
+    def qsize(self):
+        return self.tail - self.head
+
+    def empty(self):
+        return self.tail == self.head
+
+    def full(self):
+        return self.tail - self.head >= self.capacity
+
+    def put(self, item, block=True, timeout=None):
+        """
+        Добавляет элемент согласно политике переполнения.
+
+        Для BLOCK ждет места (block=False или истекший timeout - queue.Full);
+        для DROP_NEWEST при переполнении элемент отбрасывается и считается.
+        """
+        self.pushed += 1
+        if self.tail - self.head >= self.capacity:
+            if self.policy == DROP_OLDEST:
+                with self.head_lock:
+                    # Потребитель мог освободить место, пока мы ждали блокировку
+                    if self.tail - self.head >= self.capacity:
+                        self.items[self.head % self.capacity] = None
+                        self.head += 1
+                        self.dropped_oldest += 1
+            elif self.policy == DROP_NEWEST or not self._wait_space(block, timeout):
+                self.dropped_newest += 1
+                if self.policy == BLOCK:
+                    raise queue.Full
+                return
+        self.items[self.tail % self.capacity] = item
+        self.tail += 1
+        if not self.not_empty.is_set():
+            self.not_empty.set()
+
+    def put_nowait(self, item):
+        self.put(item, block=False)
+
+    def _wait_space(self, block, timeout):
+        if not block:
+            return False
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.tail - self.head >= self.capacity:
+            self.not_full.clear()
+            if self.tail - self.head < self.capacity:
+                break
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            self.not_full.wait(remaining)
+        return True
+
+    def get_nowait(self):
+        """Забирает самый старый элемент, queue.Empty если буфер пуст"""
+        with self.head_lock:
+            head = self.head
+            if head == self.tail:
+                raise queue.Empty
+            index = head % self.capacity
+            item = self.items[index]
+            self.items[index] = None
+            self.head = head + 1
+        if self.policy == BLOCK and not self.not_full.is_set():
+            self.not_full.set()
+        return item
+
+    def get(self, block=True, timeout=None):
+        """Забирает самый старый элемент, ожидая его не дольше timeout"""
+        if not block:
+            return self.get_nowait()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self.get_nowait()
+            except queue.Empty:
+                pass
+            self.not_empty.clear()
+            if self.tail != self.head:
+                continue
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise queue.Empty
+            if not self.not_empty.wait(remaining):
+                raise queue.Empty
+
+    def clear(self):
+        """Отбрасывает непрочитанные элементы (вызывает потребитель); счетчики потерь не меняются"""
+        while True:
+            try:
+                self.get_nowait()
+            except queue.Empty:
+                return
+
+
+class RingBufferGroup:
+    """
+    Один потребитель для нескольких RingBuffer - по буферу на производителя
+    (поток чтения порта, воспроизведение), так что каждый буфер остается SPSC.
+
+    Буферы группы разделяют событие not_empty; get() обходит их по кругу.
+    Закрытый производителем буфер (close) дочитывается и удаляется из
+    группы потребителем, его потери остаются в счетчиках группы.
+    Интерфейс потребителя - как у RingBuffer: get, get_nowait, qsize, empty.
+    """
+
+    def __init__(self):
+        self.buffers = []  # Заменяется целиком (копия при изменении) под lock
+        self.lock = threading.Lock()
+        self.not_empty = threading.Event()
+        self.next = 0  # Буфер, с которого начинается следующий обход
+        self.removed_pushed = 0
+        self.removed_dropped = 0
+
+    def add(self, capacity, policy=DROP_OLDEST):
+        """Создает буфер нового производителя"""
+        buffer = RingBuffer(capacity, policy, self.not_empty)
+        with self.lock:
+            self.buffers = self.buffers + [buffer]
+        return buffer
+
+    def close(self, buffer):
+        """Производитель buffer больше не пишет (оставшиеся элементы будут прочитаны)"""
+        buffer.closed = True
+        self.not_empty.set()
+
+    @property
+    def pushed(self):
+        return self.removed_pushed + sum(buffer.pushed for buffer in self.buffers)
+
+    @property
+    def dropped(self):
+        """Всего потерянных элементов во всех буферах группы"""
+        return self.removed_dropped + sum(buffer.dropped for buffer in self.buffers)
+
+    def qsize(self):
+        return sum(buffer.qsize() for buffer in self.buffers)
+
+    def empty(self):
+        return all(buffer.empty() for buffer in self.buffers)
+
+    def _remove_closed(self):
+        with self.lock:
+            buffers = []
+            for buffer in self.buffers:
+                if buffer.closed and buffer.empty():
+                    self.removed_pushed += buffer.pushed
+                    self.removed_dropped += buffer.dropped
+                else:
+                    buffers.append(buffer)
+            self.buffers = buffers
+
+    def get_nowait(self):
+        """Забирает элемент из следующего непустого буфера, queue.Empty если все пусты"""
+        buffers = self.buffers
+        count = len(buffers)
+        for step in range(count):
+            index = (self.next + step) % count
+            try:
+                item = buffers[index].get_nowait()
+            except queue.Empty:
+                continue
+            self.next = index + 1
+            return item
+        if any(buffer.closed for buffer in buffers):
+            self._remove_closed()
+        raise queue.Empty
+
+    def get(self, block=True, timeout=None):
+        """Забирает элемент, ожидая его в любом буфере не дольше timeout"""
+        if not block:
+            return self.get_nowait()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self.get_nowait()
+            except queue.Empty:
+                pass
+            self.not_empty.clear()
+            if not self.empty():
+                continue
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise queue.Empty
+            if not self.not_empty.wait(remaining):
+                raise queue.Empty
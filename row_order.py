@@ -0,0 +1,193 @@
+from array import array
+
+BLOCK_SIZE = 512  # Строк в блоке после разделения (блок делится при 2 * BLOCK_SIZE)
+
+
+class Fenwick:
+    """Дерево Фенвика: префиксные суммы, изменение и добавление элемента за O(log n)"""
+
+    def __init__(self, values=()):
+        # tree[i] (с 1) хранит сумму элементов (i - lowbit(i), i]
+        tree = [0]
+        tree.extend(values)
+        size = len(tree) - 1
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self.tree = tree
+
+    def __len__(self):
+        return len(self.tree) - 1
+
+    def append(self, value):
+        """Добавляет элемент в конец"""
+        i = len(self.tree)
+        self.tree.append(value + self.prefix(i - 1) - self.prefix(i - (i & -i)))
+
+    def add(self, index, delta):
+        """Прибавляет delta к элементу index (с 0)"""
+        i = index + 1
+        size = len(self.tree)
+        while i < size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, count):
+        """Сумма первых count элементов"""
+        total = 0
+        while count > 0:
+            total += self.tree[count]
+            count -= count & -count
+        return total
+
+    def find(self, k):
+        """
+        Находит элемент, в котором лежит k-я (с 0) единица суммы.
+
+        :return: (индекс элемента, остаток k внутри элемента)
+        """
+        position = 0
+        size = len(self.tree) - 1
+        step = 1 << size.bit_length()
+        while step:
+            following = position + step
+            if following <= size and self.tree[following] <= k:
+                position = following
+                k -= self.tree[following]
+            step >>= 1
+        return position, k
+
+
+class RowOrder:
+    """
+    Порядок строк таблицы Сниффер по постоянным идентификаторам строк.
+
+    Все строки (и скрытые фильтром) лежат в блоках array('I') не длиннее
+    2 * BLOCK_SIZE; блоки идут в порядке order, дерево Фенвика хранит число
+    видимых строк каждого блока. Вставка после любой строки, перевод
+    идентификатора в строку представления и обратно стоят O(log n + BLOCK_SIZE)
+    независимо от размера таблицы; смена фильтра пересчитывает только блоки.
+
+    Видимость строк берется из маски RowFilter (идентификатор строки -> 0/1).
+    """
+
+    def __init__(self, row_filter):
+        self.row_filter = row_filter
+        self.clear()
+
+    def clear(self):
+        """Удаляет все строки"""
+        self.blocks = []  # Блоки по постоянному номеру блока
+        self.order = []  # Номера блоков в порядке таблицы
+        self.block_index = []  # Номер блока -> позиция в order
+        self.block_visible = []  # Видимые строки блока (кэш, None - пересчитать)
+        self.row_block = array('I')  # Идентификатор строки -> номер блока
+        self.counts = Fenwick()  # Число видимых строк блоков в порядке order
+        self.visible_count = 0
+
+    def __len__(self):
+        return self.visible_count
+
+    def _visible(self, block_id):
+        """Видимые строки блока (кэшируются до изменения блока)"""
+        visible = self.block_visible[block_id]
+        if visible is None:
+            block = self.blocks[block_id]
+            visible = self.row_filter.visible_rows(block)
+            if len(visible) == len(block):
+                visible = block
+            self.block_visible[block_id] = visible
+        return visible
+
+    def _new_block(self, rows, position):
+        """Создает блок из rows и ставит его в позицию position порядка"""
+        block_id = len(self.blocks)
+        self.blocks.append(rows)
+        self.block_visible.append(None)
+        self.block_index.append(position)
+        self.order.insert(position, block_id)
+        for row_id in rows:
+            self.row_block[row_id] = block_id
+        return block_id
+
+    def _locate(self, after):
+        """Блок и позиция в блоке для строки, вставляемой после after (None - в конец)"""
+        if after is None:
+            # Блоки заполняются в конец только до BLOCK_SIZE: запас под вставки ответов
+            if not self.order or len(self.blocks[self.order[-1]]) >= BLOCK_SIZE:
+                return None, 0
+            block_id = self.order[-1]
+            return block_id, len(self.blocks[block_id])
+        block_id = self.row_block[after]
+        return block_id, self.blocks[block_id].index(after) + 1
+
+    def insert_row(self, after=None):
+        """Строка представления, которую займет видимая строка, вставленная после after"""
+        block_id, index = self._locate(after)
+        if block_id is None:
+            return self.visible_count
+        block = self.blocks[block_id]
+        mask = self.row_filter.mask
+        return self.counts.prefix(self.block_index[block_id]) + sum(map(mask.__getitem__, block[:index]))
+
+    def insert(self, row_id, after=None):
+        """
+        Вставляет новую строку row_id после строки after (None - в конец таблицы).
+
+        Идентификаторы новых строк идут подряд, маска фильтра для row_id уже заполнена.
+        """
+        block_id, index = self._locate(after)
+        self.row_block.append(0)
+        visible = self.row_filter.mask[row_id]
+        if block_id is None:
+            block_id = self._new_block(array('I', [row_id]), len(self.order))
+            self.counts.append(visible)
+        else:
+            self.blocks[block_id].insert(index, row_id)
+            self.row_block[row_id] = block_id
+            self.block_visible[block_id] = None
+            if visible:
+                self.counts.add(self.block_index[block_id], 1)
+        self.visible_count += visible
+        if len(self.blocks[block_id]) > 2 * BLOCK_SIZE:
+            self._split(block_id)
+
+    def _split(self, block_id):
+        """Делит переполненный блок пополам"""
+        block = self.blocks[block_id]
+        tail = block[BLOCK_SIZE:]
+        del block[BLOCK_SIZE:]
+        self.block_visible[block_id] = None
+        position = self.block_index[block_id] + 1
+        self._new_block(tail, position)
+        for index in range(position + 1, len(self.order)):
+            self.block_index[self.order[index]] = index
+        self._rebuild_counts()
+
+    def _rebuild_counts(self):
+        self.counts = Fenwick(len(self._visible(block_id)) for block_id in self.order)
+        self.visible_count = self.counts.prefix(len(self.counts))
+
+    def rebuild(self):
+        """Пересчитывает видимые строки после смены фильтра"""
+        self.block_visible = [None] * len(self.blocks)
+        self._rebuild_counts()
+
+    def last_row_id(self):
+        """Идентификатор последней строки таблицы (с учетом скрытых) или None"""
+        if not self.order:
+            return None
+        return self.blocks[self.order[-1]][-1]
+
+    def row_id(self, row):
+        """Идентификатор строки по строке представления"""
+        position, index = self.counts.find(row)
+        return self._visible(self.order[position])[index]
+
+    def row(self, row_id):
+        """Строка представления по идентификатору или None, если строка скрыта фильтром"""
+        if not self.row_filter.mask[row_id]:
+            return None
+        block_id = self.row_block[row_id]
+        return self.counts.prefix(self.block_index[block_id]) + self._visible(block_id).index(row_id)
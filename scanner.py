@@ -0,0 +1,248 @@
+"""
+Поиск параметров линии Modbus RTU (скорость, биты данных, четность).
+
+Стоп-биты не перебираются: приемник проверяет только первый стоп-бит,
+поэтому 1 и 2 стоп-бита на приеме неотличимы, и для прослушивания
+достаточно 1.
+
+Сначала каждая скорость пробуется без четности (8N1). По принятым байтам
+пробы оцениваются кандидаты четности: если на линии 11-битные символы с
+четностью, бит четности попадает на место стоп-бита, и байты с нулевым
+битом четности приходят с ошибкой кадра (как 0x00). Уцелевшие байты тогда
+имеют одинаковую четность числа единиц: нечетную для 8E1 и четную для 8O1.
+Скорости проверяются в порядке этих оценок, остальные сочетания - в конце.
+
+Проба заканчивается досрочно, как только принято DECIDE_FRAMES сообщений
+(решение по доле верных CRC) или FAIL_BYTES байт без верной CRC, и не
+длится дольше TRIAL_TIMEOUT_S. scan_ports сканирует несколько портов
+параллельно.
+"""
+import logging
+import threading
+import time
+
+import serial
+
+from decode import Frame
+from serial_reader import RtuFramer
+
+SCAN_BAUDRATES = [9600, 19200, 38400, 57600, 115200, 230400, 460800, 921600]
+
+DECIDE_FRAMES = 5  # Сообщений для решения по пробе
+FAIL_BYTES = 128  # Байт без единой верной CRC, после которых проба неудачна
+VALID_RATIO = 0.8  # Доля сообщений с верной CRC для найденных параметров
+TRIAL_TIMEOUT_S = 2.0  # Наибольшая длительность пробы
+PARITY_MIN_BYTES = 16  # Байт пробы для оценки четности
+PARITY_RATIO = 0.85  # Доля байт одной четности для кандидата 8E1/8O1
+
+log = logging.getLogger(__name__)
+
+# Байт -> 1, если число единиц нечетное
+_ODD_BITS = bytes(bin(byte).count("1") & 1 for byte in range(256))
+
+
+class TrialStats:
+    """Итоги одной пробы параметров"""
+
+    __slots__ = ('baudrate', 'bytesize', 'parity', 'frames', 'valid', 'byte_count', 'nonzero', 'odd')
+
+    def __init__(self, baudrate, bytesize, parity):
+        self.baudrate = baudrate
+        self.bytesize = bytesize
+        self.parity = parity
+        self.frames = 0  # Сообщений (не короче 4 байт)
+        self.valid = 0  # Сообщений с верной CRC
+        self.byte_count = 0  # Всего принятых байт
+        self.nonzero = 0  # Ненулевых байт
+        self.odd = 0  # Ненулевых байт с нечетным числом единиц
+
+    @property
+    def valid_ratio(self):
+        return self.valid / self.frames if self.frames else 0.0
+
+    @property
+    def found(self):
+        return self.frames > 0 and self.valid_ratio >= VALID_RATIO
+
+    @property
+    def decided(self):
+        """Данных достаточно, чтобы закончить пробу досрочно (и оценить четность)"""
+        if self.frames >= DECIDE_FRAMES and (self.valid or self.nonzero >= PARITY_MIN_BYTES):
+            return True
+        return self.byte_count >= FAIL_BYTES and not self.valid
+
+    def add_chunk(self, chunk):
+        """Учитывает принятые байты для оценки четности"""
+        self.byte_count += len(chunk)
+        zeros = chunk.count(0)
+        self.nonzero += len(chunk) - zeros
+        self.odd += chunk.translate(_ODD_BITS).count(1)
+
+    def parity_candidate(self):
+        """
+        Четность линии по байтам пробы без четности: (parity, уверенность 0..1)
+        или None, если байты не похожи на 8E1/8O1.
+        """
+        if self.nonzero < PARITY_MIN_BYTES:
+            return None
+        odd_ratio = self.odd / self.nonzero
+        if odd_ratio >= PARITY_RATIO:
+            return serial.PARITY_EVEN, odd_ratio
+        if odd_ratio <= 1 - PARITY_RATIO:
+            return serial.PARITY_ODD, 1 - odd_ratio
+        return None
+
+
+class BusScanner:
+    """
+    Поиск параметров линии на одном порту.
+
+    Порт открывается один раз и перенастраивается между пробами. status
+    вызывается с текстом текущей пробы (из потока сканирования).
+
+    :param port: Имя COM-порта
+    :param baudrates: Проверяемые скорости
+    :param status: Функция status(text) или None
+    """
+
+    def __init__(self, port, baudrates=SCAN_BAUDRATES, status=None):
+        self.port = port
+        self.baudrates = baudrates
+        self.status = status
+        self.active = True
+        self.trials = []  # TrialStats проведенных проб
+
+    def stop(self):
+        """Прерывает сканирование (из другого потока)"""
+        self.active = False
+
+    def scan(self):
+        """
+        Ищет параметры линии.
+
+        :return: (baudrate, bytesize, parity, stopbits) или None
+        """
+        with serial.Serial(self.port, timeout=0) as ser:
+            return self._scan(ser)
+
+    def _scan(self, ser):
+        probes = []
+        tried = set()
+        for baudrate in self.baudrates:
+            if not self.active:
+                return None
+            stats = self.trial(ser, baudrate, 8, serial.PARITY_NONE)
+            tried.add((baudrate, 8, serial.PARITY_NONE))
+            if stats.found:
+                return self._result(stats)
+            probes.append(stats)
+            # Явная четность по байтам пробы - проверяем сразу, не дожидаясь остальных скоростей
+            candidate = stats.parity_candidate()
+            if candidate is not None:
+                tried.add((baudrate, 8, candidate[0]))
+                stats = self.trial(ser, baudrate, 8, candidate[0])
+                if stats.found:
+                    return self._result(stats)
+
+        # Кандидаты с четностью по оценкам проб, самые уверенные первыми
+        ranked = []
+        for stats in probes:
+            candidate = stats.parity_candidate()
+            if candidate is not None:
+                ranked.append((candidate[1], stats.baudrate, candidate[0]))
+        ranked.sort(reverse=True)
+        combinations = [(baudrate, 8, parity) for _, baudrate, parity in ranked]
+        # Остальное - только на скоростях, где во время пробы шел обмен
+        for stats in probes:
+            if not stats.byte_count:
+                continue
+            for bytesize in (8, 7):
+                for parity in (serial.PARITY_EVEN, serial.PARITY_ODD, serial.PARITY_NONE):
+                    combinations.append((stats.baudrate, bytesize, parity))
+
+        for combination in combinations:
+            if not self.active:
+                return None
+            if combination in tried:
+                continue
+            tried.add(combination)
+            stats = self.trial(ser, *combination)
+            if stats.found:
+                return self._result(stats)
+        return None
+
+    def _result(self, stats):
+        return stats.baudrate, stats.bytesize, stats.parity, serial.STOPBITS_ONE
+
+    def trial(self, ser, baudrate, bytesize, parity):
+        """
+        Слушает линию с заданными параметрами, пока данных не хватит для
+        решения (TrialStats.decided), но не дольше TRIAL_TIMEOUT_S.
+        """
+        if self.status is not None:
+            self.status(f"Проверка {baudrate}-{bytesize}-{parity}-1")
+        stats = TrialStats(baudrate, bytesize, parity)
+        self.trials.append(stats)
+        try:
+            ser.baudrate = baudrate
+            ser.bytesize = bytesize
+            ser.parity = parity
+            ser.stopbits = serial.STOPBITS_ONE
+        except ValueError as error:
+            # Сочетание параметров не поддерживается портом - проба без данных
+            log.warning("%s: параметры %s-%s-%s не поддерживаются: %s", self.port, baudrate, bytesize, parity, error)
+            return stats
+        framer = RtuFramer(baudrate)
+        # Чтение с таймаутом паузы T3.5: пустое чтение завершает сообщение
+        ser.timeout = max(framer.timeout_check_ns / 1e9, 0.001)
+        ser.reset_input_buffer()
+        # Первое сообщение может начаться с середины кадра - не учитываем его
+        skip_first = True
+        deadline = time.monotonic() + TRIAL_TIMEOUT_S
+        while self.active and not stats.decided and time.monotonic() < deadline:
+            chunk = ser.read(ser.in_waiting or 1)
+            now_ns = time.monotonic_ns()
+            if chunk:
+                stats.add_chunk(chunk)
+                records = framer.feed(chunk, now_ns)
+            else:
+                record = framer.flush(now_ns)
+                records = [record] if record is not None else []
+            if records and skip_first:
+                skip_first = False
+                del records[0]
+            messages = [record.data for record in records if len(record.data) >= 4]
+            stats.frames += len(messages)
+            stats.valid += sum(Frame.verify_many(messages))
+        return stats
+
+
+def scan_ports(scanners):
+    """
+    Сканирует несколько портов одновременно (поток на порт): общее время -
+    время самого долгого порта, а не сумма.
+
+    :param scanners: Список BusScanner
+    :return: Словарь порт -> результат BusScanner.scan() (None - не найдено
+        или ошибка сканирования порта)
+    """
+    results = {}
+
+    def scan(scanner):
+        result = None
+        try:
+            result = scanner.scan()
+        except (serial.SerialException, OSError) as error:
+            log.warning("%s: ошибка порта при сканировании: %s", scanner.port, error)
+        except Exception:
+            log.exception("%s: ошибка сканирования", scanner.port)
+        finally:
+            # Результат порта записывается всегда, даже при ошибке
+            results[scanner.port] = result
+
+    threads = [threading.Thread(target=scan, args=(scanner,), daemon=True) for scanner in scanners]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
@@ -1,7 +1,11 @@
+import os
+import select
 import serial
 import serial.tools.list_ports
+import threading
 import time
 import queue
+from typing import NamedTuple, Optional
 
 def read_list_ports():
     """
@@ -27,74 +31,271 @@ def open_serial_port(port, baudrate, bytesize, parity):
         print("Error:", str(ve))
     return ser
     
-def read_from_com(ser: serial.Serial, message_queue, enClear=False):
+class FrameRecord(NamedTuple):
+    """
+    Запись о принятом сообщении, передаваемая от потока чтения к декодеру.
+
+    data - сырые байты сообщения, timestamp_ns - монотонное время прихода
+    первого байта (time.monotonic_ns), seq - порядковый номер сообщения,
+    gap_ns - пауза перед сообщением (None для первого сообщения сессии),
+    port - номер порта захвата (при захвате нескольких портов).
+    """
+    data: bytes
+    timestamp_ns: int
+    seq: int
+    gap_ns: Optional[int]
+    port: int = 0
+
+
+class SessionClock:
+    """
+    Привязка монотонного времени захвата к настенным часам.
+
+    Берется один раз на сессию: все времена кадров остаются в
+    time.monotonic_ns, настенное время вычисляется только для отображения
+    (перевод часов во время сессии не влияет на интервалы).
+    """
+
+    def __init__(self):
+        self.wall_ns = time.time_ns()
+        self.monotonic_ns = time.monotonic_ns()
+
+    def wall_time_ns(self, monotonic_ns):
+        """Настенное время (как time.time_ns) для монотонного времени захвата"""
+        return self.wall_ns + (monotonic_ns - self.monotonic_ns)
+
+
+class RtuFramer:
+    """
+    Разбивает поток байт Modbus RTU на сообщения по паузам между порциями данных.
+
+    Байты поступают порциями (всё, что накопилось в in_waiting), каждой порции
+    присваивается монотонная метка времени момента чтения. Начало порции
+    оценивается как метка минус время передачи её байт, поэтому пауза перед
+    порцией не зависит от того, сколько байт было прочитано за раз.
+    """
+
+    def __init__(self, baudrate, enClear=False, k_transmission=1, port=0):
+        """
+        :param baudrate: Скорость передачи данных
+        :param enClear: Режим очистки буфера при паузе больше 1.5 символа
+        :param k_transmission: Коэффициент запаса для времени символа
+        :param port: Номер порта для записей FrameRecord
+        """
+        self.symbol_time_ns = k_transmission * 11 * 1_000_000_000 // baudrate  # Время передачи одного символа
+        self.timeout_check_ns = 35 * self.symbol_time_ns // 10  # Пауза конца сообщения (T3.5)
+        self.clear_check_ns = 15 * self.symbol_time_ns // 10  # Пауза внутри сообщения (T1.5)
+        self.enClear = enClear
+        self.buffer = bytearray()
+        self.start_ns = 0  # Время прихода первого байта буфера
+        self.last_ns = None  # Время приема последнего байта буфера
+        self.prev_end_ns = None  # Время окончания предыдущего сообщения
+        self.seq = 0
+        self.port = port
+
+    def _emit(self):
+        """Формирует запись из буфера и очищает его"""
+        gap_ns = self.start_ns - self.prev_end_ns if self.prev_end_ns is not None else None
+        record = FrameRecord(bytes(self.buffer), self.start_ns, self.seq, gap_ns, self.port)
+        self.seq += 1
+        self.prev_end_ns = self.last_ns
+        self.buffer.clear()
+        return record
+
+    def feed(self, chunk, timestamp_ns):
+        """
+        Добавляет порцию байт и возвращает список завершенных сообщений.
+
+        :param chunk: Прочитанные байты
+        :param timestamp_ns: Монотонное время чтения порции в наносекундах
+        :return: Список FrameRecord, завершенных паузой перед порцией
+        """
+        records = []
+        if not chunk:
+            return records
+        # Оценка времени прихода первого байта порции
+        chunk_start_ns = timestamp_ns - len(chunk) * self.symbol_time_ns
+        if self.buffer:
+            gap_ns = chunk_start_ns - self.last_ns
+            if gap_ns >= self.timeout_check_ns:
+                records.append(self._emit())
+            elif self.enClear and gap_ns > self.clear_check_ns:
+                # Разрыв внутри сообщения - отбрасываем неполные данные
+                self.buffer.clear()
+        if not self.buffer:
+            self.start_ns = chunk_start_ns
+        self.buffer.extend(chunk)
+        self.last_ns = timestamp_ns
+        return records
+
+    def flush(self, timestamp_ns=None):
+        """
+        Возвращает накопленное сообщение, если после него прошла пауза T3.5.
+
+        :param timestamp_ns: Текущее монотонное время; None - вернуть буфер без проверки паузы
+        :return: FrameRecord или None
+        """
+        if not self.buffer:
+            return None
+        if timestamp_ns is not None and timestamp_ns - self.last_ns < self.timeout_check_ns:
+            return None
+        return self._emit()
+
+    def idle_interval(self):
+        """Интервал опроса порта без данных в секундах: половина T3.5, от 0.5 до 10 мс"""
+        return min(max(self.timeout_check_ns / 2e9, 0.0005), 0.01)
+
+
+def _put_message(message_queue, record):
+    """
+    Вставка записи в очередь.
+
+    Для RingBuffer переполнение обрабатывается политикой буфера (потери
+    считаются в самом буфере); queue.Full возможен только при ожидании с таймаутом.
+    """
+    try:
+        message_queue.put(record)
+    except queue.Full:
+        # Если очередь переполнена - пропускаем сообщение
+        pass
+
+
+def read_from_com(ser: serial.Serial, message_queue, enClear=False, port=0):
     """
     Читает данные из COM-порта и определяет границы Modbus RTU сообщений.
-    Сообщения определяются по паузе 3.5 символа между байтами.
+    Сообщения определяются по паузе 3.5 символа между порциями байт.
+    За один вызов read() забирается всё содержимое in_waiting.
     
     :param ser: Объект Serial для чтения
-    :param message_queue: Очередь для передачи сообщений
+    :param message_queue: Очередь для передачи сообщений (FrameRecord)
     :param enClear: Режим очистки буфера при частичных сообщениях
+    :param port: Номер порта для записей FrameRecord
     """
-    buffer = bytearray()  # Создаем пустой bytearray для хранения данных
-    last_time = time.time()  # Время получения последнего байта
-    k_transmission = 1
-    symbol_time = k_transmission * 11 / ser.baudrate  # Пауза между символами в секундах
-    timeout_check = 3.5 * symbol_time  # Таймаут для определения конца сообщения
+    framer = RtuFramer(ser.baudrate, enClear, port=port)
+    idle_interval = framer.idle_interval()
     
     try:
         while ser.is_open:
-            # Проверяем наличие данных
-            if ser.in_waiting > 0:
-                current_time = time.time()
-                time_diff = current_time - last_time
-                # Читаем новый байт из COM порта
-                byte = ser.read()
-                last_time = current_time
-
-                # Если пауза больше 3.5 символов (полное сообщение), выводим его
-                if time_diff >= timeout_check:
-                    if buffer:
-                        message_hex = buffer.hex()
-                        try:
-                            message_queue.put_nowait(message_hex)  # Неблокирующая вставка
-                        except queue.Full:
-                            # Если очередь переполнена - пропускаем старое сообщение
-                            pass
-                        buffer.clear()  # Очищаем буфер
-
-                # Если активирован разборчивый режим и пауза больше 1.5 символа, но меньше 3.5 символов
-                elif enClear and time_diff > 1.5 * symbol_time:
-                    buffer.clear()  # Очищаем буфер
-
-                buffer.extend(byte)  # Добавляем байт в буфер
+            waiting = ser.in_waiting
+            if waiting > 0:
+                # Читаем сразу все накопленные байты одним вызовом
+                chunk = ser.read(waiting)
+                for record in framer.feed(chunk, time.monotonic_ns()):
+                    _put_message(message_queue, record)
             else:
-                # Если нет данных, проверяем, не нужно ли отправить сообщение из буфера
-                # (если прошло достаточно времени после последнего байта)
-                if buffer:
-                    current_time = time.time()
-                    time_diff = current_time - last_time
-                    if time_diff >= timeout_check:
-                        message_hex = buffer.hex()
-                        try:
-                            message_queue.put_nowait(message_hex)  # Неблокирующая вставка
-                        except queue.Full:
-                            # Если очередь переполнена - пропускаем старое сообщение
-                            pass
-                        buffer.clear()
-                time.sleep(0.01)  # Небольшая задержка, чтобы не нагружать CPU
+                # Если нет данных, проверяем, не закончилось ли сообщение в буфере
+                record = framer.flush(time.monotonic_ns())
+                if record is not None:
+                    _put_message(message_queue, record)
+                time.sleep(idle_interval)
                 
     except (serial.SerialException, OSError):
         # Порт закрыт или произошла ошибка
         pass
     finally:
         # Отправляем последнее сообщение из буфера, если оно есть
-        if buffer:
-            message_hex = buffer.hex()
-            try:
-                message_queue.put_nowait(message_hex)  # Неблокирующая вставка
-            except queue.Full:
-                pass
+        record = framer.flush()
+        if record is not None:
+            _put_message(message_queue, record)
+
+def read_from_com_events(ser: serial.Serial, message_queue, enClear=False, wake_interval=0.5, port=0):
+    """
+    Событийный вариант read_from_com: поток спит в ядре, пока нет данных.
+    На POSIX ожидание выполняется через select() на дескрипторе порта с таймаутом
+    до истечения паузы T3.5 после последнего байта, поэтому сообщение отдается
+    сразу по окончании паузы. На остальных платформах используется таймаут
+    чтения pyserial: без данных чтение блокируется на wake_interval, а пока
+    принимается сообщение - до конца паузы T3.5.
+    
+    :param ser: Объект Serial для чтения
+    :param message_queue: Очередь для передачи сообщений (FrameRecord)
+    :param enClear: Режим очистки буфера при частичных сообщениях
+    :param wake_interval: Максимальное время сна без данных для проверки закрытия порта, с
+    :param port: Номер порта для записей FrameRecord
+    """
+    framer = RtuFramer(ser.baudrate, enClear, port=port)
+    use_select = os.name == 'posix' and hasattr(ser, 'fileno')
+    frame_timeout = max(framer.timeout_check_ns / 1e9, 0.001)
+    
+    try:
+        while ser.is_open:
+            if use_select:
+                # Ждем данные не дольше, чем до конца паузы T3.5 текущего сообщения
+                if framer.buffer:
+                    remaining_ns = framer.last_ns + framer.timeout_check_ns - time.monotonic_ns()
+                    wait = min(max(remaining_ns, 0) / 1e9, wake_interval)
+                else:
+                    wait = wake_interval
+                readable, _, _ = select.select([ser.fileno()], [], [], wait)
+                if not ser.is_open:
+                    # Порт закрыт из другого потока во время ожидания (дескриптор "готов")
+                    break
+                chunk = ser.read(ser.in_waiting or 1) if readable else b""
+            else:
+                # Блокирующее чтение первого байта, затем весь остаток: без данных ждем
+                # wake_interval, внутри сообщения - паузу T3.5 (таймаут меняется только при переходе)
+                wait = frame_timeout if framer.buffer else wake_interval
+                if ser.timeout != wait:
+                    ser.timeout = wait
+                chunk = ser.read(ser.in_waiting or 1)
+            now_ns = time.monotonic_ns()
+            if chunk:
+                for record in framer.feed(chunk, now_ns):
+                    _put_message(message_queue, record)
+            else:
+                record = framer.flush(now_ns)
+                if record is not None:
+                    _put_message(message_queue, record)
+                
+    except (serial.SerialException, OSError):
+        # Порт закрыт (в том числе из другого потока) или произошла ошибка
+        pass
+    except (TypeError, ValueError):
+        # Порт закрыт из другого потока между проверкой и чтением: pyserial обращается
+        # к дескриптору None/-1. При открытом порте это ошибка программы
+        if ser.is_open:
+            raise
+    finally:
+        record = framer.flush()
+        if record is not None:
+            _put_message(message_queue, record)
+
+class PortCapture:
+    """
+    Захват одного порта из нескольких: свой поток чтения и свой буфер в
+    общей группе RingBufferGroup, записи помечены номером порта.
+
+    :param port: Номер порта (индекс в списке портов захвата)
+    :param ser: Открытый объект Serial
+    :param message_queue: RingBufferGroup конвейера
+    :param capacity: Емкость буфера порта
+    :param policy: Политика переполнения буфера порта
+    """
+
+    def __init__(self, port, ser, message_queue, capacity, policy):
+        self.port = port
+        self.ser = ser
+        self.message_queue = message_queue
+        self.buffer = message_queue.add(capacity, policy)
+        self.symbol_time_ns = 11 * 1_000_000_000 // ser.baudrate
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        try:
+            read_from_com_events(self.ser, self.buffer, port=self.port)
+        finally:
+            self.message_queue.close(self.buffer)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        """Закрывает порт; поток чтения отдает последнее сообщение и завершается"""
+        try:
+            self.ser.close()
+        except (serial.SerialException, OSError):
+            pass
+
 
 if __name__ == '__main__':
     try:
@@ -0,0 +1,231 @@
+import time
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt6.QtGui import QColor
+
+from decode import error_description
+from serial_reader import SessionClock
+from frame_store import FLAG_CRC_OK, FLAG_EXCEPTION, FLAG_RESPONSE, NONE, RowFilter
+from row_order import RowOrder
+
+# Заголовки колонок таблицы Сниффер
+SNIFFER_HEADERS = [
+    "Счетчик\nсообщений",
+    "Время",
+    "Тип сообщения",
+    "Адрес",
+    "Функция",
+    "Адрес 1-го\nрегистра",
+    "Количество\nрегистров/\nбайт",
+    "Количество\nбайт далее",
+    "Данные",
+    "CRC",
+    "CRC_OK",
+    "Порт",
+]
+
+# Цвета строк по направлению кадра
+REQUEST_COLOR = QColor(215, 228, 242)  # запрос — светло-синий
+EXCEPTION_COLOR = QColor(255, 199, 206)  # ответ-исключение — светло-красный
+RESPONSE_COLOR = QColor(226, 239, 218)  # ответ — светло-зеленый
+
+
+def format_bytes(data):
+    """Форматирует байты для ячейки таблицы: "aa bb cc" или "-" """
+    return data.hex(' ') if data else '-'
+
+
+def format_wall_time(time_ns):
+    """Время вида ЧЧ:ММ:СС.ммм из time.time_ns()"""
+    seconds, ns = divmod(time_ns, 1_000_000_000)
+    return time.strftime("%H:%M:%S", time.localtime(seconds)) + f".{ns // 1_000_000:03d}"
+
+
+class SnifferModel(QAbstractTableModel):
+    """
+    Модель таблицы Сниффер поверх FrameStore.
+
+    Текст ячеек формируется только в data(), то есть только для видимых
+    ячеек. Строки адресуются постоянными идентификаторами строк хранилища;
+    порядок строк и перевод идентификатора в строку представления и обратно
+    ведет RowOrder.
+
+    Между begin_batch() и end_batch() изменения накапливаются: строки,
+    добавляемые в конец таблицы, вставляются одним beginInsertRows, а
+    изменения существующих строк - одним dataChanged.
+    """
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.row_filter = RowFilter(store)
+        self.order = RowOrder(self.row_filter)
+        self.clock = SessionClock()  # Привязка времени захвата к настенным часам
+        self.port_names = []  # Имена портов захвата по номеру порта
+        self.batch = False
+        self.pending_rows = []  # Строки, добавляемые в конец таблицы в пакете
+        self.changed_rows = set()  # Измененные в пакете строки
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.order)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(SNIFFER_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole:
+            if orientation == Qt.Orientation.Horizontal:
+                return SNIFFER_HEADERS[section]
+            return str(section + 1)
+        return None
+
+    def row_id(self, row):
+        """Идентификатор строки хранилища для строки представления"""
+        return self.order.row_id(row)
+
+    def row(self, row_id):
+        """Строка представления для идентификатора строки или None, если строка скрыта"""
+        return self.order.row(row_id)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.cell_text(self.order.row_id(index.row()), index.column())
+        if role == Qt.ItemDataRole.BackgroundRole:
+            flags = self.store.frame_flags[self.store.row_frame[self.order.row_id(index.row())]]
+            if not flags & FLAG_RESPONSE:
+                return REQUEST_COLOR
+            if flags & FLAG_EXCEPTION:
+                return EXCEPTION_COLOR
+            return RESPONSE_COLOR
+        if role == Qt.ItemDataRole.ToolTipRole and index.column() in (6, 8):
+            # Длинный текст ошибки и данных целиком во всплывающей подсказке
+            return self.cell_text(self.order.row_id(index.row()), index.column())
+        return None
+
+    def cell_text(self, row_id, column):
+        """Текст ячейки строки хранилища row_id"""
+        store = self.store
+        if column == 0:
+            return str(store.row_counter[row_id])
+        if column == 1:
+            latency_ns = store.row_latency_ns[row_id]
+            if latency_ns != NONE:
+                return f"+{latency_ns / 1_000_000:.1f} ms"
+            return format_wall_time(self.clock.wall_time_ns(store.row_time_ns[row_id]))
+        frame_id = store.row_frame[row_id]
+        flags = store.frame_flags[frame_id]
+        if column == 2:
+            return "Ответ" if flags & FLAG_RESPONSE else "Запрос"
+        if column == 3:
+            return str(store.frame_address[frame_id])
+        if column == 4:
+            return str(store.frame_function[frame_id])
+        if column == 5:
+            start = store.frame_start[frame_id]
+            return str(start) if start != NONE else "-"
+        if column == 6:
+            if flags & FLAG_EXCEPTION:
+                return f"Ошибка: {error_description(store.frame_exception[frame_id])}"
+            quantity = store.frame_quantity[frame_id]
+            if quantity != NONE:
+                return str(quantity)
+            byte_count = store.frame_byte_count[frame_id]
+            return str(byte_count) if byte_count != NONE else "-"
+        if column == 7:
+            # Количество байт далее только вместе с количеством регистров (15, 16)
+            byte_count = store.frame_byte_count[frame_id]
+            if store.frame_quantity[frame_id] != NONE and byte_count != NONE:
+                return str(byte_count)
+            return "-"
+        if column == 8:
+            return format_bytes(store.payload(frame_id))
+        if column == 9:
+            return format_bytes(store.received_crc(frame_id))
+        if column == 10:
+            return str(bool(flags & FLAG_CRC_OK))
+        if column == 11:
+            port = store.frame_port[frame_id]
+            return self.port_names[port] if port < len(self.port_names) else str(port)
+        return None
+
+    def insert_row(self, row_id, after=None):
+        """
+        Вставляет новую строку хранилища row_id после строки after (в конец,
+        если after is None); строка проверяется только активным фильтром.
+        """
+        visible = self.row_filter.test(row_id)
+        if self.batch:
+            # Вставка под последней строкой таблицы - тоже добавление в конец
+            if after is None or after == (self.pending_rows[-1] if self.pending_rows else self.order.last_row_id()):
+                self.pending_rows.append(row_id)
+                return
+            self.flush_rows()
+        if not visible:
+            self.order.insert(row_id, after)
+            return
+        row = self.order.insert_row(after)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.order.insert(row_id, after)
+        self.endInsertRows()
+
+    def flush_rows(self):
+        """Вставляет накопленные в пакете строки в конец таблицы одним beginInsertRows"""
+        if not self.pending_rows:
+            return
+        rows, self.pending_rows = self.pending_rows, []
+        mask = self.row_filter.mask
+        first = len(self.order)
+        count = sum(map(mask.__getitem__, rows))
+        if count:
+            self.beginInsertRows(QModelIndex(), first, first + count - 1)
+        for row_id in rows:
+            self.order.insert(row_id)
+        if count:
+            self.endInsertRows()
+
+    def row_changed(self, row_id):
+        """Сообщает представлению об изменении строки (счетчик, время, данные)"""
+        if self.batch:
+            self.changed_rows.add(row_id)
+            return
+        row = self.order.row(row_id)
+        if row is not None:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(SNIFFER_HEADERS) - 1))
+
+    def begin_batch(self):
+        """Начинает пакет изменений"""
+        self.batch = True
+
+    def end_batch(self):
+        """Завершает пакет: одна вставка строк в конец и один dataChanged"""
+        self.batch = False
+        self.flush_rows()
+        if not self.changed_rows:
+            return
+        rows = [row for row in map(self.order.row, self.changed_rows) if row is not None]
+        self.changed_rows.clear()
+        if rows:
+            self.dataChanged.emit(self.index(min(rows), 0), self.index(max(rows), len(SNIFFER_HEADERS) - 1))
+
+    def set_filter(self, crc_ok_only=False, errors_only=False, address=None, function=None):
+        """Меняет фильтр строк; видимые строки берутся из маски фильтра"""
+        if not self.row_filter.set(crc_ok_only, errors_only, address, function):
+            return
+        self.beginResetModel()
+        self.order.rebuild()
+        self.endResetModel()
+
+    def clear(self):
+        """Удаляет все строки"""
+        self.beginResetModel()
+        self.order.clear()
+        self.row_filter.clear()
+        self.pending_rows = []
+        self.changed_rows.clear()
+        self.endResetModel()
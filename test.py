@@ -91,7 +91,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                     raw_data = self.raw_data_queue.get()
                     try:
                         # Создаем объект Frame для декодирования
-                        frame = Frame(bytes.fromhex(raw_data))
+                        frame = Frame(raw_data.data)
                         self.decoded_data_queue.put(frame.get_list())
                     except Exception as e:
                         print(f"Ошибка декодирования: {e}")
@@ -0,0 +1,72 @@
+import io
+import os
+import tempfile
+import unittest
+
+from capture import INDEX_STRIDE, CaptureReader, CaptureWriter
+from serial_reader import FrameRecord, SessionClock
+
+REQUEST = bytes.fromhex("010300000001840a")
+
+
+def interleaved_records(count):
+    """
+    Кадры двух портов: порт 0 (на нем точки индекса) записывается с опозданием,
+    поэтому перед точкой индекса есть кадры порта 1 с большим временем
+    """
+    records = []
+    for number in range(count):
+        port = number % 2
+        timestamp_ns = number * 1_000_000 - (1 - port) * 5_500_000
+        records.append(FrameRecord(REQUEST, timestamp_ns, number, None, port))
+    return records
+
+
+class CaptureSeekTimeTest(unittest.TestCase):
+    """seek_time находит первый в порядке записи кадр не раньше заданного времени"""
+
+    def setUp(self):
+        self.records = interleaved_records(3 * INDEX_STRIDE + 17)
+        handle, self.path = tempfile.mkstemp(suffix=".mbcap")
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def write(self, close):
+        stream = io.BytesIO()
+        writer = CaptureWriter(stream, 19200, SessionClock())
+        for record in self.records:
+            writer.write(record)
+        if close:
+            writer.close()
+        with open(self.path, "wb") as capture:
+            capture.write(stream.getvalue())
+
+    def expected(self, time_ns):
+        for record in self.records:
+            if record.timestamp_ns >= time_ns:
+                return record.seq
+        return len(self.records)
+
+    def check_seek_time(self):
+        reader = CaptureReader(self.path)
+        try:
+            self.assertEqual(len(reader), len(self.records))
+            for record in self.records:
+                for time_ns in (record.timestamp_ns - 1, record.timestamp_ns, record.timestamp_ns + 1):
+                    self.assertEqual(reader.seek_time(time_ns), self.expected(time_ns), time_ns)
+        finally:
+            reader.close()
+
+    def test_index_from_trailer(self):
+        self.write(close=True)
+        self.check_seek_time()
+
+    def test_scanned_index(self):
+        self.write(close=False)
+        self.check_seek_time()
+
+
+if __name__ == '__main__':
+    unittest.main()
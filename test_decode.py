@@ -0,0 +1,42 @@
+import unittest
+
+from decode import MAX_FRAME_LENGTH, crc16, resync
+
+
+def frame(*body):
+    message = bytes(body)
+    return message + crc16(message)
+
+
+FRAME1 = frame(0x01, 0x03, 0x00, 0x00, 0x00, 0x02)
+FRAME2 = frame(0x01, 0x03, 0x04, 0x00, 0x0A, 0x00, 0x0B)
+
+
+class ResyncTest(unittest.TestCase):
+    """Деление склеенного буфера на кадры по границам CRC"""
+
+    def test_glued_frames(self):
+        self.assertEqual(resync(FRAME1 + FRAME2), [(0, FRAME1), (8, FRAME2)])
+
+    def test_garbage_prefix(self):
+        message = b"\x00\x13" + FRAME1 + FRAME2
+        self.assertEqual(resync(message), [(0, b"\x00\x13"), (2, FRAME1), (10, FRAME2)])
+
+    def test_garbage_between(self):
+        message = FRAME1 + b"\xFF\x00\x13" + FRAME2
+        self.assertEqual(resync(message), [(0, FRAME1), (8, b"\xFF\x00\x13"), (11, FRAME2)])
+
+    def test_garbage_suffix(self):
+        message = FRAME1 + FRAME2 + b"\x00\x13"
+        self.assertEqual(resync(message), [(0, FRAME1), (8, FRAME2), (17, b"\x00\x13")])
+
+    def test_skip_is_bounded(self):
+        garbage = bytes([0x55]) * (MAX_FRAME_LENGTH + 10)
+        message = garbage + FRAME1
+        parts = resync(message)
+        self.assertEqual(b"".join(part for _, part in parts), message)
+        self.assertNotIn((len(garbage), FRAME1), parts)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+from decode import Direction, Frame, crc16
+from matcher import TransactionMatcher
+
+
+def frame(*body):
+    message = bytes(body)
+    return Frame(message + crc16(message)).decode()
+
+
+class TransactionMatcherRepeatTest(unittest.TestCase):
+    """Повтор запроса мастером до ответа не должен считаться ответом"""
+
+    def check_repeat(self, start_high):
+        matcher = TransactionMatcher(symbol_time_ns=1000)
+        # Чтение 20 катушек: ответ (3 байта данных) той же длины, что и запрос - 8 байт
+        first = matcher.feed(frame(0x11, 0x01, start_high, 0x10, 0x00, 0x14), 0)
+        repeat = matcher.feed(frame(0x11, 0x01, start_high, 0x10, 0x00, 0x14), 50_000)
+        response = matcher.feed(frame(0x11, 0x01, 0x03, 0xAA, 0x55, 0x0F), 60_000)
+
+        self.assertIsNone(first.response)
+        self.assertIsNot(repeat, first)
+        self.assertEqual(repeat.request.direction, Direction.REQUEST)
+        self.assertIs(response, repeat)
+        self.assertEqual(response.response.direction, Direction.RESPONSE)
+        self.assertEqual(response.response.byte_count, 3)
+        self.assertEqual(response.latency_ns, 60_000 - (50_000 + 8 * 1000))
+
+    def test_repeat_is_request(self):
+        self.check_repeat(0x00)
+
+    def test_repeat_resembling_response_is_request(self):
+        # Старший байт адреса 3 совпадает с байтом количества ответа
+        self.check_repeat(0x03)
+
+    def test_echo_response_is_response(self):
+        matcher = TransactionMatcher()
+        request = matcher.feed(frame(0x11, 0x06, 0x00, 0x01, 0x00, 0x03), 0)
+        response = matcher.feed(frame(0x11, 0x06, 0x00, 0x01, 0x00, 0x03), 10_000)
+
+        self.assertIs(response, request)
+        self.assertEqual(response.response.direction, Direction.RESPONSE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import threading
+import time
+import unittest
+
+import serial
+
+from serial_reader import read_from_com_events
+
+REQUEST = bytes.fromhex("010300000001840a")
+
+
+class _Records(list):
+    def put(self, record):
+        self.append(record)
+
+
+@unittest.skipUnless(hasattr(os, "openpty"), "нужна пара псевдотерминалов")
+class ReadFromComEventsPtyTest(unittest.TestCase):
+    """Событийное чтение через пару псевдотерминалов и остановка закрытием порта из другого потока"""
+
+    def setUp(self):
+        self.master, self.slave = os.openpty()
+        self.ser = serial.serial_for_url(os.ttyname(self.slave), baudrate=19200, timeout=0)
+        self.records = _Records()
+        self.errors = []
+        self.thread = threading.Thread(target=self.run_reader)
+
+    def tearDown(self):
+        self.ser.close()
+        os.close(self.master)
+        os.close(self.slave)
+
+    def run_reader(self):
+        try:
+            read_from_com_events(self.ser, self.records, wake_interval=0.2)
+        except Exception as error:
+            self.errors.append(error)
+
+    def test_frame_then_stop(self):
+        self.thread.start()
+        os.write(self.master, REQUEST)
+        time.sleep(0.05)
+        self.ser.close()
+        self.thread.join(2)
+
+        self.assertFalse(self.thread.is_alive())
+        self.assertEqual(self.errors, [])
+        self.assertEqual([bytes(record.data) for record in self.records], [REQUEST])
+
+    def test_stop_while_waiting(self):
+        # Закрытие во время select(): дескриптор становится "готов", а порт уже закрыт
+        self.thread.start()
+        time.sleep(0.01)
+        self.ser.close()
+        self.thread.join(2)
+
+        self.assertFalse(self.thread.is_alive())
+        self.assertEqual(self.errors, [])
+        self.assertEqual(self.records, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+import math
+import time
+
+from PyQt6.QtCore import QPointF, QRectF, Qt, QTimer
+from PyQt6.QtGui import QColor, QPainter, QPen, QPolygonF
+from PyQt6.QtWidgets import QWidget
+
+from register_image import COILS, DISCRETE_INPUTS
+from register_profiles import HOLDING_REGISTERS, INPUT_REGISTERS
+
+# Окна графика: (подпись, длительность, нс)
+TREND_WINDOWS = [
+    ("1 мин", 60_000_000_000),
+    ("10 мин", 600_000_000_000),
+    ("1 ч", 3_600_000_000_000),
+    ("4 ч", 14_400_000_000_000),
+    ("24 ч", 86_400_000_000_000),
+]
+
+# Проверка необходимости перерисовки, мс
+REPAINT_INTERVAL_MS = 500
+
+SPACE_SHORT_NAMES = {COILS: "C", DISCRETE_INPUTS: "DI", HOLDING_REGISTERS: "HR", INPUT_REGISTERS: "IR"}
+
+SERIES_COLORS = [
+    QColor(31, 119, 180), QColor(255, 127, 14), QColor(44, 160, 44), QColor(214, 39, 40),
+    QColor(148, 103, 189), QColor(140, 86, 75), QColor(227, 119, 194), QColor(127, 127, 127),
+]
+
+# Пикселей по ширине на точку ряда (корзину min/max)
+PIXELS_PER_POINT = 2
+
+MARGIN_LEFT = 70
+MARGIN_RIGHT = 10
+MARGIN_TOP = 10
+MARGIN_BOTTOM = 22
+
+
+def series_label(key):
+    """Подпись ряда: "ведомый HR регистр" """
+    port, slave, space, address = key
+    return f"{slave} {SPACE_SHORT_NAMES.get(space, space)} {address}"
+
+
+def format_value(value):
+    return f"{value:.6g}"
+
+
+class TrendPlot(QWidget):
+    """
+    График истории выбранных регистров за последнее окно времени.
+
+    Каждый ряд запрашивает у RegisterHistory не больше точки на
+    PIXELS_PER_POINT пикселей ширины, поэтому стоимость отрисовки не зависит
+    от длины окна.
+    Пока идет захват, график перерисовывается не чаще REPAINT_INTERVAL_MS и
+    только если история, ряды или окно изменились.
+
+    history и session (SnifferModel - привязка времени к часам) задаются
+    после создания виджета.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.history = None
+        self.session = None
+        self.keys = []
+        self.window_ns = TREND_WINDOWS[1][1]
+        self.painted_state = None
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.check_repaint)
+        self.timer.start(REPAINT_INTERVAL_MS)
+
+    def set_keys(self, keys):
+        """Показывает ряды регистров keys: (порт, ведомый, пространство, адрес)"""
+        self.keys = list(keys)
+        self.update()
+
+    def set_window(self, window_ns):
+        self.window_ns = window_ns
+        self.update()
+
+    def state(self):
+        history = self.history
+        return (history.version, history.time_ns, tuple(self.keys), self.window_ns, self.width(), self.height())
+
+    def check_repaint(self):
+        if self.history is not None and self.isVisible() and self.state() != self.painted_state:
+            self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.GlobalColor.white)
+        history = self.history
+        if history is None:
+            return
+        self.painted_state = self.state()
+        plot = QRectF(MARGIN_LEFT, MARGIN_TOP,
+                      max(self.width() - MARGIN_LEFT - MARGIN_RIGHT, 1), max(self.height() - MARGIN_TOP - MARGIN_BOTTOM, 1))
+        painter.setPen(QColor(160, 160, 160))
+        painter.drawRect(plot)
+        end_ns = history.time_ns
+        if not self.keys or end_ns is None:
+            painter.drawText(plot, Qt.AlignmentFlag.AlignCenter,
+                             "Выберите регистры в таблице \"Значения\" или \"Регистры\"" if not self.keys else "Нет данных")
+            return
+        start_ns = end_ns - self.window_ns
+
+        rows = []
+        low = math.inf
+        high = -math.inf
+        for key in self.keys:
+            series = history.series.get(key)
+            if series is None:
+                continue
+            points = series.points(start_ns, end_ns, int(plot.width()) // PIXELS_PER_POINT)
+            if not points[0]:
+                continue
+            rows.append((key, points))
+            low = min(low, min(filter(math.isfinite, points[1]), default=math.inf))
+            high = max(high, max(filter(math.isfinite, points[2]), default=-math.inf))
+        if not rows or low > high:
+            painter.drawText(plot, Qt.AlignmentFlag.AlignCenter, "Нет данных")
+            return
+        if low == high:
+            low -= 1
+            high += 1
+
+        x_scale = plot.width() / self.window_ns
+        left = plot.left() - start_ns * x_scale
+        y_scale = plot.height() / (high - low)
+        bottom = plot.bottom() + low * y_scale
+
+        def y_of(value):
+            if not math.isfinite(value):
+                value = high if value > 0 else low
+            return bottom - value * y_scale
+
+        def y_list(values):
+            if all(map(math.isfinite, values)):
+                return [bottom - value * y_scale for value in values]
+            return list(map(y_of, values))
+
+        # Оси: пределы значений и время краев окна
+        metrics = painter.fontMetrics()
+        painter.setPen(Qt.GlobalColor.black)
+        for value in (low, high):
+            text = format_value(value)
+            painter.drawText(QPointF(plot.left() - metrics.horizontalAdvance(text) - 4, y_of(value) + metrics.ascent() / 2), text)
+        for time_ns, align_right in ((start_ns, False), (end_ns, True)):
+            text = self.time_text(time_ns)
+            x = plot.right() - metrics.horizontalAdvance(text) if align_right else plot.left()
+            painter.drawText(QPointF(x, plot.bottom() + metrics.ascent() + 4), text)
+
+        painter.setClipRect(plot)
+        for number, (key, (times, mins, maxs, lasts)) in enumerate(rows):
+            color = SERIES_COLORS[number % len(SERIES_COLORS)]
+            # Ступенька: значение держится до следующей точки, в точке - размах min..max корзины.
+            # Ломаная без сглаживания: точек меньше, чем пикселей по ширине
+            xs = [left + max(time_ns, start_ns) * x_scale for time_ns in times]
+            y_lasts = y_list(lasts)
+            # Вершины точки: значение до нее, минимум, максимум, последнее значение
+            vertex_xs = [x for x in xs for _ in range(4)][1:] + [plot.right()]
+            vertex_ys = [y for ys in zip([None] + y_lasts, y_list(mins), y_list(maxs), y_lasts) for y in ys][1:]
+            vertex_ys.append(y_lasts[-1])
+            painter.setPen(QPen(color, 0))
+            painter.drawPolyline(QPolygonF(list(map(QPointF, vertex_xs, vertex_ys))))
+            # Легенда
+            text = f"{series_label(key)}: {format_value(lasts[-1])}"
+            legend_y = plot.top() + (number + 1) * (metrics.height() + 2)
+            painter.fillRect(QRectF(plot.left() + 6, legend_y - metrics.ascent() + 2, 10, metrics.ascent() - 4), color)
+            painter.drawText(QPointF(plot.left() + 22, legend_y), text)
+
+    def time_text(self, time_ns):
+        """Настенное время ЧЧ:ММ:СС точки истории"""
+        if self.session is None:
+            return ""
+        return time.strftime("%H:%M:%S", time.localtime(self.session.clock.wall_time_ns(time_ns) // 1_000_000_000))
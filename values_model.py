@@ -0,0 +1,175 @@
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import QComboBox, QStyledItemDelegate
+
+from register_codec import REGISTER_TYPES, WIDE_TYPES, DEFAULT_TYPE, format_registers
+
+# Заголовки колонок таблицы "Значения"
+VALUES_HEADERS = ["Регистр", "Тип данных", "Значение"]
+TYPE_COLUMN = 1
+
+# Регистр, занятый 4-байтным значением предыдущего регистра
+RESERVED_COLOR = QColor(220, 220, 220)
+
+
+class ValuesModel(QAbstractTableModel):
+    """
+    Модель таблицы "Значения": регистры данных выбранного кадра.
+
+    Типы регистров берутся из RegisterProfiles по расположению данных кадра
+    (ведомый, пространство, номер первого регистра), значения всех регистров
+    считаются профилями один раз на кадр, текст ячеек отдается только видимым
+    строкам. Для данных без номеров регистров (адрес неизвестен, не регистры)
+    типы выбираются только на время показа кадра.
+
+    :param profiles: RegisterProfiles
+    """
+
+    def __init__(self, profiles, parent=None):
+        super().__init__(parent)
+        self.profiles = profiles
+        self.data_bytes = b""
+        self.location = None  # (slave, space, start) данных кадра или None
+        self.register_types = []
+        self.values = []  # Текст значений по регистрам
+        self.placeholder = False  # Кадр без значений: одна строка с прочерками
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return 1 if self.placeholder else len(self.values)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(VALUES_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole:
+            if orientation == Qt.Orientation.Horizontal:
+                return VALUES_HEADERS[section]
+            return str(section + 1)
+        return None
+
+    def reserved(self, reg_idx):
+        """Регистр занят 4-байтным значением предыдущего регистра"""
+        return 0 < reg_idx <= len(self.register_types) and self.register_types[reg_idx - 1] in WIDE_TYPES
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        reg_idx = index.row()
+        column = index.column()
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            if self.placeholder:
+                return "-"
+            if column == 0:
+                # Номер регистра ведомого, если адрес данных известен, иначе номер в кадре
+                return f"Регистр {reg_idx if self.location is None else self.location[2] + reg_idx}"
+            if column == TYPE_COLUMN:
+                return self.register_types[reg_idx] if reg_idx < len(self.register_types) else DEFAULT_TYPE
+            return self.values[reg_idx]
+        if role == Qt.ItemDataRole.BackgroundRole and not self.placeholder and self.reserved(reg_idx):
+            return RESERVED_COLOR
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        if self.placeholder:
+            return Qt.ItemFlag.ItemIsEnabled
+        if self.reserved(index.row()):
+            # Тип зарезервированного регистра не выбирается
+            return Qt.ItemFlag.ItemIsSelectable
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if index.column() == TYPE_COLUMN:
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.EditRole or index.column() != TYPE_COLUMN or self.placeholder:
+            return False
+        self.set_register_type(index.row(), value)
+        return True
+
+    def set_register_type(self, reg_idx, reg_type):
+        """
+        Меняет тип регистра. 4-байтный тип занимает следующий регистр - его
+        тип сбрасывается на тип по умолчанию.
+        """
+        if self.location is not None:
+            slave, space, start = self.location
+            self.profiles.set_type(slave, space, start + reg_idx, reg_type)
+        else:
+            register_types = self.register_types
+            register_types[reg_idx] = reg_type
+            if reg_type in WIDE_TYPES and reg_idx + 1 < len(register_types):
+                register_types[reg_idx + 1] = DEFAULT_TYPE
+        self._update_values()
+        # Тип регистра влияет только на него и на следующий регистр
+        last = min(reg_idx + 1, len(self.values) - 1)
+        self.dataChanged.emit(self.index(reg_idx, 0), self.index(last, len(VALUES_HEADERS) - 1))
+
+    def _update_values(self):
+        if self.placeholder:
+            self.register_types = []
+            self.values = []
+        elif self.location is not None:
+            self.register_types, self.values = self.profiles.format(*self.location, self.data_bytes)
+        else:
+            self.values = format_registers(self.data_bytes, self.register_types)
+
+    def set_frame(self, data_bytes, location=None):
+        """
+        Показывает регистры данных кадра.
+
+        :param data_bytes: Байты значений кадра (None или пусто - прочерк)
+        :param location: (slave, space, start) данных кадра или None
+        """
+        self.beginResetModel()
+        self.data_bytes = data_bytes or b""
+        self.location = location
+        self.placeholder = not data_bytes
+        self.register_types = [DEFAULT_TYPE] * (len(self.data_bytes) // 2)
+        self._update_values()
+        self.endResetModel()
+
+    def refresh(self):
+        """Пересчитывает значения после изменения профилей (загрузка из файла)"""
+        self.beginResetModel()
+        self._update_values()
+        self.endResetModel()
+
+    def clear(self):
+        """Пустая таблица (строка не выбрана)"""
+        self.beginResetModel()
+        self.data_bytes = b""
+        self.location = None
+        self.register_types = []
+        self.values = []
+        self.placeholder = False
+        self.endResetModel()
+
+
+class RegisterTypeDelegate(QStyledItemDelegate):
+    """
+    Выбор типа регистра: выпадающий список создается только на время
+    редактирования ячейки, выбор применяется сразу.
+    """
+
+    def createEditor(self, parent, option, index):
+        editor = QComboBox(parent)
+        editor.addItems(REGISTER_TYPES)
+        editor.activated.connect(lambda _, editor=editor: self.commit(editor))
+        return editor
+
+    def commit(self, editor):
+        self.commitData.emit(editor)
+        self.closeEditor.emit(editor, QStyledItemDelegate.EndEditHint.NoHint)
+
+    def setEditorData(self, editor, index):
+        editor.setCurrentText(index.data(Qt.ItemDataRole.EditRole))
+
+    def setModelData(self, editor, model, index):
+        if editor.currentText() != index.data(Qt.ItemDataRole.EditRole):
+            model.setData(index, editor.currentText(), Qt.ItemDataRole.EditRole)